@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Benchmarks dos exporters do MDD Publisher.
+
+Gera artefatos sintéticos de tamanhos crescentes com a estrutura esperada por
+`utils/validators.REQUIRED_SECTIONS` (visao, pitch_deck, sumario_executivo) e
+mede vazão e pico de memória de:
+  - md_to_html (pacote `markdown` e fallback)
+  - apply_template / render_site
+  - export_docx (engines stream e python-docx)
+  - validate_all_artifacts
+
+Os resultados são emitidos em JSON para comparação entre execuções. Com
+`--baseline`, o script falha (código 1) se algum caso ficar mais lento que o
+baseline além da tolerância (`--max-regression`).
+
+Uso:
+  python symbiotas/mdd_publisher/scripts/bench_publisher.py \
+         [--sizes 1,10,100] [--repeat 5] [--output bench.json] \
+         [--baseline bench_anterior.json --max-regression 0.25]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+SCRIPT_DIR = Path(__file__).parent
+UTILS_DIR = SCRIPT_DIR / "utils"
+if str(UTILS_DIR) not in sys.path:
+    sys.path.insert(0, str(UTILS_DIR))
+
+from md_converter import MarkdownConverter
+from template_engine import apply_template, compile_template, render_site
+from validators import validate_all_artifacts
+
+# Importa configuração centralizada
+try:
+    from config import TEMPLATES_DIR
+except ImportError:
+    TEMPLATES_DIR = Path("process/templates")
+
+DEFAULT_TEMPLATE = TEMPLATES_DIR / "site_templates" / "template_01"
+
+# Títulos que satisfazem os schemas de REQUIRED_SECTIONS
+ARTIFACT_HEADINGS: dict[str, tuple[str, list[str]]] = {
+    "visao.md": ("Visão do Produto", ["Problema", "Solução", "Métricas de Sucesso"]),
+    "pitch_deck.md": ("Pitch de Valor", ["Problema", "Solução", "Mercado"]),
+    "sumario_executivo.md": ("Sumário Executivo", ["Oportunidade", "Mercado", "Modelo de Negócio"]),
+}
+
+PARAGRAPH = (
+    "Empresas perdem **horas por semana** em tarefas *manuais* e repetitivas; "
+    "com `automação` e [métricas claras](https://example.com) o time foca no que gera valor."
+)
+
+
+def generate_artifact(name: str, scale: int) -> str:
+    """
+    Gera um artefato sintético válido para `name`, com tamanho proporcional a `scale`.
+
+    Cada seção obrigatória é repetida `scale` vezes com parágrafos, listas,
+    citação, bloco de código e tabela.
+    """
+    title, sections = ARTIFACT_HEADINGS[name]
+    parts = [f"# {title}", ""]
+    for i in range(scale):
+        for section in sections:
+            parts += [f"## {section}" if i == 0 else f"## {section} ({i})", ""]
+            parts += [PARAGRAPH, "", PARAGRAPH, ""]
+            parts += [f"- Item {n} com **destaque**" for n in range(1, 6)] + [""]
+            parts += [f"{n}. Passo {n}" for n in range(1, 4)] + [""]
+            parts += ["> Citação de um cliente entrevistado.", ""]
+            parts += ["```", "resultado = medir(hipotese)", "```", ""]
+            parts += ["| Métrica | Meta | Atual |", "|---|---|---|"]
+            parts += [f"| m{n} | {n * 10}% | {n * 7}% |" for n in range(1, 6)] + [""]
+    return "\n".join(parts)
+
+
+def generate_site_source(scale: int) -> str:
+    """Gera fonte de site (front matter + seções) compatível com template_01."""
+    front = [
+        "---",
+        "titulo: Pare de Perder Tempo",
+        "cta_texto: Quero Automatizar",
+        "cta_titulo: Teste Grátis",
+        "cta_descricao: Sem cartão de crédito.",
+        "cta_botao: Começar",
+        "form_action: https://example.com/signup",
+        "footer_texto: © Sua Empresa",
+        "---",
+        "",
+        "# Você está cansado de processos lentos?",
+        "",
+    ]
+    body = []
+    for key in ["Subtitulo", "Descricao Problema", "Ponto Dor 1", "Ponto Dor 2", "Ponto Dor 3", "Solucao Breve"]:
+        body += [f"## {key}", ""] + [PARAGRAPH] * scale + [""]
+    return "\n".join(front + body)
+
+
+def measure(fn: Callable[[], object], repeat: int) -> dict:
+    """Executa `fn` `repeat` vezes (após um aquecimento) e mede tempo e pico de memória."""
+    fn()  # aquecimento: imports, caches, compilação de regex
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "runs": repeat,
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def build_cases(scale: int, workdir: Path) -> list[tuple[str, int, Callable[[], object]]]:
+    """
+    Monta os casos de benchmark para um tamanho.
+
+    Returns:
+        Lista de (nome, bytes de entrada, função a medir)
+    """
+    cases: list[tuple[str, int, Callable[[], object]]] = []
+    docs_dir = workdir / f"docs_{scale}"
+    docs_dir.mkdir(parents=True, exist_ok=True)
+    artifacts = {name: generate_artifact(name, scale) for name in ARTIFACT_HEADINGS}
+    for name, text in artifacts.items():
+        (docs_dir / name).write_text(text, encoding="utf-8")
+    sample = artifacts["sumario_executivo.md"]
+    sample_bytes = len(sample.encode("utf-8"))
+
+    fallback = MarkdownConverter(use_markdown=False)
+    cases.append(("md_to_html[fallback]", sample_bytes, lambda: fallback.convert(sample)))
+    try:
+        library = MarkdownConverter(use_markdown=True)
+        cases.append(("md_to_html[markdown]", sample_bytes, lambda: library.convert(sample)))
+    except Exception:
+        print("  (pulado) md_to_html[markdown]: pacote 'markdown' não instalado", file=sys.stderr)
+
+    if (DEFAULT_TEMPLATE / "index.html").exists():
+        site_md = workdir / f"site_{scale}.md"
+        site_md.write_text(generate_site_source(scale), encoding="utf-8")
+        site_bytes = site_md.stat().st_size
+        template_html = DEFAULT_TEMPLATE / "index.html"
+        variables = {name: PARAGRAPH * scale for name in compile_template(template_html).placeholders}
+        template_bytes = template_html.stat().st_size + sum(len(v.encode("utf-8")) for v in variables.values())
+        out_html = workdir / f"site_{scale}" / "index.html"
+        cases.append(("apply_template", template_bytes, lambda: apply_template(template_html, variables)))
+        cases.append(("render_site", site_bytes, lambda: render_site(site_md, DEFAULT_TEMPLATE, out_html)))
+    else:
+        print(f"  (pulado) apply_template/render_site: template não encontrado em {DEFAULT_TEMPLATE}", file=sys.stderr)
+
+    from export_docx import export_docx
+    docs_md = docs_dir / "sumario_executivo.md"
+    out_docx = workdir / f"out_{scale}.docx"
+    cases.append(("export_docx[stream]", sample_bytes, lambda: export_docx(docs_md, out_docx, engine="stream")))
+    try:
+        import docx  # type: ignore  # noqa: F401
+        cases.append((
+            "export_docx[python-docx]", sample_bytes,
+            lambda: export_docx(docs_md, out_docx, engine="python-docx"),
+        ))
+    except ImportError:
+        print("  (pulado) export_docx[python-docx]: 'python-docx' não instalado", file=sys.stderr)
+
+    total_bytes = sum(len(t.encode("utf-8")) for t in artifacts.values())
+    cases.append(("validate_all_artifacts", total_bytes, lambda: validate_all_artifacts(docs_dir)))
+    return cases
+
+
+def run_benchmarks(sizes: list[int], repeat: int, only: str | None = None) -> dict:
+    """Executa todos os casos para cada tamanho e devolve o relatório em formato JSON."""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="mdd_bench_") as tmp:
+        workdir = Path(tmp)
+        cwd = Path.cwd()
+        # Exporters gravam logs relativos ao cwd: isola no diretório temporário
+        os.chdir(workdir)
+        try:
+            for scale in sizes:
+                for name, input_bytes, fn in build_cases(scale, workdir):
+                    if only and only not in name:
+                        continue
+                    try:
+                        stats = measure(fn, repeat)
+                    except Exception as exc:
+                        print(f"{name:<24} size={scale:<5} ERRO: {exc}", file=sys.stderr)
+                        results.append({"name": name, "size": scale, "error": str(exc)})
+                        continue
+                    stats.update({
+                        "name": name,
+                        "size": scale,
+                        "input_bytes": input_bytes,
+                        "throughput_mb_s": round(input_bytes / stats["median_s"] / 1e6, 3) if stats["median_s"] else None,
+                    })
+                    results.append(stats)
+                    print(
+                        f"{name:<24} size={scale:<5} {stats['median_s'] * 1000:9.3f} ms "
+                        f"{stats['throughput_mb_s'] or 0:8.2f} MB/s  pico={stats['peak_kb']} KB"
+                    )
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "sizes": sizes,
+            "filter": only,
+        },
+        "results": results,
+    }
+
+
+def compare_with_baseline(report: dict, baseline: dict, max_regression: float) -> list[str]:
+    """
+    Compara medianas com um relatório anterior.
+
+    Casos que falharam nesta execução, ou que o baseline mediu e que agora não
+    foram medidos (no mesmo tamanho e filtro), também contam como regressão.
+
+    Returns:
+        Mensagens de regressão (casos mais lentos que baseline * (1 + max_regression),
+        com erro ou ausentes)
+    """
+    previous = {(r["name"], r["size"]): r for r in baseline.get("results", [])}
+    meta = report.get("meta", {})
+    measured = {(r["name"], r["size"]) for r in report["results"]}
+    regressions = [
+        f"{name} (size={size}): ausente (medido no baseline)"
+        for (name, size), base in previous.items()
+        if "median_s" in base and (name, size) not in measured
+        and size in meta.get("sizes", [size]) and (not meta.get("filter") or meta["filter"] in name)
+    ]
+    for r in report["results"]:
+        if "error" in r:
+            regressions.append(f"{r['name']} (size={r['size']}): erro: {r['error']}")
+            continue
+        base = previous.get((r["name"], r["size"]))
+        if not base or not base.get("median_s"):
+            continue
+        ratio = r["median_s"] / base["median_s"]
+        if ratio > 1 + max_regression:
+            regressions.append(
+                f"{r['name']} (size={r['size']}): {base['median_s'] * 1000:.3f} ms -> "
+                f"{r['median_s'] * 1000:.3f} ms (+{(ratio - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="MDD Publisher - Benchmarks dos exporters")
+    ap.add_argument("--sizes", default="1,10,100", help="Fatores de tamanho dos artefatos sintéticos (ex: 1,10,100)")
+    ap.add_argument("--repeat", type=int, default=5, help="Execuções medidas por caso")
+    ap.add_argument("--filter", help="Executa apenas casos cujo nome contém este texto")
+    ap.add_argument("--output", help="Arquivo JSON de saída com os resultados")
+    ap.add_argument("--baseline", help="Relatório JSON anterior para detectar regressões")
+    ap.add_argument("--max-regression", type=float, default=0.25, help="Tolerância de regressão (0.25 = 25%%)")
+    args = ap.parse_args()
+
+    try:
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    except ValueError:
+        print(f"[ERRO] --sizes inválido: {args.sizes}", file=sys.stderr)
+        return 2
+
+    report = run_benchmarks(sizes, max(1, args.repeat), args.filter)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nResultados gravados em {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_with_baseline(report, baseline, args.max_regression)
+        if regressions:
+            print("\n✗ Regressões de desempenho:", file=sys.stderr)
+            for msg in regressions:
+                print(f"  - {msg}", file=sys.stderr)
+            return 1
+        print(f"\n✓ Sem regressões acima de {args.max_regression:.0%} em relação ao baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,6 +5,8 @@ Configuração centralizada para os scripts do MDD Publisher.
 Este módulo define caminhos e configurações reutilizáveis,
 eliminando hardcoding e facilitando manutenção.
 """
+import hashlib
+import tempfile
 from pathlib import Path
 
 # Detecta automaticamente a raiz do projeto
@@ -23,6 +25,40 @@ LOG_FILE = LOGS_DIR / "export_history.log"
 LOG_MAX_BYTES = 10 * 1024 * 1024  # 10MB
 LOG_BACKUP_COUNT = 5
 
+# Manifesto de exportação incremental (hash de origem + versão do exporter)
+MANIFEST_FILE = PROJECT_ROOT / "project" / "output" / "export_manifest.json"
+
+# Socket Unix do daemon de exportação (`mdd_publish.py serve`), um por projeto
+DAEMON_SOCKET = Path(tempfile.gettempdir()) / (
+    "mdd_publisher_" + hashlib.sha1(str(PROJECT_ROOT.resolve()).encode("utf-8")).hexdigest()[:12] + ".sock"
+)
+
+# Schemas de validação adicionais (YAML {arquivo ou glob: [regex de seção]}),
+# sobrepostos a `validators.REQUIRED_SECTIONS` quando o arquivo existe
+VALIDATION_SCHEMAS_FILE = PROJECT_ROOT / "project" / "validation_schemas.yaml"
+
+# Cache de resultados de validação (`mdd_publish.py --validate`), por hash de conteúdo
+VALIDATION_CACHE_FILE = PROJECT_ROOT / "project" / "output" / "validation_cache.json"
+
+# Perfis cProfile (.pstats) gravados com `mdd_publish.py --profile`
+PROFILES_DIR = PROJECT_ROOT / "project" / "output" / "profiles"
+
+# Linha do tempo (Chrome trace-event) gravada com `mdd_publish.py --trace`
+TRACE_FILE = PROJECT_ROOT / "project" / "output" / "trace.json"
+
+# Pool de workers do modo lote/watch: cada worker é reciclado após N jobs ou
+# quando sua memória residente passa do limite (o weasyprint cresce em lotes longos)
+WORKER_MAX_JOBS = 200
+WORKER_MAX_RSS_MB = 1024
+
+# CSS das páginas HTML: "inline" (<style> em cada página) ou "linked"
+# (folhas `<nome>.<hash>.css` gravadas uma vez em `assets/` e referenciadas)
+CSS_MODE = "inline"
+
+# Engine de geração DOCX: "python-docx" ou "stream" (OOXML direto, sem dependências;
+# usado também quando o python-docx não está instalado)
+DOCX_ENGINE = "python-docx"
+
 # Extensões suportadas
 SUPPORTED_INPUT_EXTENSIONS = [".md", ".markdown"]
 SUPPORTED_OUTPUT_FORMATS = ["html", "pdf", "docx"]
@@ -2,18 +2,27 @@
 """
 Exporta Markdown (.md) para DOCX.
 
-Requer a biblioteca opcional:
-- python-docx
+Engines:
+- python-docx (padrão): modelo de objetos do python-docx a partir do HTML
+  já convertido do documento (requer a biblioteca opcional `python-docx`;
+  sem ela, usa o stream); também usado como fallback se o stream falhar
+- stream: escreve o OOXML diretamente a partir dos eventos do tokenizador
+  Markdown (`utils/docx_stream.py`), sem dependências externas; não usa o
+  HTML do documento, e sim o tokenizador de fallback (`md_converter.iter_blocks`)
 
 Uso:
   python symbiotas/mdd_publisher/scripts/export_docx.py \
          --input project/docs/sumario_executivo.md \
-         [--output project/output/docs/sumario_executivo.docx]
+         [--output project/output/docs/sumario_executivo.docx] \
+         [--engine stream|python-docx]
 """
 from __future__ import annotations
 
 import argparse
+import logging
+import re
 import sys
+import time
 from pathlib import Path
 
 SCRIPT_DIR = Path(__file__).parent
@@ -21,32 +30,119 @@ UTILS_DIR = SCRIPT_DIR / "utils"
 if str(UTILS_DIR) not in sys.path:
     sys.path.insert(0, str(UTILS_DIR))
 
+from docx_stream import STYLES_XML, iter_table_xml, numbering_xml, write_docx
 from helpers import (
+    ExportError,
+    MarkdownDocument,
     MissingDependencyError,
     default_output_for_md,
+    export_metrics,
+    load_document,
     log_export,
-    md_to_html_basic,
-    read_text,
 )
+from manifest import ExportManifest, style_version
+from md_converter import iter_blocks
+from timing import stage
 
+# Importa configuração centralizada
+try:
+    from config import DOCX_ENGINE
+except ImportError:
+    # Fallback para compatibilidade
+    DOCX_ENGINE = "python-docx"
 
-def export_docx(input_md: Path, output_docx: Path | None = None) -> Path:
+DOCX_ENGINES = ("stream", "python-docx")
+
+# Versão por engine: trocar de engine reexporta as saídas
+STYLE_VERSIONS = {
+    "stream": style_version("docx", "stream", STYLES_XML, numbering_xml(1)),
+    "python-docx": style_version("docx"),
+}
+
+
+def export_docx(
+    input_md: Path | MarkdownDocument,
+    output_docx: Path | None = None,
+    manifest: ExportManifest | None = None,
+    force: bool = False,
+    engine: str | None = None,
+) -> Path:
     """
     Exporta Markdown para DOCX com formatação preservada.
 
-    Converte MD para HTML intermediário e então extrai estrutura para DOCX,
-    preservando títulos, listas, negrito e itálico.
+    O engine `python-docx` extrai a estrutura do HTML do documento
+    (`body_html`, compartilhado com os demais exporters) com python-docx; o
+    engine `stream` gera o OOXML em fluxo a partir dos eventos do tokenizador
+    Markdown. Se o `stream` falhar, o python-docx é usado como fallback; sem
+    a biblioteca `python-docx`, o `stream` é usado.
 
     Args:
-        input_md: Caminho do arquivo .md de entrada
+        input_md: Caminho do arquivo .md de entrada ou documento já carregado
         output_docx: Caminho opcional do .docx de saída
+        manifest: Manifesto incremental; se informado, saídas inalteradas são puladas
+        force: Se True, exporta mesmo que o manifesto indique saída atualizada
+        engine: "stream" ou "python-docx" (padrão: config.DOCX_ENGINE)
 
     Returns:
         Path do arquivo DOCX gerado
 
     Raises:
-        SystemExit: Se python-docx não estiver disponível
-        FileNotFoundError: Se arquivo de entrada não existir
+        ExportError: Se o engine for desconhecido
+        MissingDependencyError: Se o engine python-docx for necessário e não estiver disponível
+        InvalidInputError: Se o arquivo de entrada não existir
+    """
+    engine = engine or DOCX_ENGINE
+    if engine not in DOCX_ENGINES:
+        raise ExportError(f"Engine DOCX desconhecido: {engine} (opções: {', '.join(DOCX_ENGINES)})")
+
+    started = time.perf_counter()
+    doc_md = load_document(input_md)
+    input_md = doc_md.path
+    out_root = Path("project/output/docs")
+    out_path = output_docx or default_output_for_md(input_md, out_root, ".docx")
+    if engine == "python-docx" and not python_docx_available():
+        # Sem a biblioteca, o stream gera o DOCX sem dependências externas
+        engine = "stream"
+    if manifest and not force and manifest.should_skip(out_path, doc_md.content_hash, STYLE_VERSIONS[engine]):
+        log_export(f"DOCX inalterado (pulado): {input_md} -> {out_path}")
+        return out_path
+
+    if engine == "stream":
+        try:
+            # Tokenização, montagem do XML e gravação acontecem juntas, em fluxo
+            with stage("render"):
+                write_docx(doc_md.text, out_path, title=doc_md.title)
+            backend = "ooxml-stream"
+        except Exception as e:
+            log_export(f"FALHA no engine stream, usando python-docx: {input_md} -> {out_path} ({e})", level=logging.WARNING)
+            engine = "python-docx"
+    if engine == "python-docx":
+        backend = _export_python_docx(doc_md, out_path)
+
+    if manifest:
+        manifest.record(out_path, input_md, doc_md.content_hash, STYLE_VERSIONS[engine], backend=backend)
+    log_export(
+        f"DOCX exportado ({backend}): {input_md} -> {out_path}",
+        **export_metrics("docx", doc_md, out_path, started, backend=backend),
+    )
+    return out_path
+
+
+def python_docx_available() -> bool:
+    """Indica se a biblioteca `python-docx` pode ser importada."""
+    try:
+        import docx  # type: ignore  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _export_python_docx(doc_md: MarkdownDocument, out_path: Path) -> str:
+    """
+    Gera o DOCX com python-docx (MD -> HTML -> DOCX, ou linha a linha sem bs4).
+
+    Returns:
+        Nome do backend usado
     """
     try:
         from docx import Document  # type: ignore
@@ -60,91 +156,337 @@ def export_docx(input_md: Path, output_docx: Path | None = None) -> Path:
     except ImportError:
         use_html_parser = False
 
-    text = read_text(input_md)
-    out_root = Path("project/output/docs")
-    out_path = output_docx or default_output_for_md(input_md, out_root, ".docx")
-
     doc = Document()
 
     if use_html_parser:
         # Método avançado: converte MD -> HTML -> DOCX
-        html = md_to_html_basic(text)
-        soup = BeautifulSoup(html, 'html.parser')
-
-        for elem in soup.find_all(['h1', 'h2', 'h3', 'h4', 'p', 'ul', 'ol', 'li', 'blockquote', 'hr']):
-            if elem.name == 'h1':
-                doc.add_heading(elem.get_text(strip=True), level=1)
-            elif elem.name == 'h2':
-                doc.add_heading(elem.get_text(strip=True), level=2)
-            elif elem.name == 'h3':
-                doc.add_heading(elem.get_text(strip=True), level=3)
-            elif elem.name == 'h4':
-                doc.add_heading(elem.get_text(strip=True), level=4)
-            elif elem.name == 'p' and elem.parent.name not in ['li', 'blockquote']:
-                _add_formatted_paragraph(doc, elem)
-            elif elem.name == 'blockquote':
-                para = doc.add_paragraph(elem.get_text(strip=True))
-                para.style = 'Intense Quote'
-            elif elem.name in ['ul', 'ol']:
-                for li in elem.find_all('li', recursive=False):
-                    doc.add_paragraph(li.get_text(strip=True), style='List Bullet' if elem.name == 'ul' else 'List Number')
-            elif elem.name == 'hr':
+        body_html = doc_md.body_html
+        with stage("render"):
+            _HtmlDocxWalker(doc).walk(BeautifulSoup(body_html, 'html.parser'))
+    else:
+        # Fallback simples: eventos de bloco do tokenizador (sem formatação inline)
+        list_kinds: list[str] = []
+        for kind, data in iter_blocks(doc_md.text):
+            if kind == "heading":
+                doc.add_heading(data[1], level=data[0])
+            elif kind == "list_start":
+                list_kinds.append(data)
+            elif kind == "list_end":
+                list_kinds.pop()
+            elif kind == "item":
+                styles = LIST_STYLES[list_kinds[-1]]
+                doc.add_paragraph(data, style=styles[min(len(list_kinds), len(styles)) - 1])
+            elif kind == "table":
+                header, aligns, rows = data
+                cells = [[[(c, True, False, False, None)] for c in header]]
+                cells += [[[(c, False, False, False, None)] for c in row] for row in rows]
+                _add_table(doc, cells, aligns)
+                doc.add_paragraph()
+            elif kind == "hr":
                 doc.add_paragraph('─' * 50)
+            elif kind in ("paragraph", "quote", "code_line") and data.strip():
+                doc.add_paragraph(data.rstrip())
+
+    with stage("write"):
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        doc.save(str(out_path))
+    return "python-docx" if use_html_parser else "python-docx (texto)"
+
+
+# Estilos de lista do template padrão do python-docx, por nível (1 a 3)
+LIST_STYLES = {
+    "ul": ("List Bullet", "List Bullet 2", "List Bullet 3"),
+    "ol": ("List Number", "List Number 2", "List Number 3"),
+}
+LIST_CONTINUE_STYLES = ("List Continue", "List Continue 2", "List Continue 3")
+HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+BLOCK_TAGS = set(HEADING_TAGS) | {"p", "ul", "ol", "blockquote", "pre", "table", "hr", "div"}
+_WHITESPACE_RE = re.compile(r"\s+")
+_ALIGN_RE = re.compile(r"text-align:\s*(left|center|right)")
+EMU_PER_TWIP = 635
+
+
+def _html_alignment(cell) -> str | None:
+    """Alinhamento de uma célula HTML (atributo `align` ou `style` do markdown)."""
+    align = cell.get("align")
+    if align:
+        return align
+    match = _ALIGN_RE.search(cell.get("style") or "")
+    return match.group(1) if match else None
+
+
+def _add_table(doc, rows, aligns, header_rows: int = 1, link_id=None) -> None:
+    """
+    Insere uma tabela no fim do documento python-docx a partir do XML de
+    `docx_stream.iter_table_xml`, sem acessar células pelo modelo do
+    python-docx (custo quadrático em tabelas grandes).
+    """
+    from docx.oxml import parse_xml  # type: ignore
+
+    section = doc.sections[-1]
+    width = (section.page_width - section.left_margin - section.right_margin) // EMU_PER_TWIP
+    tbl = parse_xml("".join(iter_table_xml(rows, aligns, header_rows, link_id, width)))
+    body = doc.element.body
+    if body.sectPr is not None:
+        body.sectPr.addprevious(tbl)
     else:
-        # Fallback simples: converte linha a linha (modo legado melhorado)
-        import re
-        for line in text.splitlines():
-            line = line.rstrip()
-            if not line:
+        body.append(tbl)
+
+
+class _HtmlDocxWalker:
+    """
+    Percorre o HTML (BeautifulSoup) uma única vez, em profundidade, emitindo
+    cada nó no documento python-docx exatamente uma vez.
+
+    O estado de formatação inline (negrito/itálico/código) desce pela árvore;
+    listas aninhadas usam os estilos de nível 2 e 3 e tabelas são montadas
+    em XML de uma só vez.
+    """
+
+    def __init__(self, doc):
+        from bs4.element import Comment  # type: ignore
+        from docx.shared import Pt  # type: ignore
+
+        self.doc = doc
+        self._comment = Comment
+        self._code_size = Pt(10)
+        self._style_ids: dict[str, str] = {}
+        self._links: dict[str, str] = {}
+        self._next_rel = 1
+
+    def _paragraph(self, style: str | None = None):
+        """
+        Novo parágrafo no documento.
+
+        A busca de estilo por nome do python-docx percorre o XML de estilos a
+        cada chamada; aqui o ID é resolvido uma vez por nome e gravado direto.
+        """
+        para = self.doc.add_paragraph()
+        if style:
+            style_id = self._style_ids.get(style)
+            if style_id is None:
+                style_id = self._style_ids[style] = self.doc.styles[style].style_id
+            para._p.style = style_id
+        return para
+
+    # Blocos ------------------------------------------------------------------
+
+    def walk(self, node, list_level: int = 0) -> None:
+        """Emite os filhos de bloco de `node`."""
+        for child in node.children:
+            self._block(child, list_level)
+
+    def _block(self, node, list_level: int = 0) -> None:
+        name = node.name
+        if name is None:
+            # Texto solto entre blocos
+            if not isinstance(node, self._comment) and node.strip():
+                self._runs(self._paragraph(), self._node_chunks(node, br="\n"))
+        elif name in HEADING_TAGS:
+            self._inline(self._paragraph(f"Heading {HEADING_TAGS[name]}"), node)
+        elif name == "p":
+            self._inline(self._paragraph(), node)
+        elif name in ("ul", "ol"):
+            self._list(node, list_level)
+        elif name == "blockquote":
+            self._quote(node)
+        elif name == "pre":
+            self._code_block(node)
+        elif name == "table":
+            self._table(node)
+        elif name == "hr":
+            self._paragraph().add_run('─' * 50)
+        else:
+            # Contêineres (div, section...): desce sem emitir nada próprio
+            self.walk(node, list_level)
+
+    def _list(self, node, level: int) -> None:
+        depth = min(level, 2)
+        for li in node.find_all("li", recursive=False):
+            self._flow(li, LIST_STYLES[node.name][depth], LIST_CONTINUE_STYLES[depth], level + 1)
+
+    def _quote(self, node) -> None:
+        self._flow(node, 'Intense Quote', 'Intense Quote')
+
+    def _flow(self, node, style: str, continue_style: str, list_level: int = 0) -> None:
+        """
+        Emite o conteúdo misto de `li`/`blockquote`: texto inline e `<p>` viram
+        parágrafos (o primeiro com `style`, os seguintes com `continue_style`);
+        blocos aninhados (sublistas, código, tabelas) são emitidos no lugar.
+        """
+        chunks: list | None = None
+        started = False
+
+        def emit() -> None:
+            nonlocal started
+            self._runs(self._paragraph(continue_style if started else style), chunks)
+            started = True
+
+        for child in node.children:
+            name = child.name
+            if name in BLOCK_TAGS and name != "p":
+                if chunks is not None:
+                    emit()
+                    chunks = None
+                self._block(child, list_level)
+            elif chunks is None and name is None and (isinstance(child, self._comment) or not child.strip()):
                 continue
-            # Títulos
-            if line.startswith('#### '):
-                doc.add_heading(line[5:].strip(), level=4)
-            elif line.startswith('### '):
-                doc.add_heading(line[4:].strip(), level=3)
-            elif line.startswith('## '):
-                doc.add_heading(line[3:].strip(), level=2)
-            elif line.startswith('# '):
-                doc.add_heading(line[2:].strip(), level=1)
-            # Listas
-            elif re.match(r'^\s*[\-\*]\s+', line):
-                doc.add_paragraph(re.sub(r'^\s*[\-\*]\s+', '', line), style='List Bullet')
-            elif re.match(r'^\s*\d+\.\s+', line):
-                doc.add_paragraph(re.sub(r'^\s*\d+\.\s+', '', line), style='List Number')
-            # Linha horizontal
-            elif line.strip() == '---':
-                doc.add_paragraph('─' * 50)
-            # Parágrafo normal
             else:
-                doc.add_paragraph(line)
+                if chunks is None:
+                    chunks = []
+                if name == "p":
+                    chunks.extend(self._chunks(child, br="\n"))
+                    emit()
+                    chunks = None
+                else:
+                    chunks.extend(self._node_chunks(child, br="\n"))
+        if chunks is not None:
+            emit()
 
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    doc.save(str(out_path))
-    log_export(f"DOCX exportado: {input_md} -> {out_path}")
-    return out_path
+    def _code_block(self, node) -> None:
+        run = self._paragraph().add_run(node.get_text().rstrip("\n"))
+        run.font.name = 'Courier New'
+        run.font.size = self._code_size
 
+    def _table(self, node) -> None:
+        """Coleta as células em trechos inline e insere a tabela de uma vez (`_add_table`)."""
+        rows = []
+        header_rows = 0
+        aligns: list[str | None] = []
+        # Só as linhas desta tabela: `tr` de tabelas aninhadas em células ficam de fora
+        for tr in _table_rows(node):
+            cells = tr.find_all(["th", "td"], recursive=False)
+            if not cells:
+                continue
+            if not rows:
+                aligns = [_html_alignment(c) for c in cells]
+            if all(c.name == "th" for c in cells) and header_rows == len(rows):
+                header_rows += 1
+            rows.append([list(self._chunks(c, c.name == "th")) for c in cells])
+        if not rows:
+            return
+        _add_table(self.doc, rows, aligns, header_rows, self._link_id)
+        self._paragraph()  # separa tabelas consecutivas
 
-def _add_formatted_paragraph(doc, elem):
-    """Adiciona parágrafo com formatação inline (bold, italic)."""
-    para = doc.add_paragraph()
-    for content in elem.children:
-        if hasattr(content, 'name'):
-            run = para.add_run(content.get_text())
-            if content.name == 'strong':
-                run.bold = True
-            elif content.name == 'em':
-                run.italic = True
-            elif content.name == 'code':
+    def _link_id(self, href: str) -> str:
+        """
+        ID de relação de um link externo.
+
+        `part.relate_to` procura linearmente relações existentes e o próximo
+        rId livre a cada chamada (quadrático em tabelas cheias de links); aqui
+        os links ficam num dicionário e os rIds são alocados por contador.
+        """
+        rel_id = self._links.get(href)
+        if rel_id is None:
+            from docx.opc.constants import RELATIONSHIP_TYPE  # type: ignore
+
+            if not self._links:
+                self._ensure_hyperlink_style()
+            rels = self.doc.part.rels
+            while f"rId{self._next_rel}" in rels:
+                self._next_rel += 1
+            rel_id = self._links[href] = f"rId{self._next_rel}"
+            rels.add_relationship(RELATIONSHIP_TYPE.HYPERLINK, href, rel_id, is_external=True)
+        return rel_id
+
+    def _ensure_hyperlink_style(self) -> None:
+        """Cria o estilo de caractere `Hyperlink` (usado por parágrafos e tabelas), se o template não o tiver."""
+        from docx.enum.style import WD_STYLE_TYPE  # type: ignore
+        from docx.shared import RGBColor  # type: ignore
+
+        try:
+            self.doc.styles["Hyperlink"]
+        except KeyError:
+            style = self.doc.styles.add_style("Hyperlink", WD_STYLE_TYPE.CHARACTER)
+            style.font.color.rgb = RGBColor(0x2B, 0x70, 0xC9)
+            style.font.underline = True
+
+    def _chunks(self, node, bold: bool = False, italic: bool = False, code: bool = False, href: str | None = None, br: str = " "):
+        """
+        Trechos inline (texto, negrito, itálico, código, href) dos filhos de `node`, como `iter_inline`.
+
+        `br` é o texto de um `<br>`: espaço nas células de tabela, "\\n"
+        (quebra de linha, ver `_runs`) nos parágrafos.
+        """
+        for child in node.children:
+            yield from self._node_chunks(child, bold, italic, code, href, br)
+
+    def _node_chunks(self, node, bold: bool = False, italic: bool = False, code: bool = False, href: str | None = None, br: str = " "):
+        """Trechos inline do próprio `node` (texto ou elemento), ver `_chunks`."""
+        name = node.name
+        if name is None:
+            if not isinstance(node, self._comment):
+                yield (str(node) if code else _WHITESPACE_RE.sub(" ", str(node))), bold, italic, code, href
+        elif name in ("strong", "b"):
+            yield from self._chunks(node, True, italic, code, href, br)
+        elif name in ("em", "i"):
+            yield from self._chunks(node, bold, True, code, href, br)
+        elif name == "code":
+            yield from self._chunks(node, bold, italic, True, href, br)
+        elif name == "a":
+            yield from self._chunks(node, bold, italic, code, node.get("href") or href, br)
+        elif name == "br":
+            yield br, bold, italic, code, href
+        else:
+            yield from self._chunks(node, bold, italic, code, href, br)
+
+    # Inline ------------------------------------------------------------------
+
+    def _inline(self, para, node) -> None:
+        """Emite o conteúdo inline de `node` como runs de `para`."""
+        self._runs(para, self._chunks(node, br="\n"))
+
+    def _runs(self, para, chunks) -> None:
+        """
+        Acrescenta os trechos a `para`: um run por trecho, links como
+        `w:hyperlink` (mesma relação e estilo das tabelas), "\\n" como quebra.
+        """
+        first = True
+        for text, bold, italic, code, href in chunks:
+            if text == "\n":
+                para.add_run().add_break()
+                first = False
+                continue
+            if first:
+                text = text.lstrip()
+            if not text:
+                continue
+            first = False
+            run = para.add_run(text)
+            run.bold = bold or None
+            run.italic = italic or None
+            if code:
                 run.font.name = 'Courier New'
-                run.font.size = Pt(10)
+                run.font.size = self._code_size
+            if href:
+                self._hyperlink(run, href)
+
+    def _hyperlink(self, run, href: str) -> None:
+        """Envolve `run` num `w:hyperlink` para `href`."""
+        from docx.oxml import OxmlElement  # type: ignore
+        from docx.oxml.ns import qn  # type: ignore
+
+        link = OxmlElement("w:hyperlink")
+        link.set(qn("r:id"), self._link_id(href))
+        run.style = self.doc.styles["Hyperlink"]
+        run._r.addprevious(link)
+        link.append(run._r)
+
+
+def _table_rows(table):
+    """Linhas (`tr`) da própria tabela, diretas ou em `thead`/`tbody`/`tfoot`, sem descer em tabelas aninhadas."""
+    for child in table.find_all(["thead", "tbody", "tfoot", "tr"], recursive=False):
+        if child.name == "tr":
+            yield child
         else:
-            para.add_run(str(content))
+            yield from child.find_all("tr", recursive=False)
 
 
 def main() -> int:
     ap = argparse.ArgumentParser(description="MDD Publisher - Exportar Markdown para DOCX")
     ap.add_argument("--input", required=True, help="Caminho do arquivo .md de entrada")
     ap.add_argument("--output", required=False, help="Caminho do .docx de saída")
+    ap.add_argument("--engine", choices=DOCX_ENGINES, help=f"Engine de geração (padrão: {DOCX_ENGINE})")
     args = ap.parse_args()
 
     in_path = Path(args.input)
@@ -153,14 +495,14 @@ def main() -> int:
         return 2
     out_path = Path(args.output) if args.output else None
     try:
-        final_path = export_docx(in_path, out_path)
+        final_path = export_docx(in_path, out_path, engine=args.engine)
         print(str(final_path))
         return 0
-    except MissingDependencyError as me:
+    except ExportError as me:
         print(f"[ERRO] {me}", file=sys.stderr)
         return 1
     except Exception as exc:
-        log_export(f"FALHA ao exportar DOCX: {in_path} - {exc}")
+        log_export(f"FALHA ao exportar DOCX: {in_path} - {exc}", level=logging.ERROR)
         print(f"[ERRO] Falha ao exportar DOCX: {exc}", file=sys.stderr)
         return 1
 
@@ -9,12 +9,18 @@ Uso:
 
 Se --output não for informado, salvará em `project/output/docs/` replicando a estrutura
 de `project/docs/` e trocando a extensão para .html.
+
+Com `--css linked`, o CSS não é embutido: `BASE_STYLE` é gravado uma vez como
+`assets/base.<hash>.css` (sob `project/output/docs/`) e referenciado pela página.
 """
 from __future__ import annotations
 
 import argparse
+import logging
 import sys
+import time
 from pathlib import Path
+from typing import Iterable
 
 SCRIPT_DIR = Path(__file__).parent
 UTILS_DIR = SCRIPT_DIR / "utils"
@@ -22,42 +28,82 @@ if str(UTILS_DIR) not in sys.path:
     sys.path.insert(0, str(UTILS_DIR))
 
 from helpers import (
+    BASE_STYLE,
     ExportError,
+    MarkdownDocument,
     default_output_for_md,
+    export_metrics,
+    load_document,
     log_export,
-    md_to_html_basic,
-    read_text,
     wrap_html,
     write_text,
 )
+from manifest import ExportManifest, style_version
+from stylesheets import CSS_MODES, publish_stylesheet, shared_assets_dir, stylesheet_href
 
 # Importa configuração centralizada
 try:
-    from config import OUTPUT_DIR
+    from config import CSS_MODE, OUTPUT_DIR
 except ImportError:
+    CSS_MODE = "inline"
     OUTPUT_DIR = Path("project/output/docs")
 
 
-def export_html(input_md: Path, output_html: Path | None = None) -> Path:
+STYLE_VERSION = style_version("html", BASE_STYLE)
+# Por modo de CSS: trocar de modo regrava as páginas
+STYLE_VERSIONS = {"inline": STYLE_VERSION, "linked": style_version("html", BASE_STYLE, "linked")}
+
+
+def render_html(doc: MarkdownDocument, css_links: Iterable[str] = ()) -> str:
+    """HTML completo de um documento, sem gravar em disco: `BASE_STYLE` inline ou, com `css_links`, referenciado."""
+    if css_links:
+        return wrap_html(title=doc.title, body_html=doc.body_html, inline_css=False, css_links=css_links)
+    return wrap_html(title=doc.title, body_html=doc.body_html)
+
+
+def export_html(
+    input_md: Path | MarkdownDocument,
+    output_html: Path | None = None,
+    manifest: ExportManifest | None = None,
+    force: bool = False,
+    css: str = CSS_MODE,
+) -> Path:
     """
     Exporta arquivo Markdown para HTML.
 
     Args:
-        input_md: Caminho do arquivo .md de entrada
+        input_md: Caminho do arquivo .md de entrada ou documento já carregado
         output_html: Caminho opcional do .html de saída
+        manifest: Manifesto incremental; se informado, saídas inalteradas são puladas
+        force: Se True, exporta mesmo que o manifesto indique saída atualizada
+        css: "inline" (CSS embutido) ou "linked" (folha `base.<hash>.css` compartilhada)
 
     Returns:
         Path do arquivo HTML gerado
 
     Raises:
+        ExportError: Se `css` não for um modo válido
         InvalidInputError: Se o arquivo de entrada não existir
     """
-    text = read_text(input_md)
-    body = md_to_html_basic(text)
-    html = wrap_html(title=input_md.stem, body_html=body)
-    out_path = output_html or default_output_for_md(input_md, OUTPUT_DIR, ".html")
+    started = time.perf_counter()
+    doc = load_document(input_md)
+    if css not in CSS_MODES:
+        raise ExportError(f"Modo de CSS inválido: {css} (use {' ou '.join(CSS_MODES)})")
+    out_path = output_html or default_output_for_md(doc.path, OUTPUT_DIR, ".html")
+    css_links: list[str] = []
+    if css == "linked":
+        # Publicada antes da checagem do manifesto: página pulada nunca fica sem a folha
+        sheet = publish_stylesheet(BASE_STYLE, shared_assets_dir(out_path, OUTPUT_DIR), "base")
+        css_links.append(stylesheet_href(sheet, out_path))
+    style = STYLE_VERSIONS[css]
+    if manifest and not force and manifest.should_skip(out_path, doc.content_hash, style):
+        log_export(f"HTML inalterado (pulado): {doc.path} -> {out_path}")
+        return out_path
+    html = render_html(doc, css_links)
     write_text(out_path, html)
-    log_export(f"HTML exportado: {input_md} -> {out_path}")
+    if manifest:
+        manifest.record(out_path, doc.path, doc.content_hash, style, backend="html")
+    log_export(f"HTML exportado: {doc.path} -> {out_path}", **export_metrics("html", doc, out_path, started))
     return out_path
 
 
@@ -65,6 +111,7 @@ def main() -> int:
     ap = argparse.ArgumentParser(description="MDD Publisher - Exportar Markdown para HTML")
     ap.add_argument("--input", required=True, help="Caminho do arquivo .md de entrada")
     ap.add_argument("--output", required=False, help="Caminho do .html de saída")
+    ap.add_argument("--css", choices=CSS_MODES, default=CSS_MODE, help=f"CSS embutido ou folha compartilhada com hash (padrão: {CSS_MODE})")
     args = ap.parse_args()
 
     in_path = Path(args.input)
@@ -73,14 +120,14 @@ def main() -> int:
         return 2
     out_path = Path(args.output) if args.output else None
     try:
-        final_path = export_html(in_path, out_path)
+        final_path = export_html(in_path, out_path, css=args.css)
         print(str(final_path))
         return 0
     except ExportError as ee:
         print(f"[ERRO] {ee}", file=sys.stderr)
         return 1
     except Exception as exc:
-        log_export(f"FALHA ao exportar HTML: {in_path} - {exc}")
+        log_export(f"FALHA ao exportar HTML: {in_path} - {exc}", level=logging.ERROR)
         print(f"[ERRO] Falha ao exportar HTML: {exc}", file=sys.stderr)
         return 1
 
@@ -13,15 +13,25 @@ Uso:
   python symbiotas/mdd_publisher/scripts/export_pdf.py \
          --input project/docs/sumario_executivo.md \
          [--output project/output/docs/sumario_executivo.pdf]
+
+Pacote (vários artefatos num único PDF, com sumário e quebra de página):
+  python symbiotas/mdd_publisher/scripts/export_pdf.py --bundle \
+         --input project/docs/visao.md project/docs/sumario_executivo.md project/docs/pitch_deck.md \
+         [--output project/output/docs/pacote.pdf] [--title "Pacote de Artefatos"]
 """
 from __future__ import annotations
 
 import argparse
+import html as html_lib
+import logging
+import re
 import shutil
 import subprocess
 import sys
-import tempfile
+import threading
+import time
 from pathlib import Path
+from typing import Callable, Iterable
 
 SCRIPT_DIR = Path(__file__).parent
 UTILS_DIR = SCRIPT_DIR / "utils"
@@ -29,14 +39,20 @@ if str(UTILS_DIR) not in sys.path:
     sys.path.insert(0, str(UTILS_DIR))
 
 from helpers import (
+    BASE_STYLE,
     ExportError,
+    InvalidInputError,
+    MarkdownDocument,
     MissingDependencyError,
     default_output_for_md,
+    export_metrics,
+    load_document,
     log_export,
-    md_to_html_basic,
-    read_text,
     wrap_html,
 )
+from export_pitch_html import PITCH_CSS
+from manifest import ExportManifest, content_hash, style_version
+from timing import stage
 
 # Importa configuração centralizada
 try:
@@ -45,116 +61,412 @@ except ImportError:
     # Fallback para compatibilidade
     OUTPUT_DIR = Path("project/output/docs")
 
+STYLE_VERSION = style_version("pdf", BASE_STYLE)
+
+# Pacote (--bundle): capa com sumário paginado e cada artefato em nova página.
+# `target-counter`/`leader` numeram o sumário no weasyprint; outros backends
+# mostram apenas os links.
+BUNDLE_CSS = """
+/* Pacote de artefatos (export_pdf --bundle) */
+.bundle-cover h1 { margin-top: 0; }
+.bundle-toc ol { padding-left: 1.2rem; }
+.bundle-toc li { margin: .3rem 0; }
+.bundle-toc a { color: inherit; text-decoration: none; }
+.bundle-toc a::after { content: leader('.') target-counter(attr(href), page); }
+.bundle-part { break-before: page; page-break-before: always; }
+""".strip()
+
+BUNDLE_STYLE_VERSION = style_version("pdf-bundle", BASE_STYLE, PITCH_CSS, BUNDLE_CSS)
+BUNDLE_TITLE = "Pacote de Artefatos"
+BUNDLE_OUTPUT_NAME = "pacote.pdf"
+
+_FIRST_HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$", re.MULTILINE)
+
+
+# Ordem de preferência dos backends de PDF
+PDF_BACKENDS = ("weasyprint", "pdfkit", "wkhtmltopdf")
+
+
+class PdfRenderer:
+    """
+    Renderizador de PDF de longa duração.
+
+    Carrega os backends sob demanda e os mantém carregados (módulos/binário)
+    entre documentos. Cada `render` tenta o backend preferido (`backend`, o
+    primeiro disponível) e, se ele falhar, os seguintes de `PDF_BACKENDS`,
+    como na exportação documento a documento.
+
+    O CSS é passado à parte (`stylesheets`): com weasyprint, as folhas são
+    analisadas uma vez no `WeasyprintContext`; nos demais backends, são
+    inseridas no `<head>` de cada documento.
+    """
+
+    def __init__(self, backend: str | None = None):
+        self._names = (backend,) if backend else PDF_BACKENDS
+        self._loaded: dict[str, Callable] = {}
+        self._unavailable: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.backend = next((name for name in self._names if self._load(name)), None)
+        if self.backend is None:
+            raise MissingDependencyError(
+                "Nenhum backend de PDF disponível. Instale 'weasyprint' ou 'pdfkit+wkhtmltopdf'. "
+                f"({'; '.join(f'{name}: {error}' for name, error in self._unavailable.items())})"
+            )
+
+    def render(self, html: str, output_pdf: Path, stylesheets: Iterable[str] = ()) -> str:
+        """
+        Renderiza `html` em `output_pdf`, aplicando `stylesheets`.
+
+        Returns:
+            Nome do backend que gerou o PDF
+
+        Raises:
+            ExportError: Se todos os backends falharem (mensagens de cada tentativa)
+        """
+        output_pdf.parent.mkdir(parents=True, exist_ok=True)
+        stylesheets = tuple(stylesheets)
+        tried: list[str] = []
+        with self._lock:
+            for name in (self.backend, *(n for n in self._names if n != self.backend)):
+                render_fn = self._load(name)
+                if render_fn is None:
+                    continue
+                try:
+                    render_fn(html, output_pdf, stylesheets)
+                    return name
+                except Exception as e:
+                    tried.append(f"{name}: {e}")
+        raise ExportError(f"Nenhum backend conseguiu gerar o PDF ({'; '.join(tried)})")
+
+    def _load(self, name: str) -> Callable | None:
+        # Carrega um backend uma única vez; a indisponibilidade também fica registrada
+        if name not in self._loaded and name not in self._unavailable:
+            try:
+                self._loaded[name] = _BACKEND_LOADERS[name]()
+            except KeyError:
+                self._unavailable[name] = "backend desconhecido"
+            except Exception as e:
+                self._unavailable[name] = str(e)
+        return self._loaded.get(name)
+
+
+_renderer: PdfRenderer | None = None
+_renderer_lock = threading.Lock()
+
 
-def _html_to_pdf_weasyprint(html: str, output_pdf: Path) -> None:
+def get_renderer() -> PdfRenderer:
+    """
+    Retorna o renderizador compartilhado do processo (criado na primeira chamada).
+
+    Se nenhum backend estiver disponível, a detecção é refeita na chamada
+    seguinte (ex: backend instalado com o daemon ou o watch em execução).
+    """
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = PdfRenderer()
+    return _renderer
+
+
+class WeasyprintContext:
+    """
+    Estado do weasyprint reaproveitado entre documentos.
+
+    Mantém uma única `FontConfiguration` e as folhas de estilo já analisadas
+    (objetos `CSS`, indexados pelo texto do CSS): cada PDF apenas as
+    referencia, sem reanalisar `BASE_STYLE`/`PITCH_CSS` nem refazer a
+    descoberta de fontes.
+    """
+
+    def __init__(self, preload: Iterable[str] = ()):
+        from weasyprint import CSS, HTML  # type: ignore
+        try:
+            from weasyprint.text.fonts import FontConfiguration  # type: ignore
+        except ImportError:  # weasyprint < 53
+            from weasyprint.fonts import FontConfiguration  # type: ignore
+
+        self._html_cls, self._css_cls = HTML, CSS
+        self.font_config = FontConfiguration()
+        self._stylesheets: dict[str, object] = {}
+        for css in preload:
+            self.stylesheet(css)
+
+    def stylesheet(self, css: str):
+        """Objeto `CSS` de `css`, analisado na primeira vez e reaproveitado depois."""
+        sheet = self._stylesheets.get(css)
+        if sheet is None:
+            sheet = self._stylesheets[css] = self._css_cls(string=css, font_config=self.font_config)
+        return sheet
+
+    def render(self, html: str, output_pdf: Path, stylesheets: Iterable[str] = ()) -> None:
+        """Renderiza `html` aplicando as folhas (texto CSS) já analisadas e as fontes compartilhadas."""
+        self._html_cls(string=html).write_pdf(
+            str(output_pdf),
+            stylesheets=[self.stylesheet(css) for css in stylesheets],
+            font_config=self.font_config,
+        )
+
+
+def inline_stylesheets(html: str, stylesheets: Iterable[str]) -> str:
+    """Insere as folhas como blocos `<style>` no `<head>` (backends sem folhas externas)."""
+    blocks = "".join(f"<style>{css}</style>" for css in stylesheets)
+    if not blocks:
+        return html
+    head_end = html.find("</head>")
+    if head_end < 0:
+        return f"<head>{blocks}</head>{html}"
+    return html[:head_end] + blocks + html[head_end:]
+
+
+def _load_weasyprint():
     try:
-        from weasyprint import HTML  # type: ignore
+        context = WeasyprintContext(preload=(BASE_STYLE, PITCH_CSS))
     except Exception as e:  # pragma: no cover
         raise MissingDependencyError("weasyprint não disponível") from e
-    output_pdf.parent.mkdir(parents=True, exist_ok=True)
-    HTML(string=html).write_pdf(str(output_pdf))
+    return context.render
 
 
-def _html_to_pdf_pdfkit(html: str, output_pdf: Path) -> None:
+def _load_pdfkit():
     try:
         import pdfkit  # type: ignore
     except Exception as e:  # pragma: no cover
         raise MissingDependencyError("pdfkit não disponível") from e
-    output_pdf.parent.mkdir(parents=True, exist_ok=True)
-    pdfkit.from_string(html, str(output_pdf))
+    # Falha já na detecção se o binário wkhtmltopdf não existir
+    configuration = pdfkit.configuration()
 
+    def render(html: str, output_pdf: Path, stylesheets: Iterable[str] = ()) -> None:
+        pdfkit.from_string(inline_stylesheets(html, stylesheets), str(output_pdf), configuration=configuration)
+    return render
 
-def _html_to_pdf_wkhtmltopdf_cli(html: str, output_pdf: Path) -> None:
+
+def _load_wkhtmltopdf_cli():
     """Fallback direto usando o binário wkhtmltopdf, sem depender do pacote pdfkit.
 
-    Requer que `wkhtmltopdf` esteja disponível no PATH.
+    Requer que `wkhtmltopdf` esteja disponível no PATH. O HTML é enviado por
+    stdin, sem arquivo temporário.
     """
     exe = shutil.which("wkhtmltopdf")
     if not exe:
         raise MissingDependencyError("wkhtmltopdf não encontrado no PATH")
-    output_pdf.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".html", delete=False, encoding="utf-8") as tmp:
-        tmp.write(html)
-        tmp_path = tmp.name
-    # Executa o binário
-    try:
-        subprocess.run([exe, tmp_path, str(output_pdf)], check=True, capture_output=True)
-    finally:
-        try:
-            Path(tmp_path).unlink(missing_ok=True)
-        except Exception:
-            pass
 
+    def render(html: str, output_pdf: Path, stylesheets: Iterable[str] = ()) -> None:
+        subprocess.run(
+            [exe, "--quiet", "-", str(output_pdf)],
+            input=inline_stylesheets(html, stylesheets).encode("utf-8"),
+            check=True,
+            capture_output=True,
+        )
+    return render
+
+
+_BACKEND_LOADERS = {
+    "weasyprint": _load_weasyprint,
+    "pdfkit": _load_pdfkit,
+    "wkhtmltopdf": _load_wkhtmltopdf_cli,
+}
 
-def export_pdf(input_md: Path, output_pdf: Path | None = None) -> Path:
+
+def export_pdf(
+    input_md: Path | MarkdownDocument,
+    output_pdf: Path | None = None,
+    manifest: ExportManifest | None = None,
+    force: bool = False,
+) -> Path:
     """
-    Exporta arquivo Markdown para PDF usando weasyprint ou pdfkit.
+    Exporta arquivo Markdown para PDF usando o renderizador compartilhado
+    (weasyprint, pdfkit ou wkhtmltopdf, carregados uma vez por processo; se o
+    backend preferido falhar, tenta os seguintes).
 
     Args:
-        input_md: Caminho do arquivo .md de entrada
+        input_md: Caminho do arquivo .md de entrada ou documento já carregado
         output_pdf: Caminho opcional do .pdf de saída
+        manifest: Manifesto incremental; se informado, saídas inalteradas são puladas
+        force: Se True, exporta mesmo que o manifesto indique saída atualizada
 
     Returns:
         Path do arquivo PDF gerado
 
     Raises:
-        ExportError: Se nenhum backend de PDF estiver disponível
+        ExportError: Se nenhum backend de PDF estiver disponível ou todos falharem
         InvalidInputError: Se o arquivo de entrada não existir
     """
-    text = read_text(input_md)
-    body = md_to_html_basic(text)
-    html = wrap_html(title=input_md.stem, body_html=body)
+    started = time.perf_counter()
+    doc = load_document(input_md)
+    input_md = doc.path
     out_path = output_pdf or default_output_for_md(input_md, OUTPUT_DIR, ".pdf")
 
-    # Tenta conversores em ordem
-    tried: list[str] = []
     try:
-        _html_to_pdf_weasyprint(html, out_path)
-        log_export(f"PDF exportado (weasyprint): {input_md} -> {out_path}")
+        renderer = get_renderer()
+    except MissingDependencyError as e:
+        log_export(f"FALHA ao exportar PDF: {input_md} -> {out_path} ({e})", level=logging.ERROR)
+        raise ExportError(
+            "Nenhum backend de PDF disponível. Instale 'weasyprint' ou 'pdfkit+wkhtmltopdf'."
+        ) from e
+
+    # Saída gerada por um backend de fallback é refeita: o preferido ganha nova chance
+    if manifest and not force and manifest.should_skip(
+        out_path, doc.content_hash, STYLE_VERSION, backend=renderer.backend
+    ):
+        log_export(f"PDF inalterado (pulado): {input_md} -> {out_path}")
         return out_path
-    except Exception as e:
-        tried.append(f"weasyprint: {e}")
+
+    # CSS à parte: o weasyprint reaproveita BASE_STYLE já analisado entre documentos
+    html = wrap_html(title=doc.title, body_html=doc.body_html, inline_css=False)
     try:
-        _html_to_pdf_pdfkit(html, out_path)
-        log_export(f"PDF exportado (pdfkit): {input_md} -> {out_path}")
-        return out_path
+        with stage("render"):
+            backend = renderer.render(html, out_path, stylesheets=(BASE_STYLE,))
     except Exception as e:
-        tried.append(f"pdfkit: {e}")
+        log_export(f"FALHA ao exportar PDF: {input_md} -> {out_path} ({e})", level=logging.ERROR)
+        raise ExportError(f"Falha ao renderizar PDF: {e}") from e
+
+    if manifest:
+        manifest.record(out_path, input_md, doc.content_hash, STYLE_VERSION, backend=backend)
+    log_export(
+        f"PDF exportado ({backend}): {input_md} -> {out_path}",
+        **export_metrics("pdf", doc, out_path, started, backend=backend),
+    )
+    return out_path
+
+
+def document_heading(doc: MarkdownDocument) -> str:
+    """Primeiro título do Markdown (entrada do sumário do pacote), ou o nome do arquivo."""
+    match = _FIRST_HEADING_RE.search(doc.text)
+    return match.group(1) if match else doc.title
+
+
+def is_pitch(doc: MarkdownDocument) -> bool:
+    """Artefatos `pitch*.md` entram no pacote como slide, com `PITCH_CSS`."""
+    return doc.path.stem.lower().startswith("pitch")
+
+
+def render_bundle_html(docs: list[MarkdownDocument], title: str = BUNDLE_TITLE) -> str:
+    """
+    HTML único do pacote: capa com sumário e cada artefato numa seção iniciada em nova página.
+
+    O CSS não vai inline; ver `bundle_stylesheets`.
+    """
+    entries: list[str] = []
+    parts: list[str] = []
+    for n, doc in enumerate(docs, 1):
+        anchor = f"artefato-{n}"
+        entries.append(f"<li><a href=\"#{anchor}\">{html_lib.escape(document_heading(doc))}</a></li>")
+        body = doc.body_html
+        if is_pitch(doc):
+            body = f"<div class=\"slide\">\n{body}\n</div>"
+        parts.append(f"<section class=\"bundle-part\" id=\"{anchor}\">\n{body}\n</section>")
+    cover = (
+        f"<header class=\"bundle-cover\">\n<h1>{html_lib.escape(title)}</h1>\n"
+        "<nav class=\"bundle-toc\">\n<h2>Sumário</h2>\n<ol>\n" + "\n".join(entries) + "\n</ol>\n</nav>\n</header>"
+    )
+    return wrap_html(title=html_lib.escape(title), body_html=cover + "\n" + "\n".join(parts), inline_css=False)
+
+
+def bundle_stylesheets(docs: list[MarkdownDocument]) -> tuple[str, ...]:
+    """Folhas do pacote: `BASE_STYLE`, `PITCH_CSS` (se houver pitch) e `BUNDLE_CSS`."""
+    pitch = (PITCH_CSS,) if any(is_pitch(doc) for doc in docs) else ()
+    return (BASE_STYLE, *pitch, BUNDLE_CSS)
+
+
+def export_pdf_bundle(
+    inputs: Iterable[Path | MarkdownDocument],
+    output_pdf: Path | None = None,
+    title: str = BUNDLE_TITLE,
+    manifest: ExportManifest | None = None,
+    force: bool = False,
+) -> Path:
+    """
+    Exporta vários artefatos num único PDF, numa única chamada ao backend.
+
+    Os documentos são concatenados em um HTML com capa, sumário (paginado no
+    weasyprint) e quebra de página entre artefatos, na ordem recebida; o custo
+    de inicialização do backend e de carga de fontes é pago uma vez pelo pacote.
+
+    Args:
+        inputs: Arquivos .md (ou documentos já carregados), na ordem do pacote
+        output_pdf: Caminho do .pdf de saída (padrão: `OUTPUT_DIR/pacote.pdf`)
+        title: Título da capa e do documento
+        manifest: Manifesto incremental; o pacote é pulado se nenhum artefato, a ordem e o título mudaram
+        force: Se True, exporta mesmo que o manifesto indique saída atualizada
+
+    Returns:
+        Path do arquivo PDF gerado
+
+    Raises:
+        ExportError: Se nenhum backend de PDF estiver disponível ou a renderização falhar
+        InvalidInputError: Se nenhum artefato for informado ou algum não existir
+    """
+    started = time.perf_counter()
+    docs = [load_document(source) for source in inputs]
+    if not docs:
+        raise InvalidInputError("Nenhum artefato informado para o pacote PDF")
+    out_path = output_pdf or OUTPUT_DIR / BUNDLE_OUTPUT_NAME
+    sources = ", ".join(str(doc.path) for doc in docs)
+
     try:
-        _html_to_pdf_wkhtmltopdf_cli(html, out_path)
-        log_export(f"PDF exportado (wkhtmltopdf CLI): {input_md} -> {out_path}")
+        renderer = get_renderer()
+    except MissingDependencyError as e:
+        log_export(f"FALHA ao exportar pacote PDF: {sources} -> {out_path} ({e})", level=logging.ERROR)
+        raise ExportError(
+            "Nenhum backend de PDF disponível. Instale 'weasyprint' ou 'pdfkit+wkhtmltopdf'."
+        ) from e
+
+    # Hash do pacote: título, ordem e conteúdo de cada artefato
+    bundle_hash = content_hash("\0".join([title, *(f"{doc.path}\0{doc.content_hash}" for doc in docs)]))
+    if manifest and not force and manifest.should_skip(
+        out_path, bundle_hash, BUNDLE_STYLE_VERSION, backend=renderer.backend
+    ):
+        log_export(f"Pacote PDF inalterado (pulado): {sources} -> {out_path}")
         return out_path
+
+    html = render_bundle_html(docs, title)
+    try:
+        with stage("render"):
+            backend = renderer.render(html, out_path, stylesheets=bundle_stylesheets(docs))
     except Exception as e:
-        tried.append(f"wkhtmltopdf: {e}")
+        log_export(f"FALHA ao exportar pacote PDF: {sources} -> {out_path} ({e})", level=logging.ERROR)
+        raise ExportError(f"Falha ao renderizar pacote PDF: {e}") from e
 
-    # Fallback: registra erro e aborta
-    details = "; ".join(tried)
-    log_export(f"FALHA ao exportar PDF: {input_md} -> {out_path} ({details})")
-    raise ExportError(
-        "Nenhum backend de PDF disponível. Instale 'weasyprint' ou 'pdfkit+wkhtmltopdf'."
+    if manifest:
+        manifest.record(out_path, docs[0].path, bundle_hash, BUNDLE_STYLE_VERSION, backend=backend)
+    log_export(
+        f"Pacote PDF exportado ({backend}, {len(docs)} artefato(s)): {sources} -> {out_path}",
+        **export_metrics(
+            "pdf", docs[0], out_path, started, backend=backend,
+            source=sources, bytes_in=sum(doc.size_bytes for doc in docs), documents=len(docs),
+        ),
     )
+    return out_path
 
 
 def main() -> int:
     ap = argparse.ArgumentParser(description="MDD Publisher - Exportar Markdown para PDF")
-    ap.add_argument("--input", required=True, help="Caminho do arquivo .md de entrada")
+    ap.add_argument("--input", required=True, nargs="+", help="Caminho do arquivo .md de entrada (vários com --bundle)")
     ap.add_argument("--output", required=False, help="Caminho do .pdf de saída")
+    ap.add_argument("--bundle", action="store_true", help="Junta os --input num único PDF com sumário (um artefato por seção)")
+    ap.add_argument("--title", default=BUNDLE_TITLE, help=f"Título do pacote com --bundle (padrão: {BUNDLE_TITLE})")
     args = ap.parse_args()
 
-    in_path = Path(args.input)
-    if not in_path.exists():
-        print(f"[ERRO] Arquivo de entrada não encontrado: {in_path}", file=sys.stderr)
-        return 2
+    if len(args.input) > 1 and not args.bundle:
+        ap.error("vários --input exigem --bundle")
+    in_paths = [Path(p) for p in args.input]
+    for in_path in in_paths:
+        if not in_path.exists():
+            print(f"[ERRO] Arquivo de entrada não encontrado: {in_path}", file=sys.stderr)
+            return 2
     out_path = Path(args.output) if args.output else None
     try:
-        final_path = export_pdf(in_path, out_path)
+        if args.bundle:
+            final_path = export_pdf_bundle(in_paths, out_path, title=args.title)
+        else:
+            final_path = export_pdf(in_paths[0], out_path)
         print(str(final_path))
         return 0
     except ExportError as ee:
         print(f"[ERRO] {ee}", file=sys.stderr)
         return 1
     except Exception as exc:
-        log_export(f"FALHA ao exportar PDF: {in_path} - {exc}")
+        log_export(f"FALHA ao exportar PDF: {', '.join(args.input)} - {exc}", level=logging.ERROR)
         print(f"[ERRO] Falha ao exportar PDF: {exc}", file=sys.stderr)
         return 1
 
@@ -5,13 +5,19 @@ Renderiza `project/docs/pitch_deck.md` em HTML específico de pitch.
 Uso:
   python symbiotas/mdd_publisher/scripts/export_pitch_html.py \
          --input project/docs/pitch_deck.md \
-         [--output project/output/docs/pitch_deck.html]
+         [--output project/output/docs/pitch_deck.html] [--css linked]
+
+Com `--css linked`, `BASE_STYLE` e `PITCH_CSS` viram folhas compartilhadas
+(`assets/base.<hash>.css` e `assets/pitch.<hash>.css`), referenciadas pela página.
 """
 from __future__ import annotations
 
 import argparse
+import logging
 import sys
+import time
 from pathlib import Path
+from typing import Iterable
 
 SCRIPT_DIR = Path(__file__).parent
 UTILS_DIR = SCRIPT_DIR / "utils"
@@ -19,12 +25,24 @@ if str(UTILS_DIR) not in sys.path:
     sys.path.insert(0, str(UTILS_DIR))
 
 from helpers import (
+    BASE_STYLE,
+    ExportError,
+    MarkdownDocument,
+    export_metrics,
+    load_document,
     log_export,
-    md_to_html_basic,
-    read_text,
     wrap_html,
     write_text,
 )
+from manifest import ExportManifest, style_version
+from stylesheets import CSS_MODES, publish_stylesheet, shared_assets_dir, stylesheet_href
+
+# Importa configuração centralizada
+try:
+    from config import CSS_MODE, OUTPUT_DIR
+except ImportError:
+    CSS_MODE = "inline"
+    OUTPUT_DIR = Path("project/output/docs")
 
 PITCH_CSS = """
 /* Estilos básicos focados em apresentação de pitch */
@@ -34,16 +52,49 @@ body { background: #ffffff; color: #0d1117; }
 .cta { display: inline-block; margin-top: 1rem; background: #2b70c9; color: #fff; padding: .6rem 1rem; border-radius: 8px; }
 """.strip()
 
+STYLE_VERSION = style_version("pitch", BASE_STYLE, PITCH_CSS)
+# Por modo de CSS: trocar de modo regrava as páginas
+STYLE_VERSIONS = {"inline": STYLE_VERSION, "linked": style_version("pitch", BASE_STYLE, PITCH_CSS, "linked")}
+
 
-def export_pitch_html(input_md: Path, output_html: Path | None = None) -> Path:
-    text = read_text(input_md)
-    body = md_to_html_basic(text)
+def render_pitch_html(doc: MarkdownDocument, css_links: Iterable[str] = ()) -> str:
+    """HTML do pitch (slide com `PITCH_CSS`) de um documento, sem gravar em disco; com `css_links`, CSS referenciado."""
     # Simples: encapsula em um container .slide
-    slide_wrapped = f"<div class=\"slide\">\n{body}\n</div>"
-    html = wrap_html(title="Pitch de Valor", body_html=slide_wrapped, extra_css=PITCH_CSS)
+    slide_wrapped = f"<div class=\"slide\">\n{doc.body_html}\n</div>"
+    if css_links:
+        return wrap_html(title="Pitch de Valor", body_html=slide_wrapped, inline_css=False, css_links=css_links)
+    return wrap_html(title="Pitch de Valor", body_html=slide_wrapped, extra_css=PITCH_CSS)
+
+
+def export_pitch_html(
+    input_md: Path | MarkdownDocument,
+    output_html: Path | None = None,
+    manifest: ExportManifest | None = None,
+    force: bool = False,
+    css: str = CSS_MODE,
+) -> Path:
+    if css not in CSS_MODES:
+        raise ExportError(f"Modo de CSS inválido: {css} (use {' ou '.join(CSS_MODES)})")
+    started = time.perf_counter()
+    doc = load_document(input_md)
     out_path = output_html or Path("project/output/docs/pitch_deck.html")
+    css_links: list[str] = []
+    if css == "linked":
+        # Mesma `base.<hash>.css` das demais páginas; o pitch só acrescenta a sua
+        assets = shared_assets_dir(out_path, OUTPUT_DIR)
+        css_links = [
+            stylesheet_href(publish_stylesheet(BASE_STYLE, assets, "base"), out_path),
+            stylesheet_href(publish_stylesheet(PITCH_CSS, assets, "pitch"), out_path),
+        ]
+    style = STYLE_VERSIONS[css]
+    if manifest and not force and manifest.should_skip(out_path, doc.content_hash, style):
+        log_export(f"Pitch HTML inalterado (pulado): {doc.path} -> {out_path}")
+        return out_path
+    html = render_pitch_html(doc, css_links)
     write_text(out_path, html)
-    log_export(f"Pitch HTML exportado: {input_md} -> {out_path}")
+    if manifest:
+        manifest.record(out_path, doc.path, doc.content_hash, style, backend="html")
+    log_export(f"Pitch HTML exportado: {doc.path} -> {out_path}", **export_metrics("pitch", doc, out_path, started))
     return out_path
 
 
@@ -51,6 +102,7 @@ def main() -> int:
     ap = argparse.ArgumentParser(description="MDD Publisher - Exportar Pitch Deck para HTML")
     ap.add_argument("--input", required=True, help="Caminho do arquivo pitch_deck.md")
     ap.add_argument("--output", required=False, help="Caminho do .html de saída")
+    ap.add_argument("--css", choices=CSS_MODES, default=CSS_MODE, help=f"CSS embutido ou folhas compartilhadas com hash (padrão: {CSS_MODE})")
     args = ap.parse_args()
 
     in_path = Path(args.input)
@@ -59,11 +111,11 @@ def main() -> int:
         return 2
     out_path = Path(args.output) if args.output else None
     try:
-        final_path = export_pitch_html(in_path, out_path)
+        final_path = export_pitch_html(in_path, out_path, css=args.css)
         print(str(final_path))
         return 0
     except Exception as exc:
-        log_export(f"FALHA ao exportar Pitch HTML: {in_path} - {exc}")
+        log_export(f"FALHA ao exportar Pitch HTML: {in_path} - {exc}", level=logging.ERROR)
         print(f"[ERRO] Falha ao exportar Pitch HTML: {exc}", file=sys.stderr)
         return 1
 
@@ -7,14 +7,38 @@ Mapeamento padrão:
   site_B.md -> output/sites/site_02/index.html
   site_C.md -> output/sites/site_03/index.html
 
+Mapeamento configurável (N variantes x M templates) via `--mapping` ou
+`<input-dir>/mapping.json`:
+  {
+    "variants": ["site_A.md", "site_B.md"],
+    "templates": ["template_01", "template_02"],
+    "output": "{variant}_{template}",
+    "sites": [
+      {"source": "site_C.md", "template": "template_03", "output": "site_03"}
+    ]
+  }
+`variants` x `templates` gera todas as combinações (diretório de saída segundo
+`output`); `sites` lista combinações explícitas. As combinações são renderizadas
+em paralelo (`--jobs`), compartilhando cada template carregado.
+
 Uso:
   python symbiotas/mdd_publisher/scripts/export_site_html.py \
-         [--input-dir project/docs/sites] [--output-dir project/output/sites]
+         [--input-dir project/docs/sites] [--output-dir project/output/sites] \
+         [--mapping mapping.json] [--jobs 8] [--css linked]
+
+Com `--css linked`, o style.css de cada template é publicado uma única vez em
+`<output-dir>/assets/style.<hash>.css` e referenciado pelos sites que o usam,
+em vez de copiado para cada diretório de site.
 """
 from __future__ import annotations
 
 import argparse
+import json
+import logging
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
 SCRIPT_DIR = Path(__file__).parent
@@ -23,20 +47,83 @@ if str(UTILS_DIR) not in sys.path:
     sys.path.insert(0, str(UTILS_DIR))
 
 from helpers import log_export
-from template_engine import render_site
+from stylesheets import ASSETS_DIRNAME, CSS_MODES
+from template_engine import SiteTemplate, load_site_template, render_site
+from timing import TimingReport, collect_stages, note, profiled
+from tracing import span
 
 # Importa configuração centralizada
 try:
-    from config import PROJECT_ROOT
+    from config import CSS_MODE, PROJECT_ROOT
 except ImportError:
+    CSS_MODE = "inline"
     PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 
 
+# Mapeamento legado A/B/C: arquivo MD -> (template, diretório de saída)
+DEFAULT_MAPPING = {
+    "sites": [
+        {"source": "site_A.md", "template": "template_01", "output": "site_01"},
+        {"source": "site_B.md", "template": "template_02", "output": "site_02"},
+        {"source": "site_C.md", "template": "template_03", "output": "site_03"},
+    ]
+}
+DEFAULT_OUTPUT_PATTERN = "{variant}_{template}"
+
+
+@dataclass(frozen=True)
+class SiteJob:
+    """Uma combinação (variante, template) a renderizar."""
+    source: Path
+    template_dir: Path
+    output_dir: Path
+
+
+def load_site_mapping(
+    mapping: dict,
+    in_dir: Path,
+    out_dir: Path,
+    templates_base: Path,
+) -> list[SiteJob]:
+    """
+    Expande um mapeamento (ver docstring do módulo) em jobs de renderização.
+
+    Args:
+        mapping: Conteúdo do arquivo de mapeamento
+        in_dir: Diretório base dos .md de variantes
+        out_dir: Diretório base de saída
+        templates_base: Diretório base dos templates
+
+    Returns:
+        Lista de SiteJob, sem duplicatas, na ordem do mapeamento
+    """
+    jobs: list[SiteJob] = []
+    pattern = mapping.get("output", DEFAULT_OUTPUT_PATTERN)
+    for variant in mapping.get("variants", []):
+        for template in mapping.get("templates", []):
+            name = pattern.format(variant=Path(variant).stem, template=template)
+            jobs.append(SiteJob(in_dir / variant, templates_base / template, out_dir / name))
+    for site in mapping.get("sites", []):
+        template = site["template"]
+        name = site.get("output") or pattern.format(variant=Path(site["source"]).stem, template=template)
+        jobs.append(SiteJob(in_dir / site["source"], templates_base / template, out_dir / name))
+    return list(dict.fromkeys(jobs))
+
+
+def read_mapping_file(mapping_path: Path | None, in_dir: Path) -> dict:
+    """Lê o mapeamento de `mapping_path`, de `<in_dir>/mapping.json` ou usa o padrão A/B/C."""
+    path = mapping_path or in_dir / "mapping.json"
+    if mapping_path is None and not path.exists():
+        return DEFAULT_MAPPING
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
 def export_single(
     input_md: Path,
     site_dir: Path,
-    template_dir: Path,
-    strict_validation: bool = False
+    template_dir: Path | SiteTemplate,
+    strict_validation: bool = False,
+    css_dir: Path | None = None
 ) -> Path:
     """
     Exporta um único site usando template engine.
@@ -44,8 +131,9 @@ def export_single(
     Args:
         input_md: Arquivo .md com conteúdo e front matter
         site_dir: Diretório de saída (ex: project/output/sites/site_01/)
-        template_dir: Diretório do template HTML a usar
+        template_dir: Diretório do template HTML a usar (ou template já carregado)
         strict_validation: Se True, valida todas as variáveis obrigatórias
+        css_dir: Diretório compartilhado das folhas com hash (None = style.css ao lado do site)
 
     Returns:
         Path do arquivo index.html gerado
@@ -57,21 +145,113 @@ def export_single(
             md_path=input_md,
             template_dir=template_dir,
             output_path=out_path,
-            strict=strict_validation
+            strict=strict_validation,
+            css_dir=css_dir
+        )
+        note(
+            format="site",
+            source=str(input_md),
+            output=str(out_path),
+            backend=template_dir.name,
+            bytes_in=input_md.stat().st_size,
+            bytes_out=out_path.stat().st_size,
         )
         log_export(f"Site exportado com template: {input_md} -> {out_path}")
         return out_path
     except Exception as e:
-        log_export(f"ERRO ao exportar site {input_md}: {e}")
+        log_export(f"ERRO ao exportar site {input_md}: {e}", level=logging.ERROR)
         raise
 
 
+def export_sites(
+    site_jobs: list[SiteJob],
+    strict: bool = False,
+    jobs: int | None = None,
+    timings: bool = False,
+    profile_dir: Path | None = None,
+    css_dir: Path | None = None,
+) -> int:
+    """
+    Renderiza todas as combinações (variante, template) em um pool de threads.
+
+    Cada template é carregado uma única vez (HTML compilado, CSS e config) e
+    compartilhado por todas as variantes que o usam; com `css_dir`, também o
+    CSS de cada template é gravado uma única vez, nesse diretório.
+
+    Com `timings`, imprime ao final o resumo p50/p95 por estágio (leitura,
+    template, gravação); com `profile_dir`, grava um `.pstats` por site e
+    renderiza os sites um de cada vez (no Python 3.12+ o cProfile vale para o
+    processo inteiro e não admite dois perfis ativos ao mesmo tempo).
+
+    Returns:
+        0 se todas as renderizações tiverem sucesso, 1 caso contrário
+    """
+    templates: dict[Path, SiteTemplate] = {}
+    runnable: list[SiteJob] = []
+    for job in site_jobs:
+        if not job.source.exists():
+            log_export(f"Aviso: arquivo não encontrado (pular): {job.source}", level=logging.WARNING)
+            continue
+        if job.template_dir not in templates:
+            if not job.template_dir.exists():
+                log_export(f"AVISO: Template não encontrado {job.template_dir}, pulando {job.source.name}", level=logging.WARNING)
+                continue
+            try:
+                templates[job.template_dir] = load_site_template(job.template_dir)
+            except FileNotFoundError as exc:
+                log_export(f"AVISO: {exc}, pulando {job.source.name}", level=logging.WARNING)
+                continue
+        runnable.append(job)
+
+    report = TimingReport()
+
+    def run(job: SiteJob) -> tuple[SiteJob, Exception | None, tuple]:
+        profile = profile_dir / f"site-{job.output_dir.name}.pstats" if profile_dir else None
+        traced = span("job", cat="job", input=str(job.source), site=job.output_dir.name, template=job.template_dir.name)
+        started = time.perf_counter()
+        try:
+            with traced, collect_stages() as timer, profiled(profile):
+                export_single(
+                    input_md=job.source,
+                    site_dir=job.output_dir,
+                    template_dir=templates[job.template_dir],
+                    strict_validation=strict,
+                    css_dir=css_dir
+                )
+            return job, None, (timer.stages, timer.info, (time.perf_counter() - started) * 1000)
+        except Exception as exc:
+            return job, exc, ()
+
+    code = 0
+    if profile_dir:
+        jobs = 1
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for job, exc, sample in pool.map(run, runnable):
+            if timings and sample:
+                report.add(*sample)
+            if exc is None:
+                print(f"✓ {job.source.name} renderizado com sucesso usando {job.template_dir.name} -> {job.output_dir.name}")
+            else:
+                log_export(f"FALHA ao exportar site {job.source}: {exc}", level=logging.ERROR)
+                print(f"✗ Erro ao exportar {job.source.name} ({job.template_dir.name}): {exc}", file=sys.stderr)
+                code = 1
+
+    if timings:
+        print("\n" + report.format_summary())
+    return code
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(description="MDD Publisher - Exportar sites A/B/C para HTML com templates")
     ap.add_argument("--input-dir", default="project/docs/sites", help="Diretório com os .md")
     ap.add_argument("--output-dir", default="project/output/sites", help="Diretório base de saída")
     ap.add_argument("--templates-dir", default="process/templates/site_templates", help="Diretório com templates HTML")
     ap.add_argument("--strict", action="store_true", help="Validar variáveis obrigatórias")
+    ap.add_argument("--mapping", help="Arquivo JSON de mapeamento variantes x templates (padrão: <input-dir>/mapping.json ou A/B/C)")
+    ap.add_argument("--jobs", type=int, default=None, help="Número de threads de renderização")
+    ap.add_argument("--timings", action="store_true", help="Resumo p50/p95 do tempo por estágio")
+    ap.add_argument("--profile", metavar="DIR", help="Grava um cProfile (.pstats) por site em DIR")
+    ap.add_argument("--css", choices=CSS_MODES, default=CSS_MODE, help=f"style.css por site ou folha compartilhada com hash em <output-dir>/{ASSETS_DIRNAME} (padrão: {CSS_MODE})")
     args = ap.parse_args()
 
     in_dir = Path(args.input_dir)
@@ -82,48 +262,21 @@ def main() -> int:
         print(f"[ERRO] Diretório de entrada não encontrado: {in_dir}", file=sys.stderr)
         return 2
 
-    # Mapeamento: arquivo MD -> diretório de saída + template a usar
-    mapping = {
-        "site_A.md": {
-            "output_dir": out_dir / "site_01",
-            "template": templates_base / "template_01"
-        },
-        "site_B.md": {
-            "output_dir": out_dir / "site_02",
-            "template": templates_base / "template_02"
-        },
-        "site_C.md": {
-            "output_dir": out_dir / "site_03",
-            "template": templates_base / "template_03"
-        },
-    }
-
-    code = 0
-    for fname, config in mapping.items():
-        src = in_dir / fname
-        if not src.exists():
-            log_export(f"Aviso: arquivo não encontrado (pular): {src}")
-            continue
-
-        template_dir = config["template"]
-        if not template_dir.exists():
-            log_export(f"AVISO: Template não encontrado {template_dir}, pulando {fname}")
-            continue
-
-        try:
-            export_single(
-                input_md=src,
-                site_dir=config["output_dir"],
-                template_dir=template_dir,
-                strict_validation=args.strict
-            )
-            print(f"✓ {fname} renderizado com sucesso usando {template_dir.name}")
-        except Exception as exc:
-            log_export(f"FALHA ao exportar site {src}: {exc}")
-            print(f"✗ Erro ao exportar {fname}: {exc}", file=sys.stderr)
-            code = 1
+    try:
+        mapping = read_mapping_file(Path(args.mapping) if args.mapping else None, in_dir)
+        site_jobs = load_site_mapping(mapping, in_dir, out_dir, templates_base)
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"[ERRO] Mapeamento de sites inválido: {exc}", file=sys.stderr)
+        return 2
 
-    return code
+    return export_sites(
+        site_jobs,
+        strict=args.strict,
+        jobs=args.jobs,
+        timings=args.timings,
+        profile_dir=Path(args.profile) if args.profile else None,
+        css_dir=out_dir / ASSETS_DIRNAME if args.css == "linked" else None,
+    )
 
 
 if __name__ == "__main__":
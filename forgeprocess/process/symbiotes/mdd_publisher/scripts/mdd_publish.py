@@ -10,12 +10,49 @@ Uso:
     --input project/docs/visao.md \\
     --format html
 
+Modo lote (todos os .md de um diretório, em paralelo):
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py \\
+    --input-dir project/docs --format all --jobs 4
+
+Validação de schema durante a exportação (resultados em cache por hash):
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py \\
+    --input project/docs/visao.md --format all --validate [--strict]
+
+Pacote PDF (vários artefatos num único PDF, com sumário):
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py \\
+    --input-dir project/docs --glob "*.md" --format pdf --bundle
+
+Daemon residente (evita reiniciar o interpretador a cada exportação):
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py serve
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py --daemon \\
+    --input project/docs/visao.md --format pdf
+
+Modo watch (reexporta apenas os alvos afetados a cada alteração):
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py watch --format all
+
+Linha do tempo do lote (Chrome trace-event, abre em chrome://tracing ou Perfetto):
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py \\
+    --input-dir project/docs --format all --trace project/output/trace.json
+
+CSS compartilhado (folhas com hash em assets/, em vez de <style> em cada página):
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py \\
+    --input-dir project/docs --format html --css linked
+
+Pré-visualização local (renderiza em memória, sem gravar em project/output):
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py preview --port 8000
+
 Formatos suportados: html, pdf, docx, pitch, sites
 """
 from __future__ import annotations
 
 import argparse
+import hashlib
+import importlib
+import logging
+import os
 import sys
+import time
+from concurrent.futures import as_completed
 from pathlib import Path
 
 SCRIPT_DIR = Path(__file__).parent
@@ -23,64 +60,181 @@ UTILS_DIR = SCRIPT_DIR / "utils"
 if str(UTILS_DIR) not in sys.path:
     sys.path.insert(0, str(UTILS_DIR))
 
-from helpers import log_export
+from helpers import (
+    MarkdownDocument,
+    configure_logging,
+    get_output_resolver,
+    load_document,
+    log_export,
+)
+from manifest import ExportManifest, ValidationCache
+from stylesheets import CSS_MODES
+from timing import TimingReport, collect_stages, profiled, stage
+from tracing import Tracer, clock_us, span, tracing
+from validators import ValidationResult, validate_document
+from worker_pool import PublisherPool, WorkerCrashedError
+
+# Importa configuração centralizada
+try:
+    from config import (
+        CSS_MODE,
+        DAEMON_SOCKET,
+        DOCS_DIR,
+        MANIFEST_FILE,
+        OUTPUT_DIR,
+        OUTPUT_SITES_DIR,
+        PROFILES_DIR,
+        SUPPORTED_INPUT_EXTENSIONS,
+        TEMPLATES_DIR,
+        TRACE_FILE,
+        VALIDATION_CACHE_FILE,
+        WORKER_MAX_JOBS,
+        WORKER_MAX_RSS_MB,
+    )
+except ImportError:
+    CSS_MODE = "inline"
+    DAEMON_SOCKET = Path("project/output/mdd_publisher.sock")
+    DOCS_DIR = Path("project/docs")
+    OUTPUT_DIR = Path("project/output/docs")
+    OUTPUT_SITES_DIR = Path("project/output/sites")
+    PROFILES_DIR = Path("project/output/profiles")
+    TEMPLATES_DIR = Path("process/templates")
+    TRACE_FILE = Path("project/output/trace.json")
+    MANIFEST_FILE = Path("project/output/export_manifest.json")
+    SUPPORTED_INPUT_EXTENSIONS = [".md", ".markdown"]
+    VALIDATION_CACHE_FILE = Path("project/output/validation_cache.json")
+    WORKER_MAX_JOBS = 200
+    WORKER_MAX_RSS_MB = 1024
+
+# Formatos aceitos no modo lote: formato -> (módulo, função exportadora)
+BATCH_EXPORTERS: dict[str, tuple[str, str]] = {
+    "html": ("export_html", "export_html"),
+    "pdf": ("export_pdf", "export_pdf"),
+    "docx": ("export_docx", "export_docx"),
+    "pitch": ("export_pitch_html", "export_pitch_html"),
+}
+
+# Saída padrão de cada formato no modo lote: (raiz de saída, extensão).
+# Pitch tem saída fixa por padrão; no lote cada arquivo ganha a sua.
+BATCH_TARGETS: dict[str, tuple[Path, str]] = {
+    "html": (OUTPUT_DIR, ".html"),
+    "pdf": (OUTPUT_DIR, ".pdf"),
+    "docx": (OUTPUT_DIR, ".docx"),
+    "pitch": (OUTPUT_DIR / "pitch", ".html"),
+}
+
+# Formatos HTML que aceitam `css` (embutido ou folhas compartilhadas com hash)
+CSS_FORMATS = ("html", "pitch")
 
 
-def export_html(input_path: Path, output_path: Path | None = None) -> int:
+def export_html(
+    input_path: Path | MarkdownDocument,
+    output_path: Path | None = None,
+    manifest: ExportManifest | None = None,
+    force: bool = False,
+    css: str = CSS_MODE,
+) -> int:
     """Exporta para HTML genérico."""
     from export_html import export_html as _export_html
     try:
-        result = _export_html(input_path, output_path)
-        print(f"✓ HTML gerado: {result}")
+        result = _export_html(input_path, output_path, manifest=manifest, force=force, css=css)
+        _print_result("HTML", result, manifest)
         return 0
     except Exception as e:
         print(f"✗ Erro ao exportar HTML: {e}", file=sys.stderr)
         return 1
 
 
-def export_pdf(input_path: Path, output_path: Path | None = None) -> int:
+def export_pdf(
+    input_path: Path | MarkdownDocument,
+    output_path: Path | None = None,
+    manifest: ExportManifest | None = None,
+    force: bool = False,
+) -> int:
     """Exporta para PDF."""
     from export_pdf import export_pdf as _export_pdf
     try:
-        result = _export_pdf(input_path, output_path)
-        print(f"✓ PDF gerado: {result}")
+        result = _export_pdf(input_path, output_path, manifest=manifest, force=force)
+        _print_result("PDF", result, manifest)
         return 0
     except Exception as e:
         print(f"✗ Erro ao exportar PDF: {e}", file=sys.stderr)
         return 1
 
 
-def export_docx(input_path: Path, output_path: Path | None = None) -> int:
+def export_pdf_bundle(
+    input_paths: list[Path],
+    output_path: Path | None = None,
+    title: str | None = None,
+    manifest: ExportManifest | None = None,
+    force: bool = False,
+) -> int:
+    """Exporta vários artefatos num único PDF (pacote com sumário)."""
+    from export_pdf import BUNDLE_TITLE, export_pdf_bundle as _export_pdf_bundle
+    try:
+        result = _export_pdf_bundle(input_paths, output_path, title or BUNDLE_TITLE, manifest=manifest, force=force)
+        _print_result(f"Pacote PDF ({len(input_paths)} artefato(s))", result, manifest)
+        return 0
+    except Exception as e:
+        print(f"✗ Erro ao exportar pacote PDF: {e}", file=sys.stderr)
+        return 1
+
+
+def export_docx(
+    input_path: Path | MarkdownDocument,
+    output_path: Path | None = None,
+    manifest: ExportManifest | None = None,
+    force: bool = False,
+) -> int:
     """Exporta para DOCX."""
     from export_docx import export_docx as _export_docx
     try:
-        result = _export_docx(input_path, output_path)
-        print(f"✓ DOCX gerado: {result}")
+        result = _export_docx(input_path, output_path, manifest=manifest, force=force)
+        _print_result("DOCX", result, manifest)
         return 0
     except Exception as e:
         print(f"✗ Erro ao exportar DOCX: {e}", file=sys.stderr)
         return 1
 
 
-def export_pitch(input_path: Path, output_path: Path | None = None) -> int:
+def export_pitch(
+    input_path: Path | MarkdownDocument,
+    output_path: Path | None = None,
+    manifest: ExportManifest | None = None,
+    force: bool = False,
+    css: str = CSS_MODE,
+) -> int:
     """Exporta pitch deck para HTML estilizado."""
     from export_pitch_html import export_pitch_html
     try:
-        result = export_pitch_html(input_path, output_path)
-        print(f"✓ Pitch HTML gerado: {result}")
+        result = export_pitch_html(input_path, output_path, manifest=manifest, force=force, css=css)
+        _print_result("Pitch HTML", result, manifest)
         return 0
     except Exception as e:
         print(f"✗ Erro ao exportar Pitch: {e}", file=sys.stderr)
         return 1
 
 
+def _print_result(label: str, result: Path, manifest: ExportManifest | None) -> None:
+    if manifest and result in manifest.skipped:
+        print(f"= {label} inalterado (pulado): {result}")
+    else:
+        print(f"✓ {label} gerado: {result}")
+
+
 def export_sites(
     input_dir: Path | None = None,
     output_dir: Path | None = None,
     templates_dir: Path | None = None,
-    strict: bool = False
+    strict: bool = False,
+    mapping: Path | None = None,
+    jobs: int | None = None,
+    timings: bool = False,
+    profile_dir: Path | None = None,
+    trace_file: Path | None = None,
+    css: str = CSS_MODE,
 ) -> int:
-    """Exporta sites A/B/C."""
+    """Exporta sites A/B/C (ou as combinações de um arquivo de mapeamento)."""
     from export_site_html import main as _export_sites_main
 
     # Constrói argumentos para o main
@@ -93,17 +247,476 @@ def export_sites(
         args_list.extend(["--templates-dir", str(templates_dir)])
     if strict:
         args_list.append("--strict")
+    if mapping:
+        args_list.extend(["--mapping", str(mapping)])
+    if jobs:
+        args_list.extend(["--jobs", str(jobs)])
+    if timings:
+        args_list.append("--timings")
+    if profile_dir:
+        args_list.extend(["--profile", str(profile_dir)])
+    args_list.extend(["--css", css])
 
-    # Injeta argumentos e executa
+    # Injeta argumentos e executa (as threads do pool de sites usam o mesmo tracer)
     original_argv = sys.argv
+    with tracing(trace_file is not None) as tracer:
+        try:
+            sys.argv = ["export_site_html.py"] + args_list
+            return _export_sites_main()
+        finally:
+            sys.argv = original_argv
+            if tracer is not None:
+                write_trace(tracer, trace_file)
+
+
+def write_trace(tracer: Tracer, trace_file: Path) -> None:
+    """Grava a linha do tempo e informa onde abri-la."""
+    tracer.write(trace_file)
+    print(f"Trace gravado em {trace_file} ({len(tracer.events)} trechos; abra em chrome://tracing ou https://ui.perfetto.dev)")
+
+
+def validate_loaded(doc: MarkdownDocument) -> ValidationResult:
+    """
+    Valida o documento já carregado, usando o cache em disco por hash de conteúdo.
+
+    Artefatos sem schema não são validados (resultado com `schema` None).
+    """
+    cache = ValidationCache.load(VALIDATION_CACHE_FILE)
+    result = validate_document(doc.text, doc.path, cache, doc.content_hash)
+    cache.save()
+    if result.schema is not None and cache.hits == 0:
+        log_export(f"Validação ({result.schema}): {doc.path} - {len(result.errors)} erro(s)", level=logging.WARNING)
+    return result
+
+
+def print_validation(source: str | Path, schema: str | None, errors: list[str]) -> None:
+    """Imprime o resultado de `validate_loaded` (nada para artefatos sem schema)."""
+    if schema is None:
+        return
+    if not errors:
+        print(f"✓ Validação OK ({schema}): {source}")
+        return
+    print(f"⚠ Validação falhou ({schema}): {source}", file=sys.stderr)
+    for error in errors:
+        print(f"  - {error}", file=sys.stderr)
+
+
+def collect_markdown_files(input_dir: Path, pattern: str = "**/*.md") -> list[Path]:
+    """Lista (ordenada) os arquivos Markdown de `input_dir` que casam com `pattern`."""
+    return sorted(
+        p for p in input_dir.glob(pattern)
+        if p.is_file() and p.suffix.lower() in SUPPORTED_INPUT_EXTENSIONS
+    )
+
+
+def profile_path(profile_dir: Path | str, md_path: Path | str, fmt: str) -> Path:
+    """Arquivo .pstats de um job (o hash do caminho distingue homônimos em subpastas)."""
+    digest = hashlib.sha1(str(Path(md_path).resolve()).encode("utf-8")).hexdigest()[:8]
+    return Path(profile_dir) / f"{Path(md_path).stem}-{digest}.{fmt}.pstats"
+
+
+def new_job_result(md_path: str, fmt: str, error: str | None = None) -> dict:
+    """Resultado inicial (ou de falha, com `error`) de um job; ver `run_export_job`."""
+    return {
+        "input": md_path, "format": fmt, "ok": False, "output": None,
+        "skipped": False, "error": error, "validation": None, "timings": None, "trace": None,
+    }
+
+
+def run_export_job(
+    md_path: str,
+    fmt: str,
+    output: str | None = None,
+    force: bool = False,
+    validate: bool = False,
+    strict: bool = False,
+    timings: bool = False,
+    profile_dir: str | None = None,
+    trace: bool = False,
+    css: str = CSS_MODE,
+) -> dict:
+    """
+    Executa um job (arquivo, formato) isolado: modo lote e daemon.
+
+    Recebe e devolve apenas tipos simples (serializáveis), pois roda em
+    processos do pool ou responde a clientes do daemon.
+
+    Com `validate`, o documento carregado é validado antes da exportação
+    (ver `validate_loaded`); com `strict`, um artefato inválido não é exportado.
+    Com `timings`, o resultado traz os tempos por estágio; com `profile_dir`,
+    o job é perfilado com cProfile (ver `profile_path`). Com `trace`, os
+    trechos do job (job, read, convert, render, write, log) são gravados num
+    tracer próprio e devolvidos para o processo principal (`Tracer.extend`).
+    `css` (inline/linked) vale apenas para os formatos HTML (`CSS_FORMATS`).
+
+    Returns:
+        Dicionário com input, format, ok, output, skipped, error, validation
+        ({"schema", "errors"} ou None), timings ({"stages", "info", "wall_ms"} ou None)
+        e trace (`Tracer.export()` ou None)
+    """
+    result = new_job_result(md_path, fmt)
+    profile = profile_path(profile_dir, md_path, fmt) if profile_dir else None
+    started = time.perf_counter()
+    with tracing(trace) as tracer, collect_stages() as timer, profiled(profile):
+        job_start = clock_us()
+        _run_export(result, md_path, fmt, output, force, validate, strict, css)
+        if tracer is not None:
+            tracer.complete("job", job_start, "job", {
+                "input": md_path, "format": fmt, "ok": result["ok"],
+                "skipped": result["skipped"], "error": result["error"],
+            })
+    if tracer is not None:
+        result["trace"] = tracer.export()
+    if timings:
+        result["timings"] = {
+            "stages": timer.stages,
+            "info": timer.info,
+            "wall_ms": (time.perf_counter() - started) * 1000,
+        }
+    return result
+
+
+def _run_export(
+    result: dict,
+    md_path: str,
+    fmt: str,
+    output: str | None,
+    force: bool,
+    validate: bool,
+    strict: bool,
+    css: str = CSS_MODE,
+) -> None:
+    """Corpo de `run_export_job`: preenche `result` com o desfecho da exportação."""
+    module_name, func_name = BATCH_EXPORTERS[fmt]
     try:
-        sys.argv = ["export_site_html.py"] + args_list
-        return _export_sites_main()
-    finally:
-        sys.argv = original_argv
+        exporter = getattr(importlib.import_module(module_name), func_name)
+        source: Path | MarkdownDocument = Path(md_path)
+        if validate:
+            source = load_document(source)
+            with stage("validate"):
+                checked = validate_loaded(source)
+            if checked.schema is not None:
+                result["validation"] = {"schema": checked.schema, "errors": checked.errors}
+            if strict and checked.errors:
+                result["error"] = f"Validação falhou ({checked.schema}): {'; '.join(checked.errors)}"
+                return
+        manifest = ExportManifest.load(MANIFEST_FILE)
+        options = {"css": css} if fmt in CSS_FORMATS else {}
+        out_path = exporter(source, Path(output) if output else None, manifest=manifest, force=force, **options)
+        manifest.save()
+        result.update(ok=True, output=str(out_path), skipped=out_path in manifest.skipped)
+    except Exception as e:
+        result["error"] = str(e)
+
+
+def export_batch(
+    files: list[Path],
+    formats: list[str],
+    jobs: int | None = None,
+    force: bool = False,
+    validate: bool = False,
+    strict: bool = False,
+    timings: bool = False,
+    profile_dir: Path | None = None,
+    trace_file: Path | None = None,
+    max_jobs_per_worker: int = WORKER_MAX_JOBS,
+    max_rss_mb: float = WORKER_MAX_RSS_MB,
+    css: str = CSS_MODE,
+) -> int:
+    """
+    Exporta vários arquivos em vários formatos usando um pool de processos.
+
+    Cada par (arquivo, formato) vira um job independente. Os workers
+    (`worker_pool.PublisherPool`) nascem com os backends pesados já importados
+    e são reciclados após `max_jobs_per_worker` jobs ou `max_rss_mb` de memória
+    residente. Ao final imprime um resumo agregado de sucessos e falhas.
+
+    Args:
+        files: Arquivos .md a exportar
+        formats: Formatos de saída (chaves de BATCH_EXPORTERS)
+        jobs: Número de processos (padrão: número de CPUs)
+        force: Se True, ignora o manifesto incremental e reexporta tudo
+        validate: Se True, valida cada documento carregado (ver `run_export_job`)
+        strict: Com `validate`, não exporta artefatos inválidos
+        timings: Se True, imprime o resumo p50/p95 por estágio ao final
+        profile_dir: Se informado, grava um `.pstats` por job neste diretório
+        trace_file: Se informado, grava a linha do tempo do lote (Chrome trace-event)
+        max_jobs_per_worker: Jobs antes de reciclar um worker (0 = sem limite)
+        max_rss_mb: Memória residente (MB) acima da qual o worker é reciclado (0 = sem limite)
+        css: CSS das páginas HTML: "inline" ou "linked" (folhas compartilhadas com hash)
+
+    Returns:
+        0 se todos os jobs tiverem sucesso, 1 caso contrário
+    """
+    # Caminhos de saída calculados uma vez no processo principal
+    output_map = get_output_resolver().build_map(files, {fmt: BATCH_TARGETS[fmt] for fmt in formats})
+    # Fontes com o mesmo alvo (ex.: homônimos fora de DOCS_DIR, achatados para o
+    # nome do arquivo) seriam gravadas em paralelo e disputariam o manifesto
+    claimed: dict[Path, Path] = {}
+    conflicts = [
+        (out, claimed[out], f)
+        for f, outs in output_map.items() for out in outs.values()
+        if claimed.setdefault(out, f) != f
+    ]
+    if conflicts:
+        print(f"✗ {len(conflicts)} saída(s) em conflito no lote:", file=sys.stderr)
+        for out, first, other in conflicts:
+            print(f"  - {out}: {first} e {other}", file=sys.stderr)
+        return 1
+    tasks = [
+        (
+            str(f), fmt, str(output_map[f][fmt]), force, validate, strict,
+            timings, str(profile_dir) if profile_dir else None, trace_file is not None, css,
+        )
+        for f in files for fmt in formats
+    ]
+    if not tasks:
+        print("✗ Nenhum arquivo Markdown encontrado para exportar", file=sys.stderr)
+        return 1
+
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    print(f"Exportando {len(files)} arquivo(s) em {', '.join(formats)} ({len(tasks)} jobs, {jobs} processo(s))...\n")
+
+    results: list[dict] = []
+    with tracing(trace_file is not None) as tracer:
+        with span("batch", cat="batch", jobs=len(tasks), workers=jobs):
+            if jobs == 1:
+                for task in tasks:
+                    submitted = clock_us()
+                    results.append(run_export_job(*task))
+                    merge_job_trace(tracer, results[-1], submitted)
+                    print_job_result(results[-1])
+            else:
+                pool = PublisherPool(max_workers=jobs, max_jobs_per_worker=max_jobs_per_worker, max_rss_mb=max_rss_mb)
+                with pool:
+                    submitted = clock_us()
+                    futures = {pool.submit(run_export_job, *task): task for task in tasks}
+                    for future in as_completed(futures):
+                        try:
+                            results.append(future.result())
+                        except WorkerCrashedError as e:
+                            md_path, fmt = futures[future][:2]
+                            results.append(new_job_result(md_path, fmt, error=str(e)))
+                        merge_job_trace(tracer, results[-1], submitted)
+                        print_job_result(results[-1])
+                if pool.stats["recycled"] or pool.stats["crashed"]:
+                    print(
+                        f"\nWorkers: {pool.stats['started']} iniciado(s), {pool.stats['recycled']} reciclado(s), "
+                        f"{pool.stats['crashed']} encerrado(s) com falha"
+                    )
+
+    failures = sorted((r for r in results if not r["ok"]), key=lambda r: (r["input"], r["format"]))
+    print(f"\nResumo: {len(results) - len(failures)} sucesso(s), {len(failures)} falha(s)")
+    for r in failures:
+        print(f"  ✗ [{r['format']}] {r['input']}: {r['error']}", file=sys.stderr)
+    log_export(
+        f"Lote concluído: {len(results) - len(failures)}/{len(results)} jobs com sucesso",
+        level=logging.ERROR if failures else logging.INFO,
+    )
+    if timings:
+        report = TimingReport()
+        for r in results:
+            # Jobs pulados pelo manifesto distorceriam os percentis
+            if r["ok"] and not r["skipped"] and r["timings"]:
+                report.add(r["timings"]["stages"], r["timings"]["info"], r["timings"]["wall_ms"])
+        print("\n" + report.format_summary())
+    if profile_dir:
+        print(f"Perfis cProfile em {profile_dir} (python -m pstats <arquivo>)")
+    if tracer is not None:
+        write_trace(tracer, trace_file)
+    return 1 if failures else 0
+
+
+def merge_job_trace(tracer: Tracer | None, result: dict, submitted_us: int) -> None:
+    """Junta os trechos de um job ao tracer do lote, anotando o tempo de espera na fila."""
+    exported = result.get("trace")
+    if tracer is None or not exported:
+        return
+    for event in exported["events"]:
+        if event["cat"] == "job":
+            event["args"]["queued_ms"] = round((event["ts"] - submitted_us) / 1000, 3)
+    tracer.extend(exported)
+
 
+def print_job_result(result: dict) -> None:
+    """Imprime uma linha de status para o resultado de `run_export_job`."""
+    validation = result.get("validation")
+    if validation and validation["errors"] and result["ok"]:
+        print_validation(f"[{result['format']}] {result['input']}", validation["schema"], validation["errors"])
+    if not result["ok"]:
+        print(f"✗ [{result['format']}] {result['input']}: {result['error']}", file=sys.stderr)
+    elif result["skipped"]:
+        print(f"= [{result['format']}] {result['input']} -> {result['output']} (inalterado)")
+    else:
+        print(f"✓ [{result['format']}] {result['input']} -> {result['output']}")
+
+
+def export_via_daemon(
+    socket_path: Path,
+    input_path: Path,
+    formats: list[str],
+    output_path: Path | None = None,
+    force: bool = False,
+    validate: bool = False,
+    strict: bool = False,
+    css: str = CSS_MODE,
+) -> int:
+    """Cliente fino: envia os pedidos de exportação ao daemon e imprime os resultados."""
+    from publish_daemon import DaemonError, send_request
+
+    code = 0
+    for fmt in formats:
+        payload = {
+            "input": str(input_path.resolve()),
+            "format": fmt,
+            "output": str(output_path.resolve()) if output_path else None,
+            "force": force,
+            "validate": validate,
+            "strict": strict,
+            "css": css,
+        }
+        try:
+            result = send_request(socket_path, payload)
+        except DaemonError as e:
+            print(f"✗ {e}", file=sys.stderr)
+            print("  Inicie o daemon com: mdd_publish.py serve", file=sys.stderr)
+            return 1
+        print_job_result(result)
+        if not result.get("ok"):
+            code = 1
+    return code
+
+
+def serve_main(argv: list[str]) -> int:
+    """Subcomando `serve`: inicia o daemon residente de exportação."""
+    from publish_daemon import serve
+
+    parser = argparse.ArgumentParser(
+        prog="mdd_publish.py serve",
+        description="MDD Publisher - Daemon residente de exportação (socket Unix)",
+    )
+    parser.add_argument("--socket", type=Path, default=DAEMON_SOCKET, help=f"Caminho do socket (padrão: {DAEMON_SOCKET})")
+    parser.add_argument("--no-preload", action="store_true", help="Não pré-importa backends na inicialização")
+    parser.add_argument("--log-json", action="store_true", help="Grava o log de exportação como JSON")
+    args = parser.parse_args(argv)
+
+    configure_logging(json_records=args.log_json)
+    return serve(args.socket, run_export_job, preload=not args.no_preload)
+
+
+def watch_main(argv: list[str]) -> int:
+    """Subcomando `watch`: reexporta os alvos afetados a cada alteração em docs e templates."""
+    from publish_watch import WatchSession, watch
+
+    parser = argparse.ArgumentParser(
+        prog="mdd_publish.py watch",
+        description="MDD Publisher - Reexportação incremental ao salvar (docs e templates de site)",
+    )
+    parser.add_argument("--input-dir", type=Path, default=DOCS_DIR, help=f"Raiz dos documentos (padrão: {DOCS_DIR})")
+    parser.add_argument(
+        "--format",
+        default="html",
+        choices=["html", "pdf", "docx", "pitch", "all"],
+        help="Formato reexportado para documentos alterados (padrão: html)",
+    )
+    parser.add_argument("--sites-dir", type=Path, default=None, help="Variantes de site (padrão: <input-dir>/sites)")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_SITES_DIR, help="Diretório base de saída dos sites")
+    parser.add_argument(
+        "--templates-dir",
+        type=Path,
+        default=TEMPLATES_DIR / "site_templates",
+        help="Diretório base dos templates de site",
+    )
+    parser.add_argument("--mapping", type=Path, help="Arquivo JSON de mapeamento de sites")
+    parser.add_argument("--jobs", type=int, default=None, help="Processos de exportação (padrão: número de CPUs)")
+    parser.add_argument("--debounce", type=float, default=0.15, help="Janela (s) que agrupa uma rajada de alterações")
+    parser.add_argument("--polling", action="store_true", help="Força varredura de mtime em vez de inotify")
+    parser.add_argument("--interval", type=float, default=0.5, help="Intervalo (s) da varredura de mtime")
+    parser.add_argument("--validate", action="store_true", help="Valida o schema de cada documento reexportado")
+    parser.add_argument("--strict", action="store_true", help="Com --validate, não exporta artefatos inválidos")
+    parser.add_argument(
+        "--css",
+        choices=CSS_MODES,
+        default=CSS_MODE,
+        help=f"html, pitch e sites: CSS embutido em cada página ou folhas compartilhadas com hash em assets/ (padrão: {CSS_MODE})"
+    )
+    parser.add_argument("--log-json", action="store_true", help="Grava o log de exportação como JSON")
+    args = parser.parse_args(argv)
+
+    if not args.input_dir.is_dir():
+        print(f"✗ Diretório de entrada não encontrado: {args.input_dir}", file=sys.stderr)
+        return 2
+
+    configure_logging(json_records=args.log_json)
+    session = WatchSession(
+        run_export_job,
+        print_job_result,
+        docs_dir=args.input_dir,
+        formats=["html", "pdf", "docx"] if args.format == "all" else [args.format],
+        sites_dir=args.sites_dir or args.input_dir / "sites",
+        sites_output=args.output_dir,
+        templates_dir=args.templates_dir,
+        mapping=args.mapping,
+        jobs=args.jobs,
+        validate=args.validate,
+        strict=args.strict,
+        css=args.css,
+    )
+    roots = [args.input_dir, session.sites_dir, args.templates_dir]
+    if args.mapping:
+        roots.append(args.mapping.parent)
+    # Raízes aninhadas (ex: <input-dir>/sites) já são cobertas pela raiz externa
+    roots = list(dict.fromkeys(r.resolve() for r in roots))
+    roots = [r for r in roots if not any(r != o and r.is_relative_to(o) for o in roots)]
+    return watch(session, roots, debounce=args.debounce, polling=args.polling, interval=args.interval)
+
+
+def preview_main(argv: list[str]) -> int:
+    """Subcomando `preview`: servidor HTTP local que renderiza artefatos em memória."""
+    from preview_server import PreviewRenderer, RenderCache, serve_preview
+
+    parser = argparse.ArgumentParser(
+        prog="mdd_publish.py preview",
+        description="MDD Publisher - Pré-visualização local com cache de renderização",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Porta (padrão: 8000; 0 escolhe uma livre)")
+    parser.add_argument("--input-dir", type=Path, default=DOCS_DIR, help=f"Raiz dos documentos (padrão: {DOCS_DIR})")
+    parser.add_argument("--sites-dir", type=Path, default=None, help="Variantes de site (padrão: <input-dir>/sites)")
+    parser.add_argument(
+        "--templates-dir",
+        type=Path,
+        default=TEMPLATES_DIR / "site_templates",
+        help="Diretório base dos templates de site",
+    )
+    parser.add_argument("--mapping", type=Path, help="Arquivo JSON de mapeamento de sites")
+    parser.add_argument("--cache-mb", type=int, default=64, help="Tamanho máximo do cache de páginas (MB)")
+    parser.add_argument("--quiet", action="store_true", help="Não imprime cada pedido HTTP")
+    args = parser.parse_args(argv)
+
+    if not args.input_dir.is_dir():
+        print(f"✗ Diretório de entrada não encontrado: {args.input_dir}", file=sys.stderr)
+        return 2
+
+    renderer = PreviewRenderer(
+        docs_dir=args.input_dir,
+        sites_dir=args.sites_dir or args.input_dir / "sites",
+        templates_dir=args.templates_dir,
+        mapping=args.mapping,
+        cache=RenderCache(max_bytes=args.cache_mb * 1024 * 1024),
+    )
+    return serve_preview(renderer, args.host, args.port, quiet=args.quiet)
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "serve":
+        return serve_main(argv[1:])
+    if argv and argv[0] == "watch":
+        return watch_main(argv[1:])
+    if argv and argv[0] == "preview":
+        return preview_main(argv[1:])
 
-def main() -> int:
     parser = argparse.ArgumentParser(
         description="MDD Publisher - CLI unificado para exportar artefatos",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -128,6 +741,36 @@ Exemplos de uso:
 
   # Exportar todos os formatos de um arquivo
   python mdd_publish.py --input project/docs/visao.md --format all
+
+  # Exportar em lote todos os .md de project/docs
+  python mdd_publish.py --input-dir project/docs --format all --jobs 4
+
+  # Tempos por estágio (p50/p95) e cProfile por job
+  python mdd_publish.py --input-dir project/docs --format all --timings --profile
+  python mdd_publish.py --glob "sumario*.md" --format pdf
+
+  # Linha do tempo do lote (chrome://tracing ou ui.perfetto.dev)
+  python mdd_publish.py --input-dir project/docs --format all --trace
+
+  # Pacote PDF: todos os artefatos de project/docs num único PDF com sumário
+  python mdd_publish.py --input-dir project/docs --glob "*.md" --format pdf --bundle --output pacote.pdf
+
+  # CSS em folhas compartilhadas com hash (assets/) em vez de <style> por página
+  python mdd_publish.py --input-dir project/docs --format html --css linked
+  python mdd_publish.py --format sites --css linked
+
+  # Validar o schema durante a exportação (não exporta inválidos com --strict)
+  python mdd_publish.py --input project/docs/visao.md --format all --validate --strict
+
+  # Daemon residente + cliente
+  python mdd_publish.py serve &
+  python mdd_publish.py --daemon --input project/docs/visao.md --format pdf
+
+  # Reexportar ao salvar (docs e templates de site)
+  python mdd_publish.py watch --format all
+
+  # Pré-visualizar no navegador (http://127.0.0.1:8000/)
+  python mdd_publish.py preview
         """
     )
 
@@ -150,7 +793,17 @@ Exemplos de uso:
     parser.add_argument(
         "--input-dir",
         type=Path,
-        help="Diretório de entrada (somente para --format sites)"
+        help="Diretório de entrada (sites; ou modo lote para html, pdf, docx, pitch e all)"
+    )
+    parser.add_argument(
+        "--glob",
+        help="Padrão glob dos .md no modo lote (padrão: **/*.md; ativa o lote sobre project/docs)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Número de processos no modo lote ou de threads em --format sites"
     )
     parser.add_argument(
         "--output-dir",
@@ -162,24 +815,158 @@ Exemplos de uso:
         type=Path,
         help="Diretório com templates HTML (somente para --format sites)"
     )
+    parser.add_argument(
+        "--mapping",
+        type=Path,
+        help="Arquivo JSON de mapeamento variantes x templates (somente para --format sites)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Reexporta mesmo as saídas marcadas como inalteradas no manifesto"
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Envia a exportação ao daemon (mdd_publish.py serve) em vez de exportar localmente"
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help=f"Socket do daemon (implica --daemon; padrão: {DAEMON_SOCKET})"
+    )
+    parser.add_argument(
+        "--log-json",
+        action="store_true",
+        help="Grava o log de exportação como JSON (com duração e bytes por exportação)"
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Valida o schema do artefato durante a exportação (resultados em cache por hash de conteúdo)"
+    )
     parser.add_argument(
         "--strict",
         action="store_true",
-        help="Validação rigorosa de variáveis (somente para --format sites)"
+        help="Validação rigorosa de variáveis (--format sites); com --validate, não exporta artefatos inválidos"
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Imprime o resumo p50/p95 do tempo por estágio (leitura, conversão, template, backend, gravação)"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        type=Path,
+        const=PROFILES_DIR,
+        metavar="DIR",
+        help=f"Grava um cProfile (.pstats) por job (padrão: {PROFILES_DIR})"
+    )
+    parser.add_argument(
+        "--bundle",
+        action="store_true",
+        help="Com --format pdf: junta --input ou os .md de --input-dir/--glob num único PDF com sumário"
+    )
+    parser.add_argument(
+        "--bundle-title",
+        default=None,
+        help="Título da capa do pacote (--bundle)"
+    )
+    parser.add_argument(
+        "--max-jobs-per-worker",
+        type=int,
+        default=WORKER_MAX_JOBS,
+        metavar="N",
+        help=f"Modo lote: recicla cada worker após N jobs (0 = sem limite; padrão: {WORKER_MAX_JOBS})"
+    )
+    parser.add_argument(
+        "--max-worker-rss",
+        type=float,
+        default=WORKER_MAX_RSS_MB,
+        metavar="MB",
+        help=f"Modo lote: recicla o worker cuja memória residente passar de MB (0 = sem limite; padrão: {WORKER_MAX_RSS_MB})"
     )
+    parser.add_argument(
+        "--css",
+        choices=CSS_MODES,
+        default=CSS_MODE,
+        help=f"html, pitch e sites: CSS embutido em cada página ou folhas compartilhadas com hash em assets/ (padrão: {CSS_MODE})"
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        type=Path,
+        const=TRACE_FILE,
+        metavar="ARQUIVO",
+        help=f"Grava a linha do tempo (Chrome trace-event) dos jobs, por worker (padrão: {TRACE_FILE})"
+    )
+
+    args = parser.parse_args(argv)
+
+    # Log em segundo plano, gravado em lotes (descarregado ao sair)
+    configure_logging(json_records=args.log_json)
+
+    if (args.daemon or args.socket) and (args.format == "sites" or not args.input):
+        parser.error("--daemon aceita apenas exportação de um arquivo (--input) em html, pdf, docx, pitch ou all")
+    if (args.daemon or args.socket) and args.trace:
+        parser.error("--trace não se aplica a --daemon (os jobs rodam no processo do daemon)")
+    if args.bundle and (args.format != "pdf" or args.daemon or args.socket):
+        parser.error("--bundle exige --format pdf e não se aplica a --daemon")
+
+    # Pacote PDF: --input ou os .md de --input-dir/--glob, numa única renderização
+    if args.bundle:
+        if args.input:
+            files = [args.input]
+        else:
+            input_dir = args.input_dir or DOCS_DIR
+            if not input_dir.is_dir():
+                print(f"✗ Diretório de entrada não encontrado: {input_dir}", file=sys.stderr)
+                return 2
+            files = collect_markdown_files(input_dir, args.glob or "**/*.md")
+        if not files:
+            print("✗ Nenhum arquivo Markdown encontrado para o pacote", file=sys.stderr)
+            return 1
+        if not files[0].exists():
+            print(f"✗ Arquivo de entrada não encontrado: {files[0]}", file=sys.stderr)
+            return 2
+        manifest = ExportManifest.load(MANIFEST_FILE)
+        try:
+            return export_pdf_bundle(files, args.output, args.bundle_title, manifest, args.force)
+        finally:
+            manifest.save()
 
-    args = parser.parse_args()
+    # Modo lote: --input-dir ou --glob sem --input
+    if args.format != "sites" and not args.input and (args.input_dir or args.glob):
+        input_dir = args.input_dir or DOCS_DIR
+        if not input_dir.is_dir():
+            print(f"✗ Diretório de entrada não encontrado: {input_dir}", file=sys.stderr)
+            return 2
+        formats = ["html", "pdf", "docx"] if args.format == "all" else [args.format]
+        files = collect_markdown_files(input_dir, args.glob or "**/*.md")
+        return export_batch(
+            files, formats, jobs=args.jobs, force=args.force, validate=args.validate, strict=args.strict,
+            timings=args.timings, profile_dir=args.profile, trace_file=args.trace,
+            max_jobs_per_worker=args.max_jobs_per_worker, max_rss_mb=args.max_worker_rss, css=args.css,
+        )
 
     # Validações
-    if args.format != "sites" and args.format != "all" and not args.input:
-        parser.error("--input é obrigatório para formatos html, pdf, docx e pitch")
+    if args.format != "sites" and not args.input:
+        parser.error("--input (ou --input-dir/--glob para lote) é obrigatório para formatos html, pdf, docx, pitch e all")
 
     if args.format == "sites":
         return export_sites(
             input_dir=args.input_dir,
             output_dir=args.output_dir,
             templates_dir=args.templates_dir,
-            strict=args.strict
+            strict=args.strict,
+            mapping=args.mapping,
+            jobs=args.jobs,
+            timings=args.timings,
+            profile_dir=args.profile,
+            trace_file=args.trace,
+            css=args.css,
         )
 
     # Valida arquivo de entrada
@@ -187,28 +974,83 @@ Exemplos de uso:
         print(f"✗ Arquivo de entrada não encontrado: {args.input}", file=sys.stderr)
         return 2
 
+    # Cliente do daemon: o processo residente faz a exportação
+    if args.daemon or args.socket:
+        formats = ["html", "pdf", "docx"] if args.format == "all" else [args.format]
+        return export_via_daemon(
+            args.socket or DAEMON_SOCKET, args.input, formats, args.output, args.force, args.validate, args.strict,
+            args.css,
+        )
+
+    # Validação sobre o documento carregado, reaproveitado pela exportação
+    source: Path | MarkdownDocument = args.input
+    if args.validate:
+        source = load_document(args.input)
+        checked = validate_loaded(source)
+        print_validation(args.input, checked.schema, checked.errors)
+        if args.strict and checked.errors:
+            print("✗ Exportação cancelada (--strict)", file=sys.stderr)
+            return 1
+
+    # Manifesto incremental: saídas inalteradas são puladas (exceto com --force)
+    manifest = ExportManifest.load(MANIFEST_FILE)
+    report = TimingReport() if args.timings else None
+    with tracing(args.trace is not None) as tracer:
+        try:
+            return _export_single(args, manifest, source, report)
+        finally:
+            manifest.save()
+            if report is not None:
+                print("\n" + report.format_summary())
+            if tracer is not None:
+                write_trace(tracer, args.trace)
+
+
+def _export_single(
+    args: argparse.Namespace,
+    manifest: ExportManifest,
+    source: Path | MarkdownDocument,
+    report: TimingReport | None = None,
+) -> int:
+    """Exporta um único arquivo no formato pedido (ou em todos, com --format all)."""
+    force = args.force
+
+    def measured(fmt: str, export, *export_args) -> int:
+        # Tempos por estágio (--timings) e cProfile (--profile) de cada exportação
+        profile = profile_path(args.profile, args.input, fmt) if args.profile else None
+        skipped = len(manifest.skipped)
+        started = time.perf_counter()
+        with span("job", cat="job", input=str(args.input), format=fmt), collect_stages() as timer, profiled(profile):
+            code = export(*export_args)
+        if report is not None and code == 0 and len(manifest.skipped) == skipped:
+            report.add(timer.stages, timer.info, (time.perf_counter() - started) * 1000)
+        return code
+
     # Exporta formato único
     if args.format == "html":
-        return export_html(args.input, args.output)
+        return measured("html", export_html, source, args.output, manifest, force, args.css)
     elif args.format == "pdf":
-        return export_pdf(args.input, args.output)
+        return measured("pdf", export_pdf, source, args.output, manifest, force)
     elif args.format == "docx":
-        return export_docx(args.input, args.output)
+        return measured("docx", export_docx, source, args.output, manifest, force)
     elif args.format == "pitch":
-        return export_pitch(args.input, args.output)
+        return measured("pitch", export_pitch, source, args.output, manifest, force, args.css)
     elif args.format == "all":
         # Exporta todos os formatos
         print(f"Exportando '{args.input}' para todos os formatos...\n")
         results = []
 
+        # Lê e converte o Markdown uma única vez para todos os exporters
+        doc = load_document(source)
+
         print("→ HTML...")
-        results.append(export_html(args.input))
+        results.append(measured("html", export_html, doc, None, manifest, force, args.css))
 
         print("→ PDF...")
-        results.append(export_pdf(args.input))
+        results.append(measured("pdf", export_pdf, doc, None, manifest, force))
 
         print("→ DOCX...")
-        results.append(export_docx(args.input))
+        results.append(measured("docx", export_docx, doc, None, manifest, force))
 
         # Verifica se algum falhou
         if any(r != 0 for r in results):
@@ -229,5 +1071,5 @@ if __name__ == "__main__":
         sys.exit(130)
     except Exception as e:
         print(f"\n✗ Erro fatal: {e}", file=sys.stderr)
-        log_export(f"ERRO FATAL no CLI unificado: {e}")
+        log_export(f"ERRO FATAL no CLI unificado: {e}", level=logging.ERROR)
         sys.exit(1)
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Servidor local de pré-visualização do MDD Publisher.
+
+Renderiza artefatos sob demanda, em memória, com as mesmas funções dos
+exporters (`render_html`, `render_pitch_html`, `render_site_html`), sem
+gravar em `project/output`.
+
+Rotas:
+  /                          índice dos documentos e sites
+  /doc/<caminho>.html        documento (`export_html`)
+  /pitch/<caminho>.html      documento como pitch (`export_pitch_html`)
+  /site/<saida>/             site do mapeamento (`render_site`)
+  /site/<saida>/style.css    CSS do template do site
+
+As páginas renderizadas ficam num cache LRU limitado em bytes, indexado pelo
+hash do `.md` de origem e pela versão do template/CSS. O ETag deriva da mesma
+chave, então um `If-None-Match` válido recebe 304 sem renderizar nada; o
+navegador revalida a cada carga (`Cache-Control: no-cache`).
+
+Uso (via CLI unificado):
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py preview [--port 8000]
+"""
+from __future__ import annotations
+
+import hashlib
+import html
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import quote, unquote, urlsplit
+
+SCRIPT_DIR = Path(__file__).parent
+UTILS_DIR = SCRIPT_DIR / "utils"
+if str(UTILS_DIR) not in sys.path:
+    sys.path.insert(0, str(UTILS_DIR))
+
+from helpers import MarkdownDocument, log_export
+from manifest import content_hash
+
+try:
+    from config import SUPPORTED_INPUT_EXTENSIONS
+except ImportError:
+    SUPPORTED_INPUT_EXTENSIONS = [".md", ".markdown"]
+
+HTML_TYPE = "text/html; charset=utf-8"
+CSS_TYPE = "text/css; charset=utf-8"
+
+# Função que renderiza uma página: () -> (corpo, content-type)
+Renderer = Callable[[], "tuple[bytes, str]"]
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    """Página renderizada mantida no cache."""
+    body: bytes
+    etag: str
+    content_type: str
+
+
+class RenderCache:
+    """
+    Cache LRU de páginas renderizadas, limitado pela soma dos tamanhos.
+
+    Seguro para threads (o servidor atende cada pedido numa thread).
+
+    Args:
+        max_bytes: Tamanho máximo somado dos corpos em cache
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._pages: OrderedDict[str, RenderedPage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> RenderedPage | None:
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def put(self, key: str, page: RenderedPage) -> None:
+        if len(page.body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._pages.pop(key, None)
+            if old is not None:
+                self.size -= len(old.body)
+            self._pages[key] = page
+            self.size += len(page.body)
+            while self.size > self.max_bytes:
+                _, evicted = self._pages.popitem(last=False)
+                self.size -= len(evicted.body)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+
+def _cache_key(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8") + b"\0")
+    return h.hexdigest()
+
+
+def etag_for(key: str) -> str:
+    """ETag de uma chave de cache: conhecido antes de renderizar."""
+    return f'"{key[:32]}"'
+
+
+def _template_version(template_dir: Path) -> str:
+    """Versão de um template de site pelos mtimes de seus arquivos (sem lê-los)."""
+    stamps = []
+    for name in ("index.html", "style.css", "config.json"):
+        try:
+            stamps.append(f"{name}:{(template_dir / name).stat().st_mtime_ns}")
+        except FileNotFoundError:
+            stamps.append(f"{name}:-")
+    return ";".join(stamps)
+
+
+class NotFound(Exception):
+    """Rota ou artefato inexistente (404)."""
+    pass
+
+
+class PreviewRenderer:
+    """
+    Resolve rotas em páginas, consultando o `RenderCache` antes de renderizar.
+
+    Args:
+        docs_dir: Raiz dos documentos
+        sites_dir: Diretório das variantes de site (e do `mapping.json`)
+        templates_dir: Diretório base dos templates de site
+        mapping: Arquivo de mapeamento explícito (padrão: `<sites_dir>/mapping.json` ou A/B/C)
+        cache: Cache de páginas (padrão: 64 MB)
+    """
+
+    def __init__(
+        self,
+        docs_dir: Path,
+        sites_dir: Path,
+        templates_dir: Path,
+        mapping: Path | None = None,
+        cache: RenderCache | None = None,
+    ):
+        self.docs_dir = docs_dir.resolve()
+        self.sites_dir = sites_dir
+        self.templates_dir = templates_dir
+        self.mapping = mapping
+        self.cache = cache or RenderCache()
+
+    def site_jobs(self) -> dict[str, object]:
+        """Sites do mapeamento (relido a cada chamada), por nome do diretório de saída."""
+        from export_site_html import load_site_mapping, read_mapping_file
+
+        mapping = read_mapping_file(self.mapping, self.sites_dir)
+        jobs = load_site_mapping(mapping, self.sites_dir, Path("."), self.templates_dir)
+        return {job.output_dir.name: job for job in jobs}
+
+    def documents(self) -> list[Path]:
+        return sorted(
+            p.relative_to(self.docs_dir) for p in self.docs_dir.rglob("*")
+            if p.is_file() and p.suffix.lower() in SUPPORTED_INPUT_EXTENSIONS
+        )
+
+    def _source(self, rel: str) -> Path:
+        """Caminho do .md de `/doc/<rel>.html`, restrito à raiz de documentos."""
+        stem = rel[:-len(".html")] if rel.endswith(".html") else rel
+        for ext in SUPPORTED_INPUT_EXTENSIONS:
+            path = (self.docs_dir / (stem + ext)).resolve()
+            if path.is_relative_to(self.docs_dir) and path.is_file():
+                return path
+        raise NotFound(rel)
+
+    def resolve(self, route: str) -> tuple[str, RenderedPage | None, Renderer]:
+        """
+        Chave de cache, página em cache (se houver) e função que a renderiza.
+
+        Raises:
+            NotFound: Se a rota não corresponder a um artefato
+        """
+        kind, _, rest = route.lstrip("/").partition("/")
+        if kind in ("doc", "pitch") and rest:
+            path = self._source(rest)
+            text = path.read_text(encoding="utf-8")
+            key = _cache_key(kind, str(path), content_hash(text), self._style_version(kind))
+            return key, self.cache.get(key), lambda: self._render_doc(kind, path, text)
+        if kind == "site" and rest:
+            name, _, asset = rest.partition("/")
+            job = self.site_jobs().get(name)
+            if job is None or asset not in ("", "index.html", "style.css"):
+                raise NotFound(route)
+            version = _template_version(job.template_dir)
+            if asset == "style.css":
+                key = _cache_key("css", str(job.template_dir), version)
+                return key, self.cache.get(key), lambda: self._render_css(job)
+            try:
+                text = job.source.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                raise NotFound(route) from None
+            key = _cache_key("site", str(job.source), content_hash(text), str(job.template_dir), version)
+            return key, self.cache.get(key), lambda: self._render_site(job, text)
+        raise NotFound(route)
+
+    @staticmethod
+    def _style_version(kind: str) -> str:
+        if kind == "pitch":
+            from export_pitch_html import STYLE_VERSION
+        else:
+            from export_html import STYLE_VERSION
+        return STYLE_VERSION
+
+    def _render_doc(self, kind: str, path: Path, text: str) -> tuple[bytes, str]:
+        doc = MarkdownDocument(path=path, text=text)
+        if kind == "pitch":
+            from export_pitch_html import render_pitch_html
+            return render_pitch_html(doc).encode("utf-8"), HTML_TYPE
+        from export_html import render_html
+        return render_html(doc).encode("utf-8"), HTML_TYPE
+
+    def _render_site(self, job, text: str) -> tuple[bytes, str]:
+        from template_engine import load_site_template, render_site_html
+        return render_site_html(text, load_site_template(job.template_dir)).encode("utf-8"), HTML_TYPE
+
+    def _render_css(self, job) -> tuple[bytes, str]:
+        from template_engine import load_site_template
+        css = load_site_template(job.template_dir).css
+        if css is None:
+            raise NotFound(f"{job.template_dir}/style.css")
+        return css.encode("utf-8"), CSS_TYPE
+
+    def render(self, key: str, render: Renderer) -> RenderedPage:
+        """Renderiza e guarda a página no cache."""
+        body, content_type = render()
+        page = RenderedPage(body, etag_for(key), content_type)
+        self.cache.put(key, page)
+        return page
+
+    def index_html(self) -> bytes:
+        """Índice com links para documentos, pitches e sites."""
+        docs = "\n".join(
+            f'<li>{html.escape(str(rel))} — <a href="/doc/{quote(rel.with_suffix(".html").as_posix())}">html</a>'
+            f' · <a href="/pitch/{quote(rel.with_suffix(".html").as_posix())}">pitch</a></li>'
+            for rel in self.documents()
+        )
+        try:
+            sites = "\n".join(
+                f'<li><a href="/site/{quote(name)}/">{html.escape(name)}</a>'
+                f" ({html.escape(job.source.name)} + {html.escape(job.template_dir.name)})</li>"
+                for name, job in self.site_jobs().items() if job.source.exists()
+            )
+        except (OSError, ValueError, KeyError) as exc:
+            sites = f"<li>Mapeamento inválido: {html.escape(str(exc))}</li>"
+        stats = f"{len(self.cache)} página(s), {self.cache.size / 1024:.0f} KiB, {self.cache.hits} acerto(s)"
+        return (
+            '<!doctype html><html lang="pt-BR"><head><meta charset="utf-8" />'
+            "<title>MDD Publisher - Preview</title></head><body>"
+            f"<h1>Documentos</h1><ul>\n{docs}\n</ul><h1>Sites</h1><ul>\n{sites}\n</ul>"
+            f"<p><small>Cache: {stats}</small></p></body></html>"
+        ).encode("utf-8")
+
+
+class _PreviewHandler(BaseHTTPRequestHandler):
+    server: "_PreviewServer"
+
+    def do_GET(self) -> None:
+        self._serve(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._serve(send_body=False)
+
+    def _serve(self, send_body: bool) -> None:
+        renderer = self.server.renderer
+        route = unquote(urlsplit(self.path).path)
+        if route in ("", "/"):
+            self._send(HTTPStatus.OK, renderer.index_html(), HTML_TYPE, None, "index", send_body)
+            return
+        if route.startswith("/site/") and route.count("/") == 2:
+            # Links relativos do template (style.css) exigem a barra final
+            self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+            self.send_header("Location", quote(route) + "/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        try:
+            key, page, render = renderer.resolve(route)
+            etag = etag_for(key)
+            if etag in _etags(self.headers.get("If-None-Match")):
+                self._send(HTTPStatus.NOT_MODIFIED, b"", None, etag, "revalidated", send_body)
+                return
+            status = "hit" if page is not None else "miss"
+            page = page or renderer.render(key, render)
+        except NotFound:
+            self._send(HTTPStatus.NOT_FOUND, b"Not found", "text/plain; charset=utf-8", None, "-", send_body)
+            return
+        except Exception as exc:
+            body = f"Erro ao renderizar {route}: {exc}".encode("utf-8")
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, body, "text/plain; charset=utf-8", None, "-", send_body)
+            return
+        self._send(HTTPStatus.OK, page.body, page.content_type, page.etag, status, send_body)
+
+    def _send(self, status, body: bytes, content_type, etag, cache_status: str, send_body: bool) -> None:
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("X-Render-Cache", cache_status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def _etags(header: str | None) -> set[str]:
+    if not header:
+        return set()
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
+class _PreviewServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], renderer: PreviewRenderer, quiet: bool):
+        self.renderer = renderer
+        self.quiet = quiet
+        super().__init__(address, _PreviewHandler)
+
+
+def serve_preview(renderer: PreviewRenderer, host: str = "127.0.0.1", port: int = 8000, quiet: bool = False) -> int:
+    """
+    Inicia o servidor de pré-visualização e atende até Ctrl+C.
+
+    Returns:
+        Código de saída (0 sucesso, 2 se a porta estiver ocupada)
+    """
+    try:
+        server = _PreviewServer((host, port), renderer, quiet)
+    except OSError as exc:
+        print(f"✗ Não foi possível abrir {host}:{port}: {exc}", file=sys.stderr)
+        return 2
+    print(f"✓ Preview em http://{host}:{server.server_address[1]}/ (cache até {renderer.cache.max_bytes // (1024 * 1024)} MB)")
+    log_export(f"Preview iniciado em {host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
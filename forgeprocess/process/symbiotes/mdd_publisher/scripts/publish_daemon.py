@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Daemon residente de exportação do MDD Publisher.
+
+Mantém um processo de longa duração escutando num socket Unix, com os
+backends (`markdown`, `bs4`, `docx`, renderizador de PDF) já importados e os
+caches aquecidos. Cada agente/CLI envia pedidos de exportação ao daemon em vez
+de iniciar um novo interpretador.
+
+Protocolo: uma linha JSON por pedido e uma linha JSON por resposta.
+  → {"input": "/abs/project/docs/visao.md", "format": "pdf", "output": null, "force": false}
+    ("css": "inline" | "linked" é opcional e vale para html e pitch)
+  ← {"ok": true, "input": "...", "format": "pdf", "output": "...", "skipped": false, "error": null}
+  → {"command": "ping"}       ← {"ok": true, "pid": 1234, "backends": [...]}
+  → {"command": "shutdown"}   ← {"ok": true}
+
+Uso (via CLI unificado):
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py serve [--socket /tmp/mdd.sock]
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py --daemon --input project/docs/visao.md --format pdf
+"""
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+from typing import Callable
+
+SCRIPT_DIR = Path(__file__).parent
+UTILS_DIR = SCRIPT_DIR / "utils"
+if str(UTILS_DIR) not in sys.path:
+    sys.path.insert(0, str(UTILS_DIR))
+
+from helpers import ExportError, log_export
+
+# Função que executa um job: (input, format, output, force, validate, strict) -> resultado serializável;
+# `css`, quando presente no pedido, é repassado como argumento nomeado
+JobRunner = Callable[[str, str, "str | None", bool, bool, bool], dict]
+
+# Módulos pesados importados na inicialização do daemon
+PRELOAD_MODULES = ["markdown", "bs4", "docx", "export_html", "export_pdf", "export_docx", "export_pitch_html"]
+
+
+class DaemonError(ExportError):
+    """Erro de comunicação com o daemon de exportação."""
+    pass
+
+
+def preload_backends() -> list[str]:
+    """
+    Importa os backends opcionais e aquece os caches do processo.
+
+    Returns:
+        Nomes dos backends efetivamente carregados
+    """
+    loaded: list[str] = []
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception:
+            pass
+
+    from helpers import md_to_html_basic
+    md_to_html_basic("# aquecimento")  # instancia o conversor Markdown
+
+    try:
+        from export_pdf import get_renderer
+        loaded.append(f"pdf:{get_renderer().backend}")
+    except Exception:
+        pass
+    return loaded
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "_PublishServer"
+
+    def handle(self) -> None:
+        for raw in self.rfile:
+            if not raw.strip():
+                continue
+            try:
+                response = self.server.dispatch(json.loads(raw))
+            except Exception as e:
+                response = {"ok": False, "error": f"Pedido inválido: {e}"}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _PublishServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, run_job: JobRunner, backends: list[str]):
+        self.run_job = run_job
+        self.backends = backends
+        super().__init__(str(socket_path), _RequestHandler)
+
+    def dispatch(self, request: dict) -> dict:
+        command = request.get("command", "export")
+        if command == "ping":
+            return {"ok": True, "pid": os.getpid(), "backends": self.backends}
+        if command == "shutdown":
+            # shutdown() bloqueia até o loop terminar: dispara em outra thread
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"ok": True}
+        if command != "export":
+            return {"ok": False, "error": f"Comando desconhecido: {command}"}
+        options = {"css": request["css"]} if request.get("css") else {}
+        return self.run_job(
+            request["input"],
+            request["format"],
+            request.get("output"),
+            bool(request.get("force", False)),
+            bool(request.get("validate", False)),
+            bool(request.get("strict", False)),
+            **options,
+        )
+
+
+def serve(socket_path: Path, run_job: JobRunner, preload: bool = True) -> int:
+    """
+    Inicia o daemon e atende pedidos até receber `shutdown`, SIGTERM ou Ctrl+C.
+
+    Args:
+        socket_path: Caminho do socket Unix
+        run_job: Executor de jobs (ex: `mdd_publish.run_export_job`)
+        preload: Se True, importa backends e aquece caches antes de aceitar pedidos
+
+    Returns:
+        Código de saída (0 sucesso, 2 se já houver daemon ativo no socket)
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        print("✗ Daemon requer sockets Unix (indisponível nesta plataforma)", file=sys.stderr)
+        return 2
+
+    if socket_path.exists():
+        if _is_alive(socket_path):
+            print(f"✗ Daemon já em execução em {socket_path}", file=sys.stderr)
+            return 2
+        socket_path.unlink()  # socket órfão de execução anterior
+
+    backends = preload_backends() if preload else []
+    server = _PublishServer(socket_path, run_job, backends)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    print(f"✓ Daemon MDD Publisher ouvindo em {socket_path} (pid {os.getpid()})")
+    print(f"  Backends carregados: {', '.join(backends) or 'nenhum'}")
+    log_export(f"Daemon iniciado em {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
+        log_export(f"Daemon encerrado em {socket_path}")
+    return 0
+
+
+def send_request(socket_path: Path, payload: dict, timeout: float | None = None) -> dict:
+    """
+    Envia um pedido ao daemon e aguarda a resposta.
+
+    Raises:
+        DaemonError: Se o daemon não estiver acessível ou responder de forma inválida
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError as e:
+        raise DaemonError(f"Daemon indisponível em {socket_path}: {e}") from e
+    if not line:
+        raise DaemonError(f"Daemon em {socket_path} encerrou a conexão sem responder")
+    return json.loads(line)
+
+
+def _is_alive(socket_path: Path) -> bool:
+    try:
+        return send_request(socket_path, {"command": "ping"}, timeout=2).get("ok", False)
+    except (DaemonError, ValueError):
+        return False
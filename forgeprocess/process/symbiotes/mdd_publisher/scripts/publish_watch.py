@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Modo watch do MDD Publisher: reexportação incremental ao salvar.
+
+Monitora a árvore de documentos (`project/docs`) e os templates de site e,
+a cada rajada de alterações (agrupadas por `debounce`), reexporta apenas os
+alvos afetados:
+
+- `.md` de documentos -> jobs (arquivo, formato) nos formatos pedidos
+- `.md` de variantes de site -> os sites que usam a variante
+- arquivo de um template (`index.html`, `style.css`, `config.json`) -> apenas
+  os sites que usam aquele template
+- `mapping.json` dos sites -> mapeamento relido e todos os sites renderizados
+
+Os jobs rodam num pool de processos (documentos, `worker_pool.PublisherPool`,
+com reciclagem de workers) e num pool de threads (sites) mantidos vivos
+durante toda a sessão; um alvo alterado enquanto está
+em execução é reenfileirado ao terminar, nunca executado em paralelo consigo
+mesmo. O manifesto incremental continua valendo: salvar sem alterar o
+conteúdo não regrava a saída.
+
+A detecção usa inotify (Linux, via libc) quando disponível e, caso
+contrário, varredura periódica de mtime/tamanho.
+
+Uso (via CLI unificado):
+  python symbiotas/mdd_publisher/scripts/mdd_publish.py watch [--format all] [--jobs 4]
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable
+
+SCRIPT_DIR = Path(__file__).parent
+UTILS_DIR = SCRIPT_DIR / "utils"
+if str(UTILS_DIR) not in sys.path:
+    sys.path.insert(0, str(UTILS_DIR))
+
+from helpers import log_export
+from stylesheets import ASSETS_DIRNAME
+from worker_pool import PublisherPool
+
+try:
+    from config import CSS_MODE, SUPPORTED_INPUT_EXTENSIONS
+except ImportError:
+    CSS_MODE = "inline"
+    SUPPORTED_INPUT_EXTENSIONS = [".md", ".markdown"]
+
+# Máscara inotify: escrita concluída, criação, remoção e renomeação
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Arquivos temporários de editores, ignorados
+_IGNORED_SUFFIXES = (".swp", ".swx", ".tmp", "~")
+
+
+def _ignored(path: Path) -> bool:
+    name = path.name
+    return name.startswith(".#") or name.endswith(_IGNORED_SUFFIXES)
+
+
+class PollingWatcher:
+    """Detecta alterações comparando mtime e tamanho dos arquivos a cada `interval`."""
+
+    backend = "polling"
+
+    def __init__(self, roots: Iterable[Path], interval: float = 0.5):
+        self.roots = [r for r in roots if r.is_dir()]
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot: dict[Path, tuple[int, int]] = {}
+        for root in self.roots:
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    path = Path(dirpath) / name
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def poll(self, timeout: float) -> set[Path]:
+        """Aguarda até `timeout` segundos e devolve os arquivos alterados, criados ou removidos."""
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        changed = {p for p, sig in current.items() if self._snapshot.get(p) != sig}
+        changed |= self._snapshot.keys() - current.keys()
+        self._snapshot = current
+        return {p for p in changed if not _ignored(p)}
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Detecta alterações com inotify (Linux), chamando a libc via ctypes.
+
+    Cada diretório das raízes recebe um watch; diretórios criados depois
+    são incluídos ao aparecerem.
+
+    Raises:
+        OSError: Se inotify não estiver disponível
+    """
+
+    backend = "inotify"
+
+    def __init__(self, roots: Iterable[Path]):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify indisponível nesta plataforma")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self._dirs: dict[int, Path] = {}
+        for root in roots:
+            if root.is_dir():
+                self._add_tree(root)
+
+    def _add_tree(self, root: Path) -> None:
+        for dirpath, _, _ in os.walk(root):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), _WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch falhou em {dirpath}")
+            self._dirs[wd] = Path(dirpath)
+
+    def poll(self, timeout: float) -> set[Path]:
+        """Aguarda até `timeout` segundos por eventos e devolve os arquivos afetados."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                directory = self._dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = directory / os.fsdecode(name)
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        self._add_tree(path)
+                        changed.update(p for p in path.rglob("*") if p.is_file())
+                elif not _ignored(path):
+                    changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def make_watcher(roots: Iterable[Path], polling: bool = False, interval: float = 0.5):
+    """Cria o watcher inotify ou, se indisponível (ou `polling`), o de varredura."""
+    roots = list(roots)
+    if not polling:
+        try:
+            return InotifyWatcher(roots)
+        except OSError:
+            pass
+    return PollingWatcher(roots, interval)
+
+
+def collect_changes(watcher, debounce: float, max_wait: float = 2.0, idle: float = 1.0) -> set[Path]:
+    """
+    Agrupa uma rajada de alterações.
+
+    Espera até `idle` segundos pela primeira alteração; a partir dela, continua
+    coletando até passar `debounce` segundos sem eventos (ou `max_wait` no total).
+    """
+    changed = watcher.poll(idle)
+    if not changed:
+        return changed
+    deadline = time.monotonic() + max_wait
+    while time.monotonic() < deadline:
+        more = watcher.poll(debounce)
+        if not more:
+            break
+        changed |= more
+    return changed
+
+
+def _is_within(path: Path, root: Path) -> bool:
+    try:
+        path.relative_to(root)
+        return True
+    except ValueError:
+        return False
+
+
+class WatchSession:
+    """
+    Traduz alterações em alvos e os executa nos pools em segundo plano.
+
+    Args:
+        run_job: Executor de jobs de documento (ex: `mdd_publish.run_export_job`)
+        print_result: Impressão do resultado de `run_job` (ex: `mdd_publish.print_job_result`)
+        docs_dir: Raiz dos documentos
+        formats: Formatos exportados para documentos alterados
+        sites_dir: Diretório das variantes de site (e do `mapping.json`)
+        sites_output: Diretório base de saída dos sites
+        templates_dir: Diretório base dos templates de site
+        mapping: Arquivo de mapeamento explícito (padrão: `<sites_dir>/mapping.json` ou A/B/C)
+        jobs: Processos do pool de documentos (padrão: número de CPUs)
+        validate, strict: Repassados a `run_job`
+        css: CSS de documentos HTML e sites: "inline" ou "linked" (folhas
+            compartilhadas com hash; sites em `<sites_output>/assets`)
+    """
+
+    def __init__(
+        self,
+        run_job: Callable[..., dict],
+        print_result: Callable[[dict], None],
+        docs_dir: Path,
+        formats: list[str],
+        sites_dir: Path,
+        sites_output: Path,
+        templates_dir: Path,
+        mapping: Path | None = None,
+        jobs: int | None = None,
+        validate: bool = False,
+        strict: bool = False,
+        css: str = CSS_MODE,
+    ):
+        self.run_job = run_job
+        self.print_result = print_result
+        self.docs_dir = docs_dir.resolve()
+        self.formats = formats
+        self.sites_dir = sites_dir.resolve()
+        self.sites_output = sites_output
+        self.templates_dir = templates_dir.resolve()
+        self.mapping = mapping.resolve() if mapping else None
+        self.validate = validate
+        self.strict = strict
+        self.css = css
+        # Mesmo destino de `export_site_html --css linked`
+        self.css_dir = sites_output / ASSETS_DIRNAME if css == "linked" else None
+        self.site_jobs: list = []
+
+        jobs = max(1, jobs or os.cpu_count() or 1)
+        # Workers com backends pré-carregados, reciclados em sessões longas
+        self._docs_pool = PublisherPool(max_workers=jobs)
+        self._sites_pool = ThreadPoolExecutor(max_workers=jobs)
+        self._lock = threading.Lock()
+        self._running: dict[tuple, Future] = {}
+        self._pending: dict[tuple, Callable[[], Future]] = {}
+        self.reload_mapping()
+
+    @property
+    def mapping_path(self) -> Path:
+        return self.mapping or self.sites_dir / "mapping.json"
+
+    def reload_mapping(self) -> None:
+        """Relê o mapeamento de sites (chamado também quando `mapping.json` muda)."""
+        from export_site_html import load_site_mapping, read_mapping_file
+
+        try:
+            mapping = read_mapping_file(self.mapping, self.sites_dir)
+            self.site_jobs = load_site_mapping(mapping, self.sites_dir, self.sites_output, self.templates_dir)
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"✗ Mapeamento de sites inválido (mantido o anterior): {exc}", file=sys.stderr)
+
+    def targets_for(self, changed: Iterable[Path]) -> tuple[list[tuple[str, str]], list]:
+        """
+        Alvos afetados por um conjunto de arquivos alterados.
+
+        Returns:
+            (jobs de documento [(arquivo, formato)], jobs de site [SiteJob])
+        """
+        doc_jobs: dict[tuple[str, str], None] = {}
+        sites: dict = {}
+        remap = False
+        for raw in changed:
+            path = raw.resolve()
+            if path == self.mapping_path:
+                remap = True
+            elif _is_within(path, self.templates_dir):
+                template = self.templates_dir / path.relative_to(self.templates_dir).parts[0]
+                sites.update((job, None) for job in self.site_jobs if job.template_dir == template)
+            elif path.suffix.lower() in SUPPORTED_INPUT_EXTENSIONS and path.is_file():
+                site_sources = [job for job in self.site_jobs if job.source.resolve() == path]
+                sites.update((job, None) for job in site_sources)
+                if _is_within(path, self.docs_dir) and not _is_within(path, self.sites_dir):
+                    doc_jobs.update(((str(path), fmt), None) for fmt in self.formats)
+        if remap:
+            self.reload_mapping()
+            sites = dict.fromkeys(self.site_jobs)
+        return list(doc_jobs), list(sites)
+
+    def dispatch(self, changed: set[Path]) -> int:
+        """Enfileira os alvos afetados por `changed`; devolve quantos foram enfileirados."""
+        doc_jobs, site_jobs = self.targets_for(changed)
+        for md_path, fmt in doc_jobs:
+            self._submit(
+                ("doc", md_path, fmt),
+                lambda md_path=md_path, fmt=fmt: self._docs_pool.submit(
+                    self.run_job, md_path, fmt, None, False, self.validate, self.strict,
+                    False, None, False, self.css,
+                ),
+            )
+        for job in site_jobs:
+            self._submit(
+                ("site", job), lambda job=job: self._sites_pool.submit(_render_site_job, job, self.css_dir)
+            )
+        return len(doc_jobs) + len(site_jobs)
+
+    def _submit(self, key: tuple, start: Callable[[], Future]) -> None:
+        with self._lock:
+            if key in self._running:
+                # Em execução: roda de novo ao terminar, com o conteúdo mais recente
+                self._pending[key] = start
+                return
+            future, started = self._start(key, start)
+        self._follow(key, future, started)
+
+    def _start(self, key: tuple, start: Callable[[], Future]) -> tuple[Future, float]:
+        # Chamado com `_lock`; o callback é registrado depois, por `_follow`
+        started = time.perf_counter()
+        future = start()
+        self._running[key] = future
+        return future, started
+
+    def _follow(self, key: tuple, future: Future, started: float) -> None:
+        # Fora do `_lock`: se o job já terminou, `_done` roda nesta mesma thread
+        future.add_done_callback(lambda f: self._done(key, f, started))
+
+    def _done(self, key: tuple, future: Future, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        try:
+            result = future.result()
+            if key[0] == "site":
+                job = key[1]
+                print(f"✓ [site] {job.source.name} + {job.template_dir.name} -> {result} ({elapsed_ms:.0f} ms)")
+            else:
+                self.print_result(result)
+        except Exception as exc:
+            print(f"✗ {key[1]}: {exc}", file=sys.stderr)
+        with self._lock:
+            del self._running[key]
+            start = self._pending.pop(key, None)
+            rerun = self._start(key, start) if start is not None else None
+        if rerun is not None:
+            self._follow(key, *rerun)
+
+    def close(self) -> None:
+        self._docs_pool.shutdown(wait=True, cancel_futures=True)
+        self._sites_pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _render_site_job(job, css_dir: Path | None = None) -> Path:
+    """Renderiza um site (template relido se mudou: `compile_template` valida por mtime)."""
+    from export_site_html import export_single
+    from template_engine import load_site_template
+
+    return export_single(job.source, job.output_dir, load_site_template(job.template_dir), css_dir=css_dir)
+
+
+def watch(session: WatchSession, roots: list[Path], debounce: float = 0.15, polling: bool = False, interval: float = 0.5) -> int:
+    """
+    Loop do modo watch: coleta rajadas de alterações e despacha os alvos até Ctrl+C.
+
+    Returns:
+        Código de saída (0)
+    """
+    watcher = make_watcher(roots, polling=polling, interval=interval)
+    watched = ", ".join(str(r) for r in roots if r.is_dir())
+    print(f"👀 Observando {watched} ({watcher.backend}, debounce {debounce * 1000:.0f} ms). Ctrl+C para sair.")
+    log_export(f"Watch iniciado ({watcher.backend}): {watched}")
+    try:
+        while True:
+            changed = collect_changes(watcher, debounce, idle=max(debounce, interval))
+            if changed:
+                count = session.dispatch(changed)
+                if count:
+                    print(f"→ {len(changed)} arquivo(s) alterado(s), {count} alvo(s) enfileirado(s)")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        session.close()
+        log_export("Watch encerrado")
+    return 0
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Gerador de DOCX por streaming (OOXML direto), sem python-docx.
+
+Consome os eventos de bloco/inline de `md_converter` e escreve
+`word/document.xml` em fluxo dentro do `zipfile`, em blocos de texto, sem
+montar árvore de objetos. Estilos (títulos, listas, citação, código, links)
+e numeração vêm de partes XML pré-montadas.
+
+Uso:
+    from docx_stream import write_docx
+    write_docx(markdown_text, Path("saida.docx"), title="Sumário")
+"""
+from __future__ import annotations
+
+import re
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from md_converter import iter_blocks, iter_inline
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+HYPERLINK_REL = f"{R_NS}/hyperlink"
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# Caracteres de controle proibidos em XML 1.0
+_INVALID_XML_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# IDs de numeração: 1 = marcadores (compartilhado); listas numeradas ganham
+# um ID próprio a partir de 2 para reiniciar a contagem
+BULLET_NUM_ID = 1
+# Níveis de recuo das listas (`w:ilvl` 0 a 2); listas mais profundas usam o último
+LIST_LEVELS = 3
+
+# Largura útil da página A4 com margens de 2,54 cm (twips)
+TEXT_WIDTH = 11906 - 2 * 1440
+
+CONTENT_TYPES_XML = XML_HEADER + (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '<Override PartName="/word/numbering.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>'
+    '<Override PartName="/docProps/core.xml" '
+    'ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+    "</Types>"
+)
+
+ROOT_RELS_XML = XML_HEADER + (
+    f'<Relationships xmlns="{REL_NS}">'
+    '<Relationship Id="rId1" '
+    f'Type="{R_NS}/officeDocument" Target="word/document.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" '
+    'Target="docProps/core.xml"/>'
+    "</Relationships>"
+)
+
+
+def _heading_style(level: int, size: int) -> str:
+    return (
+        f'<w:style w:type="paragraph" w:styleId="Heading{level}">'
+        f'<w:name w:val="heading {level}"/><w:basedOn w:val="Normal"/><w:next w:val="Normal"/><w:qFormat/>'
+        f'<w:pPr><w:keepNext/><w:keepLines/><w:spacing w:before="{360 - 60 * level}" w:after="120"/>'
+        f'<w:outlineLvl w:val="{level - 1}"/></w:pPr>'
+        f'<w:rPr><w:b/><w:color w:val="1F3864"/><w:sz w:val="{size}"/><w:szCs w:val="{size}"/></w:rPr>'
+        "</w:style>"
+    )
+
+
+STYLES_XML = XML_HEADER + (
+    f'<w:styles xmlns:w="{W_NS}">'
+    "<w:docDefaults>"
+    '<w:rPrDefault><w:rPr><w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" w:eastAsia="Calibri" w:cs="Calibri"/>'
+    '<w:sz w:val="22"/><w:szCs w:val="22"/><w:lang w:val="pt-BR"/></w:rPr></w:rPrDefault>'
+    '<w:pPrDefault><w:pPr><w:spacing w:after="160" w:line="264" w:lineRule="auto"/></w:pPr></w:pPrDefault>'
+    "</w:docDefaults>"
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/><w:qFormat/></w:style>'
+    + "".join(_heading_style(level, size) for level, size in ((1, 32), (2, 28), (3, 24), (4, 22)))
+    + '<w:style w:type="paragraph" w:styleId="ListBullet"><w:name w:val="List Bullet"/>'
+    '<w:basedOn w:val="Normal"/><w:pPr><w:spacing w:after="60"/><w:contextualSpacing/></w:pPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="ListNumber"><w:name w:val="List Number"/>'
+    '<w:basedOn w:val="Normal"/><w:pPr><w:spacing w:after="60"/><w:contextualSpacing/></w:pPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="IntenseQuote"><w:name w:val="Intense Quote"/>'
+    '<w:basedOn w:val="Normal"/><w:next w:val="Normal"/><w:qFormat/>'
+    '<w:pPr><w:pBdr><w:left w:val="single" w:sz="24" w:space="8" w:color="B4C7E7"/></w:pBdr>'
+    '<w:shd w:val="clear" w:color="auto" w:fill="F6F8FA"/><w:ind w:left="360" w:right="360"/></w:pPr>'
+    '<w:rPr><w:i/><w:color w:val="404040"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Code"><w:name w:val="Code"/><w:basedOn w:val="Normal"/>'
+    '<w:pPr><w:spacing w:after="0" w:line="240" w:lineRule="auto"/>'
+    '<w:shd w:val="clear" w:color="auto" w:fill="F6F8FA"/></w:pPr>'
+    '<w:rPr><w:rFonts w:ascii="Consolas" w:hAnsi="Consolas" w:cs="Consolas"/>'
+    '<w:sz w:val="20"/><w:szCs w:val="20"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="HorizontalRule"><w:name w:val="Horizontal Rule"/>'
+    '<w:basedOn w:val="Normal"/><w:pPr><w:pBdr>'
+    '<w:bottom w:val="single" w:sz="6" w:space="1" w:color="EAECEF"/></w:pBdr></w:pPr></w:style>'
+    '<w:style w:type="table" w:styleId="TableGrid"><w:name w:val="Table Grid"/>'
+    '<w:tblPr><w:tblBorders>'
+    + "".join(
+        f'<w:{side} w:val="single" w:sz="4" w:space="0" w:color="BFC5CD"/>'
+        for side in ("top", "left", "bottom", "right", "insideH", "insideV")
+    )
+    + '</w:tblBorders><w:tblCellMar><w:left w:w="108" w:type="dxa"/><w:right w:w="108" w:type="dxa"/>'
+    '</w:tblCellMar></w:tblPr></w:style>'
+    '<w:style w:type="character" w:styleId="CodeChar"><w:name w:val="Code Char"/>'
+    '<w:rPr><w:rFonts w:ascii="Consolas" w:hAnsi="Consolas" w:cs="Consolas"/>'
+    '<w:sz w:val="20"/><w:szCs w:val="20"/></w:rPr></w:style>'
+    '<w:style w:type="character" w:styleId="Hyperlink"><w:name w:val="Hyperlink"/>'
+    '<w:rPr><w:color w:val="2B70C9"/><w:u w:val="single"/></w:rPr></w:style>'
+    "</w:styles>"
+)
+
+
+def _numbering_levels(fmt: str, text: str) -> str:
+    return "".join(
+        f'<w:lvl w:ilvl="{lvl}"><w:start w:val="1"/><w:numFmt w:val="{fmt}"/>'
+        f'<w:lvlText w:val="{text.replace("%1", f"%{lvl + 1}")}"/><w:lvlJc w:val="left"/>'
+        f'<w:pPr><w:ind w:left="{720 * (lvl + 1)}" w:hanging="360"/></w:pPr></w:lvl>'
+        for lvl in range(LIST_LEVELS)
+    )
+
+
+def numbering_xml(ordered_lists: int) -> str:
+    """
+    Parte `numbering.xml`: um abstrato de marcadores e um de números
+    decimais, com uma instância (`w:num`) por lista numerada, que recomeça
+    em 1 em qualquer nível (uma sublista numerada também é uma lista nova).
+    """
+    nums = [f'<w:num w:numId="{BULLET_NUM_ID}"><w:abstractNumId w:val="0"/></w:num>']
+    restart = "".join(
+        f'<w:lvlOverride w:ilvl="{lvl}"><w:startOverride w:val="1"/></w:lvlOverride>'
+        for lvl in range(LIST_LEVELS)
+    )
+    for num_id in range(BULLET_NUM_ID + 1, BULLET_NUM_ID + 1 + ordered_lists):
+        nums.append(f'<w:num w:numId="{num_id}"><w:abstractNumId w:val="1"/>{restart}</w:num>')
+    return XML_HEADER + (
+        f'<w:numbering xmlns:w="{W_NS}">'
+        f'<w:abstractNum w:abstractNumId="0">{_numbering_levels("bullet", "•")}</w:abstractNum>'
+        f'<w:abstractNum w:abstractNumId="1">{_numbering_levels("decimal", "%1.")}</w:abstractNum>'
+        + "".join(nums)
+        + "</w:numbering>"
+    )
+
+
+def core_xml(title: str) -> str:
+    """Parte `docProps/core.xml` com título e data de criação."""
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return XML_HEADER + (
+        '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+        'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+        'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+        f"<dc:title>{xml_text(title)}</dc:title><dc:creator>MDD Publisher</dc:creator>"
+        f'<dcterms:created xsi:type="dcterms:W3CDTF">{now}</dcterms:created>'
+        "</cp:coreProperties>"
+    )
+
+
+def xml_text(text: str) -> str:
+    """Escapa texto para conteúdo XML, removendo caracteres de controle inválidos."""
+    return escape(_INVALID_XML_RE.sub("", text))
+
+
+# Trecho inline: (texto, negrito, itálico, código, href), como em `iter_inline`
+InlineChunk = Tuple[str, bool, bool, bool, Optional[str]]
+
+
+def runs_xml(chunks: Iterable[InlineChunk], link_id: Callable[[str], str] | None = None) -> str:
+    """
+    XML dos runs (`w:r`) de trechos inline.
+
+    Args:
+        chunks: Trechos (texto, negrito, itálico, código, href)
+        link_id: Devolve o ID de relação de um href; None grava links como texto
+    """
+    parts = []
+    for chunk, b, i, code, href in chunks:
+        if not chunk:
+            continue
+        if not link_id:
+            href = None
+        style = "Hyperlink" if href else "CodeChar" if code else None
+        props = (f'<w:rStyle w:val="{style}"/>' if style else "") + ("<w:b/>" if b else "") + ("<w:i/>" if i else "")
+        run = (
+            f"<w:r>{f'<w:rPr>{props}</w:rPr>' if props else ''}"
+            f'<w:t xml:space="preserve">{xml_text(chunk)}</w:t></w:r>'
+        )
+        if href:
+            run = f'<w:hyperlink r:id="{link_id(href)}">{run}</w:hyperlink>'
+        parts.append(run)
+    return "".join(parts)
+
+
+def column_widths(
+    rows: Sequence[Sequence[Sequence[InlineChunk]]],
+    total: int = TEXT_WIDTH,
+    min_chars: int = 3,
+    max_chars: int = 40,
+) -> list[int]:
+    """
+    Larguras das colunas (twips) numa única passada por todas as linhas.
+
+    Cada coluna recebe uma fatia de `total` proporcional ao maior texto
+    encontrado nela, limitado a [min_chars, max_chars] caracteres.
+    """
+    widest: list[int] = []
+    for row in rows:
+        for n, cell in enumerate(row):
+            length = sum(len(chunk[0]) for chunk in cell)
+            if n >= len(widest):
+                widest.append(min_chars)
+            if length > widest[n]:
+                widest[n] = min(length, max_chars)
+    weight = sum(widest) or 1
+    return [total * w // weight for w in widest]
+
+
+def iter_table_xml(
+    rows: Sequence[Sequence[Sequence[InlineChunk]]],
+    aligns: Sequence[str | None] = (),
+    header_rows: int = 1,
+    link_id: Callable[[str], str] | None = None,
+    total_width: int = TEXT_WIDTH,
+) -> Iterator[str]:
+    """
+    Gera o XML de uma tabela (`w:tbl`) em blocos, uma linha por vez.
+
+    O layout é fixo (larguras calculadas por `column_widths`), o que evita
+    o ajuste automático de colunas pelo Word em tabelas longas. Linhas com
+    menos células são completadas com células vazias.
+
+    Args:
+        rows: Linhas -> células -> trechos inline; as `header_rows` primeiras
+            são cabeçalho
+        aligns: Alinhamento por coluna ("left", "center", "right" ou None)
+        header_rows: Número de linhas de cabeçalho (repetidas a cada página)
+        link_id: Ver `runs_xml`
+        total_width: Largura total da tabela em twips
+    """
+    widths = column_widths(rows, total_width)
+    if not widths:
+        return
+    yield (
+        f'<w:tbl xmlns:w="{W_NS}" xmlns:r="{R_NS}"><w:tblPr><w:tblStyle w:val="TableGrid"/>'
+        f'<w:tblW w:w="{sum(widths)}" w:type="dxa"/><w:tblLayout w:type="fixed"/>'
+        '<w:tblLook w:val="04A0" w:firstRow="1" w:lastRow="0" w:firstColumn="1" '
+        'w:lastColumn="0" w:noHBand="0" w:noVBand="1"/></w:tblPr>'
+        "<w:tblGrid>" + "".join(f'<w:gridCol w:w="{w}"/>' for w in widths) + "</w:tblGrid>"
+    )
+    cell_props = [f'<w:tcPr><w:tcW w:w="{w}" w:type="dxa"/></w:tcPr>' for w in widths]
+    para_props = [
+        f'<w:pPr><w:spacing w:after="0"/><w:jc w:val="{a}"/></w:pPr>' if a else '<w:pPr><w:spacing w:after="0"/></w:pPr>'
+        for a in (list(aligns) + [None] * len(widths))[:len(widths)]
+    ]
+    for n, row in enumerate(rows):
+        parts = ["<w:tr><w:trPr><w:tblHeader/></w:trPr>" if n < header_rows else "<w:tr>"]
+        for col in range(len(widths)):
+            content = runs_xml(row[col], link_id) if col < len(row) else ""
+            parts.append(f"<w:tc>{cell_props[col]}<w:p>{para_props[col]}{content}</w:p></w:tc>")
+        parts.append("</w:tr>")
+        yield "".join(parts)
+    yield "</w:tbl>"
+
+
+DOCUMENT_START = (
+    XML_HEADER
+    + f'<w:document xmlns:w="{W_NS}" xmlns:r="{R_NS}"><w:body>'
+)
+# Página A4 com margens de 2,54 cm
+DOCUMENT_END = (
+    '<w:sectPr><w:pgSz w:w="11906" w:h="16838"/>'
+    '<w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440" '
+    'w:header="708" w:footer="708" w:gutter="0"/></w:sectPr>'
+    "</w:body></w:document>"
+)
+
+
+class DocxStreamWriter:
+    """
+    Escreve um .docx em fluxo: cada bloco vira XML acrescentado diretamente a
+    `word/document.xml` no arquivo zip.
+
+    As partes que dependem do documento inteiro (relações de links e
+    numeração das listas) são gravadas em `close()`.
+
+    Args:
+        output_path: Caminho do .docx de saída
+        title: Título gravado nas propriedades do documento
+        flush_every: Número de fragmentos XML acumulados antes de cada escrita no zip
+    """
+
+    def __init__(self, output_path: Path, title: str = "", flush_every: int = 256):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.output_path = output_path
+        self.title = title
+        self._zip = zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._stream = self._zip.open("word/document.xml", "w")
+        self._buffer: list[str] = [DOCUMENT_START]
+        self._flush_every = flush_every
+        self._links: dict[str, str] = {}
+        self._num_id = BULLET_NUM_ID
+        # numId de cada lista aberta, da mais externa à mais interna
+        self._lists: list[int] = []
+        self._pending: list[str] = []
+
+    def __enter__(self) -> "DocxStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    # Escrita -----------------------------------------------------------------
+
+    def _emit(self, xml: str) -> None:
+        self._buffer.append(xml)
+        if len(self._buffer) >= self._flush_every:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self._stream.write("".join(self._buffer).encode("utf-8"))
+            self._buffer.clear()
+
+    def _link_id(self, href: str) -> str:
+        rel_id = self._links.get(href)
+        if rel_id is None:
+            # rId1/rId2 são estilos e numeração
+            rel_id = self._links[href] = f"rId{len(self._links) + 3}"
+        return rel_id
+
+    def runs(self, text: str, bold: bool = False, italic: bool = False) -> str:
+        """XML dos runs de `text`, com a formatação inline do Markdown."""
+        return runs_xml(iter_inline(text, bold, italic), self._link_id)
+
+    def paragraph(self, text: str, style: str | None = None, num: tuple[int, int] | None = None) -> None:
+        """
+        Acrescenta um parágrafo.
+
+        Args:
+            text: Texto Markdown inline
+            style: ID do estilo de parágrafo (ver STYLES_XML)
+            num: (numId, nível) para itens de lista
+        """
+        ppr = f'<w:pStyle w:val="{style}"/>' if style else ""
+        if num:
+            ppr += f'<w:numPr><w:ilvl w:val="{num[1]}"/><w:numId w:val="{num[0]}"/></w:numPr>'
+        self._emit(f"<w:p>{f'<w:pPr>{ppr}</w:pPr>' if ppr else ''}{self.runs(text)}</w:p>")
+
+    def heading(self, level: int, text: str) -> None:
+        self.paragraph(text, f"Heading{min(max(level, 1), 4)}")
+
+    def start_list(self, kind: str) -> None:
+        """
+        Inicia uma lista, aninhada na lista aberta (se houver); listas
+        numeradas (`ol`) reiniciam a contagem.
+        """
+        if kind == "ol":
+            self._num_id += 1
+            self._lists.append(self._num_id)
+        else:
+            self._lists.append(BULLET_NUM_ID)
+
+    def list_item(self, text: str, kind: str, level: int | None = None) -> None:
+        """Item da lista aberta; `level` (padrão: profundidade da lista) vira o `w:ilvl`."""
+        if not self._lists:
+            self.start_list(kind)
+        if level is None:
+            level = len(self._lists) - 1
+        style = "ListNumber" if kind == "ol" else "ListBullet"
+        self.paragraph(text, style, (self._lists[-1], min(level, LIST_LEVELS - 1)))
+
+    def end_list(self) -> None:
+        if self._lists:
+            self._lists.pop()
+
+    def code_line(self, line: str) -> None:
+        self._emit(
+            '<w:p><w:pPr><w:pStyle w:val="Code"/></w:pPr>'
+            f'<w:r><w:t xml:space="preserve">{xml_text(line)}</w:t></w:r></w:p>'
+        )
+
+    def table(self, header: list[str], aligns: list[str | None], rows: list[list[str]]) -> None:
+        """Acrescenta uma tabela (cabeçalho em negrito, repetido a cada página)."""
+        cells = [[list(iter_inline(c, bold=True)) for c in header]]
+        cells += [[list(iter_inline(c)) for c in row] for row in rows]
+        for part in iter_table_xml(cells, aligns, link_id=self._link_id):
+            self._emit(part)
+        # Parágrafo vazio separa tabelas consecutivas (Word as fundiria)
+        self._emit("<w:p/>")
+
+    def horizontal_rule(self) -> None:
+        self._emit('<w:p><w:pPr><w:pStyle w:val="HorizontalRule"/></w:pPr></w:p>')
+
+    def write_events(self, events: Iterable[tuple[str, object]]) -> None:
+        """
+        Consome eventos de `md_converter.iter_blocks`.
+
+        Linhas de parágrafo consecutivas são unidas num único parágrafo;
+        listas aninhadas viram níveis (`w:ilvl`) conforme a profundidade.
+        """
+        list_kinds: list[str] = []
+        for kind, data in events:
+            if kind == "paragraph":
+                self._pending.append(data.strip())
+                continue
+            self._flush_paragraph()
+            if kind == "heading":
+                self.heading(*data)
+            elif kind == "list_start":
+                list_kinds.append(data)
+                self.start_list(data)
+            elif kind == "item":
+                self.list_item(data, list_kinds[-1] if list_kinds else "ul")
+            elif kind == "list_end":
+                if list_kinds:
+                    list_kinds.pop()
+                self.end_list()
+            elif kind == "quote":
+                self.paragraph(data, "IntenseQuote")
+            elif kind == "code_line":
+                self.code_line(data)
+            elif kind == "table":
+                self.table(*data)
+            elif kind == "hr":
+                self.horizontal_rule()
+        self._flush_paragraph()
+
+    def _flush_paragraph(self) -> None:
+        if self._pending:
+            self.paragraph(" ".join(self._pending))
+            self._pending.clear()
+
+    # Finalização -------------------------------------------------------------
+
+    def close(self) -> Path:
+        """Fecha `document.xml` e grava as demais partes do pacote."""
+        self._flush_paragraph()
+        self._emit(DOCUMENT_END)
+        self._flush()
+        self._stream.close()
+
+        rels = [
+            f'<Relationship Id="rId1" Type="{R_NS}/styles" Target="styles.xml"/>',
+            f'<Relationship Id="rId2" Type="{R_NS}/numbering" Target="numbering.xml"/>',
+        ]
+        rels += [
+            f'<Relationship Id="{rel_id}" Type="{HYPERLINK_REL}" Target={quoteattr(href)} TargetMode="External"/>'
+            for href, rel_id in self._links.items()
+        ]
+        self._zip.writestr("[Content_Types].xml", CONTENT_TYPES_XML)
+        self._zip.writestr("_rels/.rels", ROOT_RELS_XML)
+        self._zip.writestr(
+            "word/_rels/document.xml.rels",
+            XML_HEADER + f'<Relationships xmlns="{REL_NS}">{"".join(rels)}</Relationships>',
+        )
+        self._zip.writestr("word/styles.xml", STYLES_XML)
+        self._zip.writestr("word/numbering.xml", numbering_xml(self._num_id - BULLET_NUM_ID))
+        self._zip.writestr("docProps/core.xml", core_xml(self.title))
+        self._zip.close()
+        return self.output_path
+
+    def abort(self) -> None:
+        """Descarta o arquivo parcial após uma falha."""
+        try:
+            self._stream.close()
+            self._zip.close()
+        finally:
+            self.output_path.unlink(missing_ok=True)
+
+
+def write_docx(markdown_text: str, output_path: Path, title: str = "") -> Path:
+    """
+    Gera um .docx a partir de Markdown em uma única passada pelos eventos
+    de `md_converter.iter_blocks`.
+
+    Returns:
+        Path do arquivo DOCX gerado
+    """
+    with DocxStreamWriter(output_path, title=title) as writer:
+        writer.write_events(iter_blocks(markdown_text))
+    return output_path
@@ -1,8 +1,21 @@
+import atexit
+import functools
+import importlib.util
+import json
 import logging
-import re
+import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import time
+from dataclasses import dataclass, field
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Iterable
+
+from manifest import content_hash
+from md_converter import get_converter
+from timing import note, stage
+from tracing import span
 
 
 # Exceções customizadas
@@ -33,36 +46,226 @@ def read_text(path: Path, encoding: str = "utf-8") -> str:
     return path.read_text(encoding=encoding)
 
 
+@dataclass
+class MarkdownDocument:
+    """
+    Documento Markdown lido uma única vez e compartilhado entre exporters.
+
+    O HTML do corpo é convertido sob demanda na primeira leitura de
+    `body_html` e reaproveitado pelas exportações seguintes (HTML, PDF, DOCX).
+    """
+    path: Path
+    text: str
+    _body_html: str | None = field(default=None, repr=False)
+
+    @property
+    def title(self) -> str:
+        return self.path.stem
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.text.encode("utf-8"))
+
+    @property
+    def content_hash(self) -> str:
+        """Hash SHA-256 do texto de origem (usado pelo manifesto incremental)."""
+        return content_hash(self.text)
+
+    @property
+    def body_html(self) -> str:
+        if self._body_html is None:
+            with stage("convert"):
+                self._body_html = md_to_html_basic(self.text)
+        return self._body_html
+
+
+def load_document(source: Path | MarkdownDocument) -> MarkdownDocument:
+    """Retorna `source` se já for um documento carregado; caso contrário, lê o arquivo."""
+    if isinstance(source, MarkdownDocument):
+        return source
+    with stage("read"):
+        return MarkdownDocument(path=source, text=read_text(source))
+
+
 def write_text(path: Path, content: str, encoding: str = "utf-8") -> None:
     """Escreve arquivo de texto criando diretórios necessários."""
-    ensure_dir(path.parent)
-    path.write_text(content, encoding=encoding)
+    with stage("write"):
+        ensure_dir(path.parent)
+        path.write_text(content, encoding=encoding)
+
+
+LOGGER_NAME = "mdd_publisher"
+DEFAULT_LOG_DIR = Path("project/output/logs")
+
+_log_listener: QueueListener | None = None
+# Destino/formato do último configure_logging, reaproveitados em processos filhos
+_log_settings: dict = {}
+
+
+class JsonLogFormatter(logging.Formatter):
+    """Formata cada registro como uma linha JSON, incluindo os campos estruturados da exportação."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        payload.update(getattr(record, "export_fields", {}))
+        return json.dumps(payload, ensure_ascii=False)
 
 
-def log_export(message: str, base_dir: Path = Path("project/output/logs")) -> None:
+class _BatchingQueueListener(QueueListener):
+    """QueueListener que também descarrega o buffer em lote após `flush_interval` ocioso."""
+
+    def __init__(self, log_queue: queue.SimpleQueue, buffer: MemoryHandler, flush_interval: float):
+        super().__init__(log_queue, buffer)
+        self.buffer = buffer
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        while True:
+            try:
+                return self.queue.get(block, timeout=self.flush_interval)
+            except queue.Empty:
+                self.buffer.flush()
+
+
+def configure_logging(
+    base_dir: Path = DEFAULT_LOG_DIR,
+    queued: bool = True,
+    json_records: bool = False,
+    batch_size: int = 64,
+    flush_interval: float = 1.0,
+) -> None:
+    """
+    Configura o logger de exportação uma única vez (ex: na inicialização do CLI).
+
+    No modo `queued`, `log_export` apenas enfileira o registro; uma thread em
+    segundo plano acumula os registros e os grava em lotes de `batch_size`
+    (ou após `flush_interval` segundos sem novos registros). Registros de
+    nível ERROR (`log_export(..., level=logging.ERROR)`) descarregam o lote
+    imediatamente e o buffer é descarregado ao encerrar o processo.
+
+    Args:
+        base_dir: Diretório do arquivo export_history.log
+        queued: Se True, grava em segundo plano e em lotes
+        json_records: Se True, cada registro é uma linha JSON com campos estruturados
+        batch_size: Registros acumulados antes de gravar
+        flush_interval: Segundos ociosos antes de gravar um lote incompleto
+    """
+    global _log_listener
+    shutdown_logging()
+    _log_settings.update(base_dir=base_dir, json_records=json_records)
+
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    ensure_dir(base_dir)
+    file_handler = RotatingFileHandler(
+        base_dir / "export_history.log",
+        maxBytes=10 * 1024 * 1024,  # 10MB
+        backupCount=5,
+        encoding="utf-8"
+    )
+    if json_records:
+        file_handler.setFormatter(JsonLogFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+
+    if queued:
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        buffer = MemoryHandler(batch_size, flushLevel=logging.ERROR, target=file_handler)
+        _log_listener = _BatchingQueueListener(log_queue, buffer, flush_interval)
+        _log_listener.start()
+        logger.addHandler(QueueHandler(log_queue))
+    else:
+        logger.addHandler(file_handler)
+    logger.setLevel(logging.INFO)
+
+
+def shutdown_logging() -> None:
+    """Para a thread de log (se houver) gravando os registros pendentes."""
+    global _log_listener
+    listener, _log_listener = _log_listener, None
+    if listener is not None:
+        listener.stop()
+        target = listener.buffer.target
+        listener.buffer.close()
+        if target is not None:
+            target.close()
+
+
+def log_settings() -> dict:
+    """Destino/formato do log configurado (para reproduzi-lo em workers com `configure_logging`)."""
+    return dict(_log_settings)
+
+
+def _reset_logging_in_child() -> None:
+    # Processo filho (fork) não herda a thread de log: `log_export` reconfigura
+    # em modo síncrono, mantendo destino e formato
+    global _log_listener
+    _log_listener = None
+    logging.getLogger(LOGGER_NAME).handlers.clear()
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_logging_in_child)
+
+
+def log_export(message: str, base_dir: Path | None = None, level: int = logging.INFO, **fields) -> None:
     """
     Registra mensagem de exportação com rotação automática de logs.
 
     Logs são rotacionados quando atingem 10MB, mantendo até 5 backups.
+    Se `configure_logging` ainda não foi chamado, configura o modo síncrono
+    na primeira chamada. Campos extras (`fields`, ex: duration_ms, bytes_out)
+    são gravados nos registros JSON.
+
+    Args:
+        message: Texto do registro
+        base_dir: Diretório do export_history.log; se diferente do configurado,
+            passa a ser o destino do log (padrão: o configurado ou project/output/logs)
+        level: Nível do registro; use logging.ERROR em falhas para gravá-las
+            imediatamente no modo em lotes
     """
-    ensure_dir(base_dir)
-    log_path = base_dir / "export_history.log"
-
-    # Configura logger com rotação
-    logger = logging.getLogger("mdd_publisher")
-    if not logger.handlers:
-        handler = RotatingFileHandler(
-            log_path,
-            maxBytes=10 * 1024 * 1024,  # 10MB
-            backupCount=5,
-            encoding="utf-8"
-        )
-        formatter = logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S")
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
+    with span("log", cat="log"):
+        logger = logging.getLogger(LOGGER_NAME)
+        if base_dir is not None and Path(base_dir) != _log_settings.get("base_dir"):
+            listener = _log_listener
+            batching = {"batch_size": listener.buffer.capacity, "flush_interval": listener.flush_interval} if listener else {}
+            configure_logging(
+                Path(base_dir), queued=listener is not None,
+                json_records=_log_settings.get("json_records", False), **batching,
+            )
+        elif not logger.handlers:
+            configure_logging(**{"base_dir": DEFAULT_LOG_DIR, **_log_settings}, queued=False)
+        if fields:
+            logger.log(level, message, extra={"export_fields": fields})
+        else:
+            logger.log(level, message)
+
+
+def export_metrics(fmt: str, doc: "MarkdownDocument", out_path: Path, started: float, **extra) -> dict:
+    """
+    Campos estruturados de uma exportação: duração e bytes de entrada/saída.
 
-    logger.info(message)
+    Os mesmos campos são anexados à medição por estágio ativa (`timing.note`).
+    """
+    fields = {
+        "format": fmt,
+        "source": str(doc.path),
+        "output": str(out_path),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        "bytes_in": doc.size_bytes,
+        "bytes_out": out_path.stat().st_size if out_path.exists() else 0,
+        **extra,
+    }
+    note(**fields)
+    return fields
 
 
 def md_to_html_basic(markdown_text: str) -> str:
@@ -77,111 +280,11 @@ def md_to_html_basic(markdown_text: str) -> str:
       * Blockquotes
       * Código em bloco
       * Linhas horizontais
-    """
-    try:
-        import markdown  # type: ignore
-        return markdown.markdown(
-            markdown_text,
-            extensions=[
-                "extra",
-                "smarty",
-                "sane_lists",
-                "toc",
-                "fenced_code",
-                "tables",
-            ],
-            output_format="html5",
-        )
-    except Exception:
-        # Conversão melhorada com regex como fallback
-        lines = markdown_text.splitlines()
-        html_lines = ["<div class=\"md-fallback\">"]
-        in_code = False
-        in_list = False
-        list_type: str | None = None  # 'ul' ou 'ol'
-
-        for ln in lines:
-            # Código em bloco (fenced)
-            if ln.strip().startswith("```"):
-                if not in_code:
-                    html_lines.append("<pre><code>")
-                    in_code = True
-                else:
-                    html_lines.append("</code></pre>")
-                    in_code = False
-                continue
-
-            if in_code:
-                html_lines.append(_escape_html(ln))
-                continue
 
-            # Fecha lista se necessário
-            if in_list and not (
-                ln.strip().startswith(("-", "*")) or re.match(r"^\d+\.\s", ln.strip())
-            ):
-                html_lines.append("</ul>" if list_type == 'ul' else "</ol>")
-                in_list = False
-                list_type = None
-
-            # Títulos (h1-h6)
-            if ln.startswith("#### "):
-                html_lines.append(f"<h4>{_inline_format(ln[5:].strip())}</h4>")
-            elif ln.startswith("### "):
-                html_lines.append(f"<h3>{_inline_format(ln[4:].strip())}</h3>")
-            elif ln.startswith("## "):
-                html_lines.append(f"<h2>{_inline_format(ln[3:].strip())}</h2>")
-            elif ln.startswith("# "):
-                html_lines.append(f"<h1>{_inline_format(ln[2:].strip())}</h1>")
-            # Linha horizontal
-            elif ln.strip() == "---":
-                html_lines.append("<hr />")
-            # Blockquote
-            elif ln.startswith("> "):
-                html_lines.append(f"<blockquote>{_inline_format(ln[2:].strip())}</blockquote>")
-            # Lista não-ordenada
-            elif ln.strip().startswith(("-", "*")) and len(ln.strip()) > 2:
-                if not in_list:
-                    html_lines.append("<ul>")
-                    in_list = True
-                    list_type = 'ul'
-                html_lines.append(f"<li>{_inline_format(ln.strip()[2:].strip())}</li>")
-            # Lista ordenada
-            elif re.match(r"^\d+\.\s", ln.strip()):
-                if not in_list:
-                    html_lines.append("<ol>")
-                    in_list = True
-                    list_type = 'ol'
-                content = re.sub(r"^\d+\.\s+", "", ln.strip())
-                html_lines.append(f"<li>{_inline_format(content)}</li>")
-            # Parágrafo
-            elif ln.strip():
-                html_lines.append(f"<p>{_inline_format(ln)}</p>")
-            else:
-                html_lines.append("")
-
-        if in_list:
-            html_lines.append("</ul>" if list_type == 'ul' else "</ol>")
-
-        html_lines.append("</div>")
-        return "\n".join(html_lines)
-
-
-def _inline_format(text: str) -> str:
-    """Aplica formatação inline (bold, italic, code, links)."""
-    # Links [texto](url)
-    text = re.sub(r'\[([^\]]+)\]\(([^\)]+)\)', r'<a href="\2">\1</a>', text)
-    # Bold **texto**
-    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
-    # Italic *texto*
-    text = re.sub(r'\*(.+?)\*', r'<em>\1</em>', text)
-    # Code inline `texto`
-    text = re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
-    return text
-
-
-def _escape_html(text: str) -> str:
-    """Escapa caracteres HTML especiais."""
-    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    Usa o conversor compartilhado do processo (`md_converter.get_converter`),
+    que reaproveita a instância do `markdown` entre documentos.
+    """
+    return get_converter().convert(markdown_text)
 
 
 BASE_STYLE = """
@@ -198,15 +301,40 @@ td, th { border: 1px solid #eaecef; padding: .5rem .75rem; }
 """.strip()
 
 
-def wrap_html(title: str, body_html: str, extra_css: str | None = None) -> str:
+def wrap_html(
+    title: str,
+    body_html: str,
+    extra_css: str | None = None,
+    inline_css: bool = True,
+    css_links: Iterable[str] = (),
+) -> str:
+    """
+    Página HTML completa com `BASE_STYLE` (e `extra_css`) num bloco `<style>`.
+
+    Com `inline_css=False` o bloco é omitido: o CSS é aplicado à parte pelo
+    chamador (ex: folhas de estilo já analisadas do weasyprint) ou referenciado
+    em `css_links` (URLs de folhas compartilhadas, ver `stylesheets.publish_stylesheet`).
+    """
+    with stage("wrap"):
+        return _wrap_html(title, body_html, extra_css, inline_css, css_links)
+
+
+def _wrap_html(
+    title: str,
+    body_html: str,
+    extra_css: str | None,
+    inline_css: bool = True,
+    css_links: Iterable[str] = (),
+) -> str:
     css = BASE_STYLE + ("\n" + extra_css if extra_css else "")
+    style = f"\n  <style>{css}</style>" if inline_css else ""
+    style += "".join(f"\n  <link rel=\"stylesheet\" href=\"{href}\" />" for href in css_links)
     return f"""<!doctype html>
 <html lang=\"pt-BR\">
 <head>
   <meta charset=\"utf-8\" />
   <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\" />
-  <title>{title}</title>
-  <style>{css}</style>
+  <title>{title}</title>{style}
   <meta name=\"generator\" content=\"MDD Publisher\" />
   <meta name=\"color-scheme\" content=\"light\" />
   <meta name=\"theme-color\" content=\"#2b70c9\" />
@@ -217,25 +345,105 @@ def wrap_html(title: str, body_html: str, extra_css: str | None = None) -> str:
 </html>"""
 
 
+DEFAULT_DOCS_DIR = Path("project/docs")
+
+
+def _load_docs_dir() -> Path | None:
+    """Lê `config.DOCS_DIR` sem alterar `sys.path` (config.py fica em `scripts/`)."""
+    try:
+        from config import DOCS_DIR
+        return DOCS_DIR
+    except ImportError:
+        pass
+    config_path = Path(__file__).resolve().parent.parent / "config.py"
+    try:
+        spec = importlib.util.spec_from_file_location("config", config_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules.setdefault("config", module)
+        return module.DOCS_DIR
+    except Exception:
+        return None
+
+
+class OutputPathResolver:
+    """
+    Resolve caminhos de saída padrão (fonte .md -> alvo) com cache.
+
+    As raízes de documentos (`config.DOCS_DIR` e `project/docs`) são carregadas
+    uma única vez; cada mapeamento resolvido fica em cache, o que mantém o custo
+    constante em processos longos (lote, daemon).
+
+    Args:
+        docs_roots: Raízes de documentos, em ordem de preferência
+            (padrão: `config.DOCS_DIR` e `project/docs`)
+        cache_size: Número máximo de mapeamentos mantidos em cache
+    """
+
+    def __init__(self, docs_roots: Iterable[Path] | None = None, cache_size: int = 4096):
+        if docs_roots is None:
+            docs_roots = [r for r in (_load_docs_dir(), DEFAULT_DOCS_DIR) if r is not None]
+        # Raízes absolutas: fontes relativas (`--input-dir project/docs`) são
+        # resolvidas em `_compute` antes do `relative_to`
+        self.docs_roots = tuple(Path(r).resolve() for r in docs_roots)
+        self._resolve = functools.lru_cache(maxsize=cache_size)(self._compute)
+
+    def _compute(self, md_path: Path, output_root: Path, new_ext: str) -> Path:
+        md_path = md_path.resolve()
+        for root in self.docs_roots:
+            try:
+                rel = md_path.relative_to(root)
+            except ValueError:
+                continue
+            return output_root / rel.with_suffix(new_ext)
+        return output_root / md_path.with_suffix(new_ext).name
+
+    def resolve(self, md_path: Path, output_root: Path, new_ext: str) -> Path:
+        """Caminho de saída de `md_path` sob `output_root`, com extensão `new_ext`."""
+        return self._resolve(Path(md_path), Path(output_root), new_ext)
+
+    def build_map(
+        self,
+        sources: Path | Iterable[Path],
+        targets: dict[str, tuple[Path, str]],
+        pattern: str = "**/*.md",
+    ) -> dict[Path, dict[str, Path]]:
+        """
+        Pré-calcula, numa única passada, os caminhos de saída de uma árvore.
+
+        Args:
+            sources: Diretório a percorrer (com `pattern`) ou lista de arquivos .md
+            targets: Formato -> (raiz de saída, extensão), ex: {"pdf": (OUTPUT_DIR, ".pdf")}
+            pattern: Padrão glob usado quando `sources` é um diretório
+
+        Returns:
+            Arquivo .md -> {formato: caminho de saída}
+        """
+        if isinstance(sources, Path):
+            sources = sorted(p for p in sources.glob(pattern) if p.is_file())
+        return {
+            md: {fmt: self.resolve(md, root, ext) for fmt, (root, ext) in targets.items()}
+            for md in sources
+        }
+
+
+_output_resolver: OutputPathResolver | None = None
+
+
+def get_output_resolver() -> OutputPathResolver:
+    """Retorna o resolvedor de caminhos compartilhado do processo."""
+    global _output_resolver
+    if _output_resolver is None:
+        _output_resolver = OutputPathResolver()
+    return _output_resolver
+
+
 def default_output_for_md(md_path: Path, output_root: Path, new_ext: str) -> Path:
     """
     Calcula caminho de saída padrão preservando estrutura de diretórios.
 
     Se o arquivo de entrada está em project/docs/, replica a hierarquia
     em output_root. Caso contrário, usa apenas o nome do arquivo.
+    Delega ao resolvedor compartilhado (`get_output_resolver`), com cache.
     """
-    # Tenta importar config para usar caminhos centralizados
-    try:
-        from pathlib import Path as P
-        script_dir = P(__file__).parent.parent
-        sys.path.insert(0, str(script_dir))
-        from config import DOCS_DIR
-        rel = md_path.relative_to(DOCS_DIR)
-        return output_root / rel.with_suffix(new_ext)
-    except Exception:
-        # Fallback: tenta path relativo genérico
-        try:
-            rel = md_path.relative_to(Path("project/docs"))
-            return output_root / rel.with_suffix(new_ext)
-        except Exception:
-            return output_root / md_path.with_suffix(new_ext).name
+    return get_output_resolver().resolve(md_path, output_root, new_ext)
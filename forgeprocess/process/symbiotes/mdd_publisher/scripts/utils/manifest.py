@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Manifesto de exportação incremental do MDD Publisher.
+
+Registra, por arquivo de saída, o hash do conteúdo Markdown de origem, a
+versão do exporter/CSS e o backend usado. Saídas cujo registro coincide com
+a exportação atual (e que ainda existem em disco) podem ser puladas.
+
+O manifesto é um JSON em `project/output/export_manifest.json`. A gravação
+mescla as entradas com o conteúdo atual do arquivo sob lock, de modo que
+vários processos (modo lote) podem atualizá-lo com segurança.
+
+`ValidationCache` usa o mesmo formato e protocolo de gravação para guardar
+resultados de validação de schema por hash de conteúdo.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+# Incrementar invalida todas as entradas existentes
+MANIFEST_VERSION = 1
+
+
+def content_hash(text: str) -> str:
+    """Hash SHA-256 (hex) de um texto UTF-8."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def style_version(*parts: str) -> str:
+    """
+    Versão curta de um exporter a partir das partes que afetam a saída
+    (ex: BASE_STYLE, PITCH_CSS ou um identificador do exporter).
+    """
+    h = hashlib.sha256(str(MANIFEST_VERSION).encode("utf-8"))
+    for part in parts:
+        h.update(b"\0" + part.encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+class ExportManifest:
+    """Registro de saídas exportadas, usado para pular alvos inalterados."""
+
+    def __init__(self, path: Path, entries: dict[str, dict] | None = None):
+        self.path = path
+        self.entries: dict[str, dict] = entries or {}
+        self.skipped: list[Path] = []
+        self._dirty: dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "ExportManifest":
+        """Carrega o manifesto; arquivo ausente ou corrompido gera manifesto vazio."""
+        return cls(path, _read_entries(path))
+
+    @staticmethod
+    def _key(output: Path) -> str:
+        return str(Path(output).resolve())
+
+    def should_skip(
+        self,
+        output: Path,
+        source_hash: str,
+        style: str,
+        backend: str | None = None,
+    ) -> bool:
+        """
+        Indica se `output` está atualizado em relação à exportação pedida.
+
+        Args:
+            output: Caminho do arquivo de saída
+            source_hash: Hash do conteúdo Markdown de origem
+            style: Versão do exporter/CSS (ver `style_version`)
+            backend: Backend esperado; None aceita qualquer backend registrado
+
+        Returns:
+            True se a saída existe e o registro coincide (a saída é contada em `skipped`)
+        """
+        entry = self.entries.get(self._key(output))
+        if not entry or not Path(output).exists():
+            return False
+        if entry.get("source_hash") != source_hash or entry.get("style") != style:
+            return False
+        if backend is not None and entry.get("backend") != backend:
+            return False
+        self.skipped.append(Path(output))
+        return True
+
+    def record(
+        self,
+        output: Path,
+        source: Path,
+        source_hash: str,
+        style: str,
+        backend: str,
+    ) -> None:
+        """Registra uma exportação bem-sucedida (persistida em `save`)."""
+        entry = {
+            "source": str(source),
+            "source_hash": source_hash,
+            "style": style,
+            "backend": backend,
+            "exported_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        key = self._key(output)
+        self.entries[key] = entry
+        self._dirty[key] = entry
+
+    def save(self) -> None:
+        """Mescla as entradas novas com o manifesto em disco e grava atomicamente."""
+        if not self._dirty:
+            return
+        self.entries = _merge_and_write(self.path, self._dirty)
+        self._dirty.clear()
+
+
+class ValidationCache:
+    """
+    Resultados de validação por chave de conteúdo (hash do texto + schema).
+
+    Artefatos inalterados entre execuções não são revalidados. O cache é
+    limitado a `max_entries`; ao gravar, as entradas mais antigas saem.
+    """
+
+    def __init__(self, path: Path, entries: dict[str, dict] | None = None, max_entries: int = 2048):
+        self.path = path
+        self.entries: dict[str, dict] = entries or {}
+        self.max_entries = max_entries
+        self.hits = 0
+        self._dirty: dict[str, dict] = {}
+
+    @classmethod
+    def load(cls, path: Path, max_entries: int = 2048) -> "ValidationCache":
+        """Carrega o cache; arquivo ausente ou corrompido gera cache vazio."""
+        return cls(path, _read_entries(path), max_entries)
+
+    def get(self, key: str) -> dict | None:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        """Registra um resultado (persistido em `save`)."""
+        self.entries[key] = entry
+        self._dirty[key] = entry
+
+    def save(self) -> None:
+        """Mescla as entradas novas com o cache em disco e grava atomicamente."""
+        if not self._dirty:
+            return
+        self.entries = _merge_and_write(self.path, self._dirty, self.max_entries)
+        self._dirty.clear()
+
+
+def _merge_and_write(path: Path, dirty: dict[str, dict], max_entries: int | None = None) -> dict[str, dict]:
+    """Mescla `dirty` com o arquivo em disco sob lock e grava atomicamente; devolve o resultado."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _locked(path):
+        merged = _read_entries(path)
+        for key in dirty:
+            merged.pop(key, None)  # reinsere no fim: as mais antigas ficam no início
+        merged.update(dirty)
+        if max_entries is not None and len(merged) > max_entries:
+            merged = dict(list(merged.items())[-max_entries:])
+        payload = {"version": MANIFEST_VERSION, "entries": merged}
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".manifest-", suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, ensure_ascii=False, indent=2, sort_keys=max_entries is None)
+        os.replace(tmp, path)
+    return merged
+
+
+def _read_entries(path: Path) -> dict[str, dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return dict(data.get("entries") or {})
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Lock exclusivo (POSIX) num arquivo `.lock` ao lado do manifesto."""
+    if fcntl is None:  # pragma: no cover - Windows
+        yield
+        return
+    with open(path.with_name(path.name + ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Conversor Markdown -> HTML reutilizável do MDD Publisher.
+
+- Com o pacote `markdown` disponível, mantém uma instância `markdown.Markdown`
+  por thread (extensões carregadas uma única vez) e apenas a reinicia entre
+  documentos.
+- Sem ele, usa um tokenizador de blocos com padrões pré-compilados e um
+  formatador inline de passada única.
+
+O tokenizador expõe eventos de bloco (`iter_blocks`) e inline (`iter_inline`)
+para que outros renderizadores possam reaproveitá-lo.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from typing import Iterator
+
+MARKDOWN_EXTENSIONS = [
+    "extra",
+    "smarty",
+    "sane_lists",
+    "toc",
+    "fenced_code",
+    "tables",
+]
+
+# Padrões de bloco (aplicados à linha já sem espaços nas bordas)
+FENCE_RE = re.compile(r"```")
+HEADING_RE = re.compile(r"(#{1,4}) (.*)")
+BULLET_RE = re.compile(r"[-*]\s+(.*)")
+ORDERED_RE = re.compile(r"\d+\.\s+(.*)")
+TABLE_SEPARATOR_RE = re.compile(r"\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?")
+TABLE_CELL_SPLIT_RE = re.compile(r"(?<!\\)\|")
+
+# Padrão inline único: link | **bold** | *italic* | `code`
+INLINE_RE = re.compile(
+    r"\[(?P<label>[^\]]+)\]\((?P<href>[^\)]+)\)"
+    r"|\*\*(?P<strong>.+?)\*\*"
+    r"|\*(?!\*)(?P<em>.+?)(?<!\*)\*(?!\*)"
+    r"|`(?P<code>[^`]+)`"
+)
+
+
+def iter_blocks(markdown_text: str) -> Iterator[tuple[str, object]]:
+    """
+    Tokeniza Markdown em eventos de bloco, linha a linha.
+
+    Eventos (tipo, dado):
+      ("heading", (nivel, texto)), ("paragraph", texto), ("quote", texto),
+      ("list_start", "ul"|"ol"), ("item", texto), ("list_end", "ul"|"ol"),
+      ("code_start", None), ("code_line", linha), ("code_end", None),
+      ("table", (cabecalho, alinhamentos, linhas)), ("hr", None), ("blank", None)
+
+    Listas aninhadas (item mais recuado que o anterior) abrem um novo
+    `list_start` dentro da lista corrente; a profundidade do item é o número
+    de listas abertas. Linhas em branco entre itens não encerram a lista
+    (lista "solta", `1. a` / linha vazia / `2. b`).
+
+    Tabelas no formato pipe (`| a | b |` seguido de `|---|---|`) são
+    emitidas num único evento, com as células já separadas.
+    """
+    in_code = False
+    # Listas abertas: (tipo, recuo do marcador), da mais externa à mais interna
+    lists: list[tuple[str, int]] = []
+    # Linhas em branco dentro de uma lista, emitidas só se ela terminar
+    blanks = 0
+    lines = markdown_text.splitlines()
+    i = 0
+
+    def close_lists(indent: int = -1) -> Iterator[tuple[str, object]]:
+        while lists and lists[-1][1] > indent:
+            yield "list_end", lists.pop()[0]
+
+    while i < len(lines):
+        ln = lines[i]
+        i += 1
+        stripped = ln.strip()
+
+        if lists and not stripped and not in_code:
+            blanks += 1
+            continue
+
+        # Código em bloco (fenced)
+        if stripped.startswith("```"):
+            yield from close_lists()
+            yield from [("blank", None)] * blanks
+            blanks = 0
+            in_code = not in_code
+            yield ("code_start" if in_code else "code_end"), None
+            continue
+        if in_code:
+            yield "code_line", ln
+            continue
+
+        # Tabela: linha com pipes seguida da linha separadora
+        if (
+            stripped.startswith("|")
+            and i < len(lines)
+            and "|" in lines[i]
+            and TABLE_SEPARATOR_RE.fullmatch(lines[i].strip())
+        ):
+            yield from close_lists()
+            yield from [("blank", None)] * blanks
+            blanks = 0
+            header = split_table_row(stripped)
+            aligns = [_cell_alignment(c) for c in split_table_row(lines[i].strip())]
+            rows = []
+            i += 1
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                rows.append(split_table_row(lines[i].strip()))
+                i += 1
+            yield "table", (header, aligns, rows)
+            continue
+
+        bullet = BULLET_RE.match(stripped)
+        ordered = None if bullet else ORDERED_RE.match(stripped)
+        kind = "ul" if bullet else "ol" if ordered else None
+
+        if kind:
+            indent = len(ln.expandtabs(4)) - len(ln.expandtabs(4).lstrip())
+            # Volta ao nível do item: fecha as listas mais recuadas
+            while len(lists) > 1 and indent <= lists[-2][1]:
+                yield "list_end", lists.pop()[0]
+            if lists and indent <= lists[-1][1] and kind != lists[-1][0]:
+                # Mesmo nível, outro tipo de lista
+                yield "list_end", lists.pop()[0]
+            if not lists or indent > lists[-1][1]:
+                lists.append((kind, indent))
+                yield "list_start", kind
+            blanks = 0
+            yield "item", (bullet or ordered).group(1).strip()
+            continue
+
+        # Qualquer outro bloco encerra as listas abertas
+        yield from close_lists()
+        yield from [("blank", None)] * blanks
+        blanks = 0
+
+        heading = HEADING_RE.match(ln)
+        if heading:
+            yield "heading", (len(heading.group(1)), heading.group(2).strip())
+        elif stripped == "---":
+            yield "hr", None
+        elif ln.startswith("> "):
+            yield "quote", ln[2:].strip()
+        elif stripped:
+            yield "paragraph", ln
+        else:
+            yield "blank", None
+
+    if in_code:
+        yield "code_end", None
+    yield from close_lists()
+    yield from [("blank", None)] * blanks
+
+
+def split_table_row(line: str) -> list[str]:
+    """Separa as células de uma linha de tabela pipe (`\\|` é um pipe literal)."""
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [cell.strip().replace("\\|", "|") for cell in TABLE_CELL_SPLIT_RE.split(line)]
+
+
+def _cell_alignment(spec: str) -> str | None:
+    if spec.startswith(":") and spec.endswith(":"):
+        return "center"
+    if spec.endswith(":"):
+        return "right"
+    if spec.startswith(":"):
+        return "left"
+    return None
+
+
+def iter_inline(text: str, bold: bool = False, italic: bool = False) -> Iterator[tuple[str, bool, bool, bool, str | None]]:
+    """
+    Tokeniza formatação inline em trechos (texto, negrito, itálico, código, href).
+
+    Negrito/itálico/link aninhados são resolvidos recursivamente; o conteúdo
+    de `code` é literal.
+    """
+    pos = 0
+    for m in INLINE_RE.finditer(text):
+        if m.start() > pos:
+            yield text[pos:m.start()], bold, italic, False, None
+        if m.group("label") is not None:
+            for chunk, b, i, c, _ in iter_inline(m.group("label"), bold, italic):
+                yield chunk, b, i, c, m.group("href")
+        elif m.group("strong") is not None:
+            yield from iter_inline(m.group("strong"), True, italic)
+        elif m.group("em") is not None:
+            yield from iter_inline(m.group("em"), bold, True)
+        else:
+            yield m.group("code"), bold, italic, True, None
+        pos = m.end()
+    if pos < len(text):
+        yield text[pos:], bold, italic, False, None
+
+
+def format_inline_html(text: str) -> str:
+    """Aplica formatação inline (bold, italic, code, links) numa única passada."""
+    return INLINE_RE.sub(_inline_html_replacement, text)
+
+
+def _inline_html_replacement(m: re.Match) -> str:
+    if m.group("label") is not None:
+        return f'<a href="{m.group("href")}">{format_inline_html(m.group("label"))}</a>'
+    if m.group("strong") is not None:
+        return f"<strong>{format_inline_html(m.group('strong'))}</strong>"
+    if m.group("em") is not None:
+        return f"<em>{format_inline_html(m.group('em'))}</em>"
+    return f"<code>{m.group('code')}</code>"
+
+
+def escape_html(text: str) -> str:
+    """Escapa caracteres HTML especiais."""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def render_blocks_html(markdown_text: str) -> str:
+    """
+    Conversão de fallback (sem o pacote `markdown`) com suporte a:
+      * Títulos (h1-h4)
+      * **Bold**, *Italic*, `code inline`
+      * [Links](url)
+      * Listas ordenadas e não-ordenadas
+      * Blockquotes
+      * Código em bloco
+      * Tabelas (formato pipe)
+      * Linhas horizontais
+    """
+    html_lines = ["<div class=\"md-fallback\">"]
+    append = html_lines.append
+    # Por lista aberta: índice da linha do `<li>` ainda aberto (sublistas ficam dentro dele)
+    open_items: list[int | None] = []
+
+    def close_item() -> None:
+        n = open_items[-1]
+        if n is not None:
+            if n == len(html_lines) - 1:
+                html_lines[n] += "</li>"
+            else:
+                append("</li>")
+            open_items[-1] = None
+
+    for kind, data in iter_blocks(markdown_text):
+        if kind == "heading":
+            level, text = data
+            append(f"<h{level}>{format_inline_html(text)}</h{level}>")
+        elif kind == "paragraph":
+            append(f"<p>{format_inline_html(data)}</p>")
+        elif kind == "item":
+            close_item()
+            open_items[-1] = len(html_lines)
+            append(f"<li>{format_inline_html(data)}")
+        elif kind == "list_start":
+            open_items.append(None)
+            append(f"<{data}>")
+        elif kind == "list_end":
+            close_item()
+            open_items.pop()
+            append(f"</{data}>")
+        elif kind == "quote":
+            append(f"<blockquote>{format_inline_html(data)}</blockquote>")
+        elif kind == "code_start":
+            append("<pre><code>")
+        elif kind == "code_line":
+            append(escape_html(data))
+        elif kind == "code_end":
+            append("</code></pre>")
+        elif kind == "table":
+            append(render_table_html(*data))
+        elif kind == "hr":
+            append("<hr />")
+        else:
+            append("")
+    append("</div>")
+    return "\n".join(html_lines)
+
+
+def render_table_html(header: list[str], aligns: list[str | None], rows: list[list[str]]) -> str:
+    """Renderiza uma tabela pipe tokenizada por `iter_blocks`."""
+    def cells(tag: str, values: list[str]) -> str:
+        out = []
+        for n, value in enumerate(values):
+            align = aligns[n] if n < len(aligns) else None
+            attr = f' style="text-align: {align}"' if align else ""
+            out.append(f"<{tag}{attr}>{format_inline_html(value)}</{tag}>")
+        return "".join(out)
+
+    body = "\n".join(f"<tr>{cells('td', row)}</tr>" for row in rows)
+    return f"<table>\n<thead>\n<tr>{cells('th', header)}</tr>\n</thead>\n<tbody>\n{body}\n</tbody>\n</table>"
+
+
+class MarkdownConverter:
+    """
+    Conversor Markdown -> HTML reutilizável entre documentos.
+
+    Args:
+        use_markdown: True/False força (ou desativa) o pacote `markdown`;
+            None usa-o se estiver instalado
+    """
+
+    def __init__(self, use_markdown: bool | None = None):
+        self._local = threading.local()
+        self._markdown = None
+        if use_markdown is not False:
+            try:
+                import markdown  # type: ignore
+                self._markdown = markdown
+            except Exception:
+                if use_markdown:
+                    raise
+
+    @property
+    def backend(self) -> str:
+        return "markdown" if self._markdown else "fallback"
+
+    def _instance(self):
+        # markdown.Markdown não é thread-safe: uma instância por thread
+        md = getattr(self._local, "md", None)
+        if md is None:
+            md = self._markdown.Markdown(extensions=MARKDOWN_EXTENSIONS, output_format="html5")
+            self._local.md = md
+        return md
+
+    def convert(self, markdown_text: str) -> str:
+        if self._markdown is not None:
+            try:
+                return self._instance().reset().convert(markdown_text)
+            except Exception:
+                # Instância pode ter ficado inconsistente: recria na próxima chamada
+                self._local.md = None
+        return render_blocks_html(markdown_text)
+
+
+_default_converter: MarkdownConverter | None = None
+
+
+def get_converter() -> MarkdownConverter:
+    """Retorna o conversor compartilhado do processo."""
+    global _default_converter
+    if _default_converter is None:
+        _default_converter = MarkdownConverter()
+    return _default_converter
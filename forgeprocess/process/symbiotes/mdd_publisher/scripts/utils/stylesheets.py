@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Folhas de estilo compartilhadas, nomeadas pelo hash do conteúdo.
+
+No modo `linked` (`--css linked`), em vez de embutir `BASE_STYLE`/`PITCH_CSS`
+num `<style>` de cada página (ou copiar o `style.css` do template para cada
+site), o CSS é gravado uma única vez como `<nome>.<hash>.css` num diretório
+`assets/` compartilhado e as páginas apenas o referenciam:
+
+    css = publish_stylesheet(BASE_STYLE, shared_assets_dir(page, OUTPUT_DIR), "base")
+    wrap_html(title, body, inline_css=False, css_links=[stylesheet_href(css, page)])
+
+Como o nome muda com o conteúdo, o arquivo nunca é regravado (se já existe,
+está correto) e navegadores/CDNs podem guardá-lo em cache indefinidamente.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+from manifest import content_hash
+from timing import stage
+
+# Modos de saída do CSS nas páginas HTML
+CSS_MODES = ("inline", "linked")
+ASSETS_DIRNAME = "assets"
+
+
+def hashed_stylesheet_name(css: str, name: str) -> str:
+    """Nome do arquivo com o hash do conteúdo (ex: `base.3f2a9c1d04b7.css`)."""
+    return f"{name}.{content_hash(css)[:12]}.css"
+
+
+def publish_stylesheet(css: str, directory: Path, name: str) -> Path:
+    """
+    Grava `css` em `directory/<name>.<hash>.css`, a menos que o arquivo já exista.
+
+    A gravação é atômica (arquivo temporário + rename), pois workers paralelos
+    podem publicar a mesma folha ao mesmo tempo.
+    """
+    path = directory / hashed_stylesheet_name(css, name)
+    if not path.exists():
+        with stage("write"):
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(css, encoding="utf-8")
+            os.replace(tmp, path)
+    return path
+
+
+def shared_assets_dir(page: Path, output_root: Path) -> Path:
+    """`assets/` sob `output_root` para páginas dentro dele; senão, ao lado da página."""
+    root = output_root.resolve()
+    if page.resolve().is_relative_to(root):
+        return root / ASSETS_DIRNAME
+    return page.parent.resolve() / ASSETS_DIRNAME
+
+
+def stylesheet_href(stylesheet: Path, page: Path) -> str:
+    """URL relativa de `stylesheet` a partir do diretório de `page`."""
+    return Path(os.path.relpath(stylesheet.resolve(), page.parent.resolve())).as_posix()
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Grava `text` em `path` só se o conteúdo for diferente; devolve se gravou."""
+    data = text.encode("utf-8")
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
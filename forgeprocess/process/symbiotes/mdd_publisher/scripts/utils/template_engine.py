@@ -9,7 +9,17 @@ from __future__ import annotations
 
 import json
 import re
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable, Iterator
+
+from stylesheets import publish_stylesheet, stylesheet_href, write_if_changed
+from timing import stage
+
+PLACEHOLDER_RE = re.compile(r'\{\{(\w+)\}\}')
+# Referência do template ao CSS copiado ao lado do index.html
+STYLE_HREF_RE = re.compile(r'href=(["\'])style\.css\1')
 
 
 def extract_frontmatter(md_content: str) -> dict[str, str]:
@@ -94,11 +104,171 @@ def extract_from_markdown(md_content: str) -> dict[str, str]:
     return variables
 
 
+FRONTMATTER_DELIMITER_RE = re.compile(r'---\s*')
+
+
+def _iter_lines(md_content: str | Iterable[str]) -> Iterator[str]:
+    """Itera linhas sem terminador, sem materializar uma lista (aceita str ou arquivo aberto)."""
+    if isinstance(md_content, str):
+        start = 0
+        while True:
+            end = md_content.find('\n', start)
+            if end == -1:
+                yield md_content[start:]
+                return
+            yield md_content[start:end]
+            start = end + 1
+    else:
+        for line in md_content:
+            yield line.rstrip('\r\n')
+
+
+def extract_variables(
+    md_content: str | Iterable[str],
+    required: set[str] | None = None,
+) -> dict[str, str]:
+    """
+    Extrai front matter, `titulo_principal` e seções em uma única passada.
+
+    Equivale a `extract_frontmatter` seguido de `extract_from_markdown`
+    (variáveis do conteúdo têm prioridade sobre o front matter), mas percorre
+    o texto uma vez só. Uma seção repetida vale pela primeira ocorrência, com
+    ou sem `required`. Se `required` for informado, a leitura termina assim
+    que todas essas variáveis tiverem sido encontradas no conteúdo (as do
+    front matter não contam, pois uma seção adiante ainda as sobrescreve).
+
+    Args:
+        md_content: Conteúdo Markdown (str) ou iterável de linhas (ex: arquivo aberto)
+        required: Variáveis que, uma vez todas encontradas, encerram a leitura
+
+    Returns:
+        Dicionário de variáveis extraídas
+    """
+    frontmatter: dict[str, str] = {}
+    variables: dict[str, str] = {}
+    lines = _iter_lines(md_content)
+
+    def done() -> bool:
+        return bool(required) and required.issubset(variables.keys())
+
+    # Front matter: só existe se a primeira linha for o delimitador
+    pending: list[str] = []
+    first = next(lines, None)
+    if first is None:
+        return variables
+    if FRONTMATTER_DELIMITER_RE.fullmatch(first):
+        block: list[str] = [first]
+        for line in lines:
+            block.append(line)
+            if FRONTMATTER_DELIMITER_RE.fullmatch(line):
+                for entry in block[1:-1]:
+                    if ':' in entry:
+                        key, value = entry.split(':', 1)
+                        frontmatter[key.strip()] = value.strip().strip("\"'")
+                break
+        else:
+            # Sem delimitador de fechamento: não é front matter
+            pending = block
+    else:
+        pending = [first]
+
+    current_section: str | None = None
+    section_content: list[str] = []
+
+    def close_section() -> None:
+        if current_section and section_content:
+            section_key = current_section.lower().replace(' ', '_')
+            variables.setdefault(section_key, ' '.join(section_content).strip())
+
+    for line in _chain(pending, lines):
+        if line.startswith('## '):
+            close_section()
+            if done():
+                break
+            current_section = line[3:].strip()
+            section_content = []
+        elif line.startswith('# '):
+            if 'titulo_principal' not in variables:
+                variables['titulo_principal'] = line[2:].strip()
+                if done():
+                    break
+        elif current_section and line.strip() and not line.startswith('#'):
+            section_content.append(line.strip())
+    else:
+        close_section()
+
+    return {**frontmatter, **variables}
+
+
+def _chain(first: list[str], rest: Iterator[str]) -> Iterator[str]:
+    yield from first
+    yield from rest
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """
+    Template HTML pré-tokenizado.
+
+    `segments` alterna literais e nomes de variáveis: posições pares são
+    trechos literais e posições ímpares são slots `{{variavel}}`. Renderizar
+    é um único `join`, linear no tamanho da saída.
+    """
+    path: Path
+    mtime_ns: int
+    segments: tuple[str, ...]
+    placeholders: frozenset[str]
+
+    def render(self, variables: dict[str, str]) -> str:
+        """Substitui os slots pelos valores; variáveis ausentes viram string vazia."""
+        parts = list(self.segments)
+        for i in range(1, len(parts), 2):
+            parts[i] = variables.get(parts[i], '')
+        return ''.join(parts)
+
+
+_template_cache: dict[Path, CompiledTemplate] = {}
+_template_cache_lock = threading.Lock()
+
+
+def compile_template(template_path: Path) -> CompiledTemplate:
+    """
+    Compila (ou obtém do cache) um template HTML.
+
+    O cache é por caminho e invalidado pelo mtime do arquivo: um acerto custa
+    apenas um `stat`, sem leitura do disco.
+
+    Raises:
+        FileNotFoundError: Se template não existir
+    """
+    try:
+        mtime_ns = template_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Template não encontrado: {template_path}") from None
+
+    cached = _template_cache.get(template_path)
+    if cached is not None and cached.mtime_ns == mtime_ns:
+        return cached
+
+    # re.split com grupo de captura já alterna literal / nome da variável
+    segments = tuple(PLACEHOLDER_RE.split(template_path.read_text(encoding='utf-8')))
+    compiled = CompiledTemplate(
+        path=template_path,
+        mtime_ns=mtime_ns,
+        segments=segments,
+        placeholders=frozenset(segments[1::2]),
+    )
+    with _template_cache_lock:
+        _template_cache[template_path] = compiled
+    return compiled
+
+
 def apply_template(template_path: Path, variables: dict[str, str], strict: bool = False) -> str:
     """
     Aplica variáveis a um template HTML.
 
     Substitui todos os marcadores {{variavel}} pelos valores fornecidos.
+    O template é compilado uma vez e reaproveitado enquanto o arquivo não mudar.
 
     Args:
         template_path: Caminho para o arquivo index.html do template
@@ -112,28 +282,16 @@ def apply_template(template_path: Path, variables: dict[str, str], strict: bool
         FileNotFoundError: Se template não existir
         ValueError: Se strict=True e variável obrigatória ausente
     """
-    if not template_path.exists():
-        raise FileNotFoundError(f"Template não encontrado: {template_path}")
-
-    template_html = template_path.read_text(encoding='utf-8')
-
-    # Encontra todas as variáveis no template
-    placeholders = set(re.findall(r'\{\{(\w+)\}\}', template_html))
+    compiled = compile_template(template_path)
 
     if strict:
         # Verifica variáveis obrigatórias
-        missing = placeholders - set(variables.keys())
+        missing = compiled.placeholders - set(variables.keys())
         if missing:
             raise ValueError(f"Variáveis obrigatórias ausentes: {', '.join(missing)}")
 
-    # Substitui variáveis
-    for key, value in variables.items():
-        template_html = template_html.replace(f'{{{{{key}}}}}', value)
-
-    # Limpa variáveis não substituídas (opcional)
-    template_html = re.sub(r'\{\{(\w+)\}\}', '', template_html)
-
-    return template_html
+    # Variáveis não substituídas são removidas
+    return compiled.render(variables)
 
 
 def load_template_config(template_dir: Path) -> dict | None:
@@ -156,29 +314,116 @@ def load_template_config(template_dir: Path) -> dict | None:
         return None
 
 
+@dataclass(frozen=True)
+class SiteTemplate:
+    """Template de site carregado uma vez: HTML compilado, CSS e config.json."""
+    directory: Path
+    compiled: CompiledTemplate
+    css: str | None
+    config: dict | None
+
+    @property
+    def name(self) -> str:
+        return self.directory.name
+
+    @property
+    def required_variables(self) -> set[str]:
+        return set(self.config.get('variaveis_obrigatorias', [])) if self.config else set()
+
+
+def load_site_template(template_dir: Path) -> SiteTemplate:
+    """
+    Carrega um diretório de template (index.html, style.css, config.json).
+
+    O objeto retornado pode ser compartilhado entre vários renders
+    (inclusive em threads), evitando reler CSS e config a cada variante.
+
+    Raises:
+        FileNotFoundError: Se index.html não existir
+    """
+    css_path = template_dir / 'style.css'
+    return SiteTemplate(
+        directory=template_dir,
+        compiled=compile_template(template_dir / 'index.html'),
+        css=css_path.read_text(encoding='utf-8') if css_path.exists() else None,
+        config=load_template_config(template_dir),
+    )
+
+
+def render_site_html(
+    md_content: str | Iterable[str],
+    template: SiteTemplate,
+    extra_vars: dict[str, str] | None = None,
+    strict: bool = False
+) -> str:
+    """
+    Renderiza o HTML de um site em memória (ver `render_site`, que grava o resultado).
+
+    Args:
+        md_content: Markdown com front matter (texto ou iterável de linhas)
+        template: Template carregado com `load_site_template`
+        extra_vars: Variáveis adicionais a aplicar
+        strict: Se True, valida variáveis obrigatórias
+
+    Raises:
+        ValueError: Se strict=True e houver variáveis ausentes
+    """
+    # Só precisamos das variáveis que o template consome e que não vêm de extra_vars
+    needed = (template.compiled.placeholders | template.required_variables) - set(extra_vars or ())
+
+    # 1. Front matter (prioridade alta) e 2. conteúdo MD (prioridade média),
+    # extraídos em uma única passada que para quando `needed` estiver completo
+    with stage("read"):
+        variables = extract_variables(md_content, required=needed)
+
+    # 3. Variáveis extras (prioridade máxima)
+    if extra_vars:
+        variables.update(extra_vars)
+
+    # Se strict, valida variáveis obrigatórias definidas no config.json do template
+    if strict:
+        required = template.required_variables
+        if required:
+            missing = required - set(variables.keys())
+            if missing:
+                raise ValueError(f"Variáveis obrigatórias ausentes (config.json): {', '.join(sorted(missing))}")
+        missing = template.compiled.placeholders - set(variables.keys())
+        if missing:
+            raise ValueError(f"Variáveis obrigatórias ausentes: {', '.join(missing)}")
+
+    # Renderiza template
+    with stage("template"):
+        return template.compiled.render(variables)
+
+
 def render_site(
     md_path: Path,
-    template_dir: Path,
+    template_dir: Path | SiteTemplate,
     output_path: Path,
     extra_vars: dict[str, str] | None = None,
-    strict: bool = False
+    strict: bool = False,
+    css_dir: Path | None = None
 ) -> Path:
     """
     Renderiza um site completo a partir de MD + template.
 
     Processo:
-    1. Lê arquivo Markdown
-    2. Extrai front matter (se existir)
-    3. Extrai variáveis do conteúdo MD
-    4. Aplica ao template HTML
-    5. Salva em output_path
+    1. Lê arquivo Markdown em streaming
+    2. Extrai front matter e variáveis do conteúdo MD numa única passada
+       (`extract_variables`), parando quando o template estiver satisfeito
+    3. Aplica ao template HTML
+    4. Salva em output_path
 
     Args:
         md_path: Arquivo .md com conteúdo e variáveis
         template_dir: Diretório do template (contém index.html, style.css, config.json)
+            ou template já carregado com `load_site_template`
         output_path: Caminho de saída para index.html
         extra_vars: Variáveis adicionais a aplicar
         strict: Se True, valida variáveis obrigatórias
+        css_dir: Se informado, o style.css do template é publicado uma única vez
+            nesse diretório como `style.<hash>.css` e o `href="style.css"` do
+            HTML passa a apontar para ele (em vez de uma cópia por site)
 
     Returns:
         Path do arquivo gerado
@@ -190,42 +435,21 @@ def render_site(
     if not md_path.exists():
         raise FileNotFoundError(f"Arquivo MD não encontrado: {md_path}")
 
-    md_content = md_path.read_text(encoding='utf-8')
-
-    # Extrai variáveis de múltiplas fontes
-    variables: dict[str, str] = {}
-
-    # 1. Front matter (prioridade alta)
-    variables.update(extract_frontmatter(md_content))
+    template = template_dir if isinstance(template_dir, SiteTemplate) else load_site_template(template_dir)
+    with md_path.open(encoding='utf-8') as md_file:
+        rendered_html = render_site_html(md_file, template, extra_vars, strict)
 
-    # 2. Conteúdo MD (prioridade média)
-    variables.update(extract_from_markdown(md_content))
+    if template.css is not None and css_dir is not None:
+        href = stylesheet_href(publish_stylesheet(template.css, css_dir, "style"), output_path)
+        rendered_html = STYLE_HREF_RE.sub(lambda m: f'href={m.group(1)}{href}{m.group(1)}', rendered_html)
 
-    # 3. Variáveis extras (prioridade máxima)
-    if extra_vars:
-        variables.update(extra_vars)
+    with stage("write"):
+        # Salva output
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(rendered_html, encoding='utf-8')
 
-    # Se strict, valida variáveis obrigatórias definidas no config.json do template
-    if strict:
-        cfg = load_template_config(template_dir)
-        required = set(cfg.get('variaveis_obrigatorias', [])) if cfg else set()
-        if required:
-            missing = required - set(variables.keys())
-            if missing:
-                raise ValueError(f"Variáveis obrigatórias ausentes (config.json): {', '.join(sorted(missing))}")
-
-    # Renderiza template
-    template_html_path = template_dir / 'index.html'
-    rendered_html = apply_template(template_html_path, variables, strict=strict)
-
-    # Salva output
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(rendered_html, encoding='utf-8')
-
-    # Copia CSS se existir
-    css_source = template_dir / 'style.css'
-    if css_source.exists():
-        css_dest = output_path.parent / 'style.css'
-        css_dest.write_text(css_source.read_text(encoding='utf-8'), encoding='utf-8')
+        # Copia CSS se existir (sem regravar um style.css idêntico)
+        if template.css is not None and css_dir is None:
+            write_if_changed(output_path.parent / 'style.css', template.css)
 
     return output_path
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Instrumentação por estágio das exportações do MDD Publisher.
+
+Os exporters marcam seus estágios (leitura, conversão, template, backend,
+gravação) com `stage("nome")`. A medição só acontece dentro de um
+`collect_stages()` ativo no contexto atual; fora dele `stage` não mede nada.
+
+    with collect_stages() as timer:
+        export_pdf(Path("project/docs/visao.md"))
+    timer.stages   # {"read": 0.4, "convert": 12.1, "wrap": 0.1, "render": 830.2}
+    timer.info     # {"format": "pdf", "backend": "weasyprint", "bytes_in": ..., ...}
+
+`TimingReport` agrega os tempos de vários jobs (p50/p95 por estágio) e
+`profiled` grava um cProfile (.pstats) de um trecho. Com um tracer ativo
+(`tracing.tracing()`), cada estágio também vira um trecho na linha do tempo.
+"""
+from __future__ import annotations
+
+import cProfile
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from tracing import clock_us, current_tracer
+
+# Ordem de exibição dos estágios conhecidos; outros vêm depois, em ordem alfabética
+STAGE_ORDER = ("read", "validate", "convert", "wrap", "template", "render", "write")
+
+
+@dataclass
+class StageTimer:
+    """Tempo (ms) acumulado por estágio e metadados de uma exportação."""
+    stages: dict[str, float] = field(default_factory=dict)
+    info: dict = field(default_factory=dict)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.stages.values())
+
+
+_current: ContextVar[StageTimer | None] = ContextVar("mdd_stage_timer", default=None)
+
+
+@contextmanager
+def collect_stages() -> Iterator[StageTimer]:
+    """Ativa a medição de estágios no contexto atual (thread/tarefa)."""
+    timer = StageTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Mede o bloco como estágio `name` (acumula se repetido); sem coletor nem tracer ativo, não mede."""
+    timer = _current.get()
+    tracer = current_tracer()
+    if timer is None and tracer is None:
+        yield
+        return
+    trace_start = clock_us() if tracer is not None else 0
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timer is not None:
+            elapsed = (time.perf_counter() - started) * 1000
+            timer.stages[name] = timer.stages.get(name, 0.0) + elapsed
+        if tracer is not None:
+            tracer.complete(name, trace_start)
+
+
+def note(**info) -> None:
+    """Anexa metadados (backend, bytes_in, bytes_out...) à exportação medida, se houver."""
+    timer = _current.get()
+    if timer is not None:
+        timer.info.update(info)
+
+
+@contextmanager
+def profiled(output: Path | None) -> Iterator[None]:
+    """Grava um cProfile do bloco em `output` (.pstats); com None, não perfila."""
+    if output is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        output.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(output))
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Percentil por posto mais próximo (`q` em 0..100) de uma lista não vazia."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil sem float
+    return ordered[int(rank) - 1]
+
+
+class TimingReport:
+    """Agrega os tempos por estágio de vários jobs para o resumo `--timings`."""
+
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = {}
+        self.backends: dict[str, int] = {}
+        self.jobs = 0
+
+    def add(self, stages: dict[str, float], info: dict | None = None, wall_ms: float | None = None) -> None:
+        """Registra um job: tempos por estágio, metadados e tempo total de parede (padrão: soma)."""
+        if not stages:
+            return
+        self.jobs += 1
+        for name, ms in stages.items():
+            self.samples.setdefault(name, []).append(ms)
+        self.samples.setdefault("total", []).append(sum(stages.values()) if wall_ms is None else wall_ms)
+        backend = (info or {}).get("backend")
+        if backend:
+            self.backends[backend] = self.backends.get(backend, 0) + 1
+
+    def format_summary(self) -> str:
+        """Tabela com n, p50, p95 e máximo (ms) por estágio."""
+        if not self.jobs:
+            return "Tempos por estágio: nenhum job medido"
+        names = sorted(
+            (n for n in self.samples if n != "total"),
+            key=lambda n: (STAGE_ORDER.index(n) if n in STAGE_ORDER else len(STAGE_ORDER), n),
+        ) + ["total"]
+        lines = [
+            f"Tempos por estágio ({self.jobs} job(s)):",
+            f"  {'estágio':<10} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'máx ms':>10}",
+        ]
+        for name in names:
+            values = self.samples[name]
+            lines.append(
+                f"  {name:<10} {len(values):>5} {percentile(values, 50):>10.1f} "
+                f"{percentile(values, 95):>10.1f} {max(values):>10.1f}"
+            )
+        if self.backends:
+            lines.append("  backends: " + ", ".join(f"{b} ({n})" for b, n in sorted(self.backends.items())))
+        return "\n".join(lines)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Linha do tempo (trace) das exportações no formato Chrome trace-event.
+
+Enquanto `timing` agrega tempos por estágio, o tracer registra cada trecho
+(`job`, `read`, `convert`, `render`, `write`, `log`...) com início, duração,
+processo e thread, para visualizar a sobreposição dos jobs num lote: workers
+ociosos, jobs de PDF que seguram o pool, gravações de log que bloqueiam.
+
+    with tracing() as tracer:
+        export_pdf(Path("project/docs/visao.md"))
+    tracer.write(Path("trace.json"))
+
+O arquivo abre em chrome://tracing, https://ui.perfetto.dev ou speedscope.
+Sem tracer ativo, `span` (e `timing.stage`) apenas checam uma variável global.
+
+Em pools de processos, cada worker grava seus eventos num tracer próprio
+(`run_export_job(..., trace=True)`) e os devolve no resultado; o processo
+principal junta tudo com `Tracer.extend` antes de gravar.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+
+def clock_us() -> int:
+    """Relógio do trace em microssegundos (época Unix, comparável entre processos)."""
+    return time.time_ns() // 1000
+
+
+class Tracer:
+    """Acumula eventos "X" (duração completa) do processo atual."""
+
+    def __init__(self) -> None:
+        self.events: list[dict] = []
+        self.pid = os.getpid()
+        self.thread_names: dict[tuple[int, int], str] = {}
+
+    def complete(self, name: str, start_us: int, cat: str = "stage", args: dict | None = None) -> None:
+        """Registra um trecho `name` iniciado em `start_us` e terminado agora."""
+        tid = threading.get_native_id()
+        if (self.pid, tid) not in self.thread_names:
+            self.thread_names[(self.pid, tid)] = threading.current_thread().name
+        event = {
+            "name": name, "cat": cat, "ph": "X",
+            "ts": start_us, "dur": clock_us() - start_us,
+            "pid": self.pid, "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def export(self) -> dict:
+        """Eventos e nomes de thread em tipos simples (para devolver de um worker)."""
+        threads = [[pid, tid, name] for (pid, tid), name in self.thread_names.items()]
+        return {"events": self.events, "threads": threads}
+
+    def extend(self, exported: dict | None) -> None:
+        """Incorpora os eventos de outro tracer (ex: de um worker do pool)."""
+        if not exported:
+            return
+        self.events.extend(exported["events"])
+        for pid, tid, name in exported["threads"]:
+            self.thread_names.setdefault((pid, tid), name)
+
+    def to_chrome(self) -> dict:
+        """Documento trace-event: tempos relativos ao primeiro evento e nomes de processo/thread."""
+        events = sorted(self.events, key=lambda e: e["ts"])
+        origin = events[0]["ts"] if events else 0
+        pids = list(dict.fromkeys(e["pid"] for e in events))
+        metadata = []
+        workers = 0
+        for pid in pids:
+            if pid == self.pid:
+                label = f"mdd_publish (pid {pid})"
+            else:
+                workers += 1
+                label = f"worker {workers} (pid {pid})"
+            metadata.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": label}})
+            metadata.append({
+                "name": "process_sort_index", "ph": "M", "pid": pid, "tid": 0,
+                "args": {"sort_index": 0 if pid == self.pid else workers},
+            })
+        seen: set[tuple[int, int]] = set()
+        for e in events:
+            key = (e["pid"], e["tid"])
+            if key not in seen:
+                seen.add(key)
+                name = self.thread_names.get(key, str(e["tid"]))
+                metadata.append({"name": "thread_name", "ph": "M", "pid": e["pid"], "tid": e["tid"], "args": {"name": name}})
+        return {
+            "traceEvents": metadata + [{**e, "ts": e["ts"] - origin} for e in events],
+            "displayTimeUnit": "ms",
+            "otherData": {"generator": "mdd_publisher", "origin_unix_us": origin},
+        }
+
+    def write(self, path: Path) -> Path:
+        """Grava o trace em JSON (chrome://tracing, Perfetto)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome(), ensure_ascii=False), encoding="utf-8")
+        return path
+
+
+_tracer: Tracer | None = None
+
+
+def current_tracer() -> Tracer | None:
+    """Tracer ativo no processo, ou None (tracing desligado)."""
+    return _tracer
+
+
+@contextmanager
+def tracing(enabled: bool = True) -> Iterator[Tracer | None]:
+    """
+    Ativa um tracer novo no processo durante o bloco (vale para todas as threads).
+
+    O tracer anterior, se houver, é restaurado ao sair; com `enabled=False`
+    nada é ativado e o bloco recebe None.
+    """
+    global _tracer
+    if not enabled:
+        yield None
+        return
+    previous, _tracer = _tracer, Tracer()
+    try:
+        yield _tracer
+    finally:
+        _tracer = previous
+
+
+@contextmanager
+def span(name: str, cat: str = "stage", **args) -> Iterator[None]:
+    """Registra o bloco como trecho `name` no tracer ativo; sem tracer, não faz nada."""
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+    started = clock_us()
+    try:
+        yield
+    finally:
+        tracer.complete(name, started, cat, args)
+
+
+def _reset_tracer_in_child() -> None:
+    # Worker criado por fork não herda o tracer (nem os eventos) do processo pai
+    global _tracer
+    _tracer = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_tracer_in_child)
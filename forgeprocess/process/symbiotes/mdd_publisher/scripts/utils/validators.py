@@ -7,8 +7,21 @@ para cada tipo de artefato do processo MDD, prevenindo erros na exportação.
 """
 from __future__ import annotations
 
+import fnmatch
+import hashlib
+import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable
+
+# Arquivo opcional de schemas (YAML) que complementa REQUIRED_SECTIONS
+try:
+    from config import VALIDATION_SCHEMAS_FILE as SCHEMAS_FILE
+except ImportError:
+    SCHEMAS_FILE = None
 
 # Schemas de validação: seções obrigatórias por tipo de artefato
 REQUIRED_SECTIONS: dict[str, list[str]] = {
@@ -45,13 +58,288 @@ class ValidationError(Exception):
     pass
 
 
-def validate_artifact(md_path: Path, strict: bool = False) -> list[str]:
+# Linhas de título Markdown: só elas são examinadas pelos schemas
+HEADING_LINE_RE = re.compile(r"^#.*", re.MULTILINE)
+
+
+def section_label(pattern: str) -> str:
+    """Descrição legível de um padrão de seção (mensagens de erro)."""
+    label = pattern.replace(r'^#\s+', '').replace(r'^##\s+', '').replace(r'\s+', ' ')
+    return re.sub(r'\[.*?\]', '', label)  # Remove regex classes
+
+
+def describe_pattern(pattern: str) -> str:
+    """Converte um padrão de seção em título legível (ex: `## Métricas`)."""
+    clean = pattern.replace(r'^#\s+', '# ').replace(r'^##\s+', '## ')
+    return re.sub(r'\[.*?\]', lambda m: m.group(0)[1], clean)
+
+
+@dataclass(frozen=True)
+class SectionMatch:
+    """Seção obrigatória de um schema e a linha (1-based) em que foi encontrada."""
+    pattern: str
+    line: int | None
+
+    @property
+    def found(self) -> bool:
+        return self.line is not None
+
+
+@dataclass
+class ValidationResult:
+    """Resultado da validação de um artefato contra o schema que casou com seu nome."""
+    path: Path
+    schema: str | None
+    sections: list[SectionMatch] = field(default_factory=list)
+
+    @property
+    def errors(self) -> list[str]:
+        return [f"Seção obrigatória ausente: {section_label(s.pattern)}" for s in self.sections if not s.found]
+
+    @property
+    def ok(self) -> bool:
+        return all(s.found for s in self.sections)
+
+    def to_dict(self) -> dict:
+        return {"schema": self.schema, "sections": [[s.pattern, s.line] for s in self.sections]}
+
+    @classmethod
+    def from_dict(cls, path: Path, data: dict) -> "ValidationResult":
+        return cls(path, data["schema"], [SectionMatch(p, line) for p, line in data["sections"]])
+
+
+class SchemaSet:
+    """
+    Schemas de artefatos compilados num único matcher de títulos.
+
+    Todos os padrões (sem repetição) viram lookaheads opcionais de uma só
+    expressão, de modo que uma linha de título é testada contra todos eles
+    numa única chamada e cada padrão que casa é identificado pelo seu grupo.
+    Padrões que não podem ser combinados sem mudar de sentido (com grupos
+    próprios, como retrorreferências e grupos nomeados, ou flags inline como
+    `(?i)`) são testados um a um. A validação faz uma passada pelo texto
+    coletando apenas linhas que começam com `#`.
+
+    Chaves de schema são nomes de arquivo (`visao.md`) ou padrões glob
+    (`site_*.md`); nomes exatos têm precedência e, entre globs, vale o
+    primeiro declarado.
+
+    Args:
+        schemas: Mapeamento {arquivo ou glob: [regex de seção obrigatória]}
+    """
+
+    def __init__(self, schemas: dict[str, list[str]]):
+        self.schemas = {name: list(patterns) for name, patterns in schemas.items()}
+        self._globs = [name for name in self.schemas if any(c in name for c in "*?[")]
+        patterns = list(dict.fromkeys(p for ps in self.schemas.values() for p in ps))
+        self._index = {p: n for n, p in enumerate(patterns)}
+        combined = {n: p for n, p in enumerate(patterns) if _combinable(p)}
+        self._matcher = re.compile(
+            "".join(f"(?:(?=(?P<s{n}>{p})))?" for n, p in combined.items()), re.IGNORECASE
+        )
+        self._separate = {
+            n: re.compile(p, re.IGNORECASE) for n, p in enumerate(patterns) if n not in combined
+        }
+
+    @classmethod
+    def from_file(cls, path: Path, base: dict[str, list[str]] | None = None) -> "SchemaSet":
+        """
+        Carrega schemas de um arquivo YAML (ou JSON), sobrepostos a `base`.
+
+        O arquivo é um mapeamento de nome (ou glob) para a lista de regex:
+
+            relatorio.md:
+              - '^#\\s+Relat[óo]rio'
+              - '^##\\s+Conclus[ãa]o'
+
+        Raises:
+            ValidationError: Se o arquivo não for um mapeamento válido ou os
+                padrões não compilarem
+        """
+        schemas = dict(base or {})
+        schemas.update(_load_schema_file(path))
+        try:
+            return cls(schemas)
+        except re.error as e:
+            raise ValidationError(f"{path}: schemas não compiláveis ({e})") from e
+
+    def schema_for(self, name: str) -> str | None:
+        """Schema aplicável a um nome de arquivo, ou None."""
+        if name in self.schemas:
+            return name
+        for pattern in self._globs:
+            if fnmatch.fnmatchcase(name, pattern):
+                return pattern
+        return None
+
+    def fingerprint(self, schema: str) -> str:
+        """Identifica o conteúdo de um schema (chave do cache de validação)."""
+        h = hashlib.sha256(schema.encode("utf-8"))
+        for pattern in self.schemas[schema]:
+            h.update(b"\0" + pattern.encode("utf-8"))
+        return h.hexdigest()[:16]
+
+    def check_text(self, text: str, name: str, path: Path | None = None) -> ValidationResult:
+        """Valida o conteúdo `text` de um artefato chamado `name`."""
+        schema = self.schema_for(name)
+        result = ValidationResult(path if path is not None else Path(name), schema)
+        if schema is None or not self.schemas[schema]:
+            return result
+
+        wanted = {self._index[p] for p in self.schemas[schema]}
+        first_line: dict[int, int] = {}
+        line, pos = 1, 0
+        for heading in HEADING_LINE_RE.finditer(text):
+            line += text.count("\n", pos, heading.start())
+            pos = heading.start()
+            title = heading.group(0)
+            match = self._matcher.match(title)
+            for n in wanted:
+                if n in first_line:
+                    continue
+                single = self._separate.get(n)
+                found = single.match(title) if single is not None else match.group(f"s{n}")
+                if found is not None:
+                    first_line[n] = line
+            if len(first_line) == len(wanted):
+                break
+
+        result.sections = [SectionMatch(p, first_line.get(self._index[p])) for p in self.schemas[schema]]
+        return result
+
+    def check_file(self, md_path: Path) -> ValidationResult:
+        """
+        Valida um arquivo; arquivos sem schema não são lidos.
+
+        Raises:
+            FileNotFoundError: Se o arquivo não existir
+        """
+        if self.schema_for(md_path.name) is None:
+            if not md_path.exists():
+                raise FileNotFoundError(f"Arquivo não encontrado: {md_path}")
+            return ValidationResult(md_path, None)
+        try:
+            text = md_path.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Arquivo não encontrado: {md_path}") from None
+        return self.check_text(text, md_path.name, md_path)
+
+    def check_dirs(self, docs_dirs: Iterable[Path], jobs: int | None = None) -> list[ValidationResult]:
+        """
+        Valida em paralelo (threads) os `*.md` com schema de um ou mais diretórios.
+
+        Returns:
+            Resultados em ordem de diretório e nome de arquivo
+        """
+        files = [
+            f for d in docs_dirs for f in sorted(Path(d).glob('*.md'))
+            if self.schema_for(f.name) is not None
+        ]
+        if len(files) <= 1:
+            return [self.check_file(f) for f in files]
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(files)))
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(self.check_file, files))
+
+
+def _combinable(pattern: str) -> bool:
+    """Indica se `pattern` pode entrar no matcher combinado de `SchemaSet`."""
+    try:
+        # Grupos próprios renumeram retrorreferências e podem repetir nomes;
+        # flags inline só valem no início da expressão
+        return re.compile(pattern).groups == 0 and re.compile(f"(?=(?P<s>{pattern}))") is not None
+    except re.error:
+        return False
+
+
+def _load_schema_file(path: Path) -> dict[str, list[str]]:
+    text = path.read_text(encoding='utf-8')
+    try:
+        import yaml  # type: ignore
+        data = yaml.safe_load(text)
+    except ImportError:
+        # JSON também é YAML válido: sem PyYAML, aceita arquivos JSON
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValidationError(f"{path}: PyYAML não disponível e o arquivo não é JSON ({e})") from e
+    except Exception as e:
+        raise ValidationError(f"{path}: YAML inválido ({e})") from e
+
+    if not isinstance(data, dict) or not all(
+        isinstance(k, str) and isinstance(v, list) and all(isinstance(p, str) for p in v)
+        for k, v in data.items()
+    ):
+        raise ValidationError(f"{path}: esperado um mapeamento {{arquivo: [regex, ...]}}")
+    for patterns in data.values():
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValidationError(f"{path}: regex inválida {pattern!r} ({e})") from e
+    return data
+
+
+_schema_set: SchemaSet | None = None
+
+
+def get_schemas() -> SchemaSet:
+    """
+    Schemas padrão compilados (uma vez por processo).
+
+    `REQUIRED_SECTIONS` mais, se existir, o arquivo `config.VALIDATION_SCHEMAS_FILE`,
+    cujas entradas acrescentam ou substituem tipos de artefato.
+    """
+    global _schema_set
+    if _schema_set is None:
+        if SCHEMAS_FILE is not None and SCHEMAS_FILE.exists():
+            _schema_set = SchemaSet.from_file(SCHEMAS_FILE, REQUIRED_SECTIONS)
+        else:
+            _schema_set = SchemaSet(REQUIRED_SECTIONS)
+    return _schema_set
+
+
+def validate_document(
+    text: str,
+    path: Path,
+    cache=None,
+    text_hash: str | None = None,
+    schemas: SchemaSet | None = None,
+) -> ValidationResult:
+    """
+    Valida um artefato já carregado em memória, consultando um cache opcional.
+
+    Args:
+        text: Conteúdo Markdown
+        path: Caminho do artefato (o nome escolhe o schema)
+        cache: `manifest.ValidationCache` (ou objeto com `get`/`put`); resultados
+            são guardados pela chave (hash do texto, schema)
+        text_hash: Hash SHA-256 de `text`, se já calculado
+        schemas: Schemas a usar (padrão: `get_schemas()`)
+    """
+    schemas = schemas or get_schemas()
+    schema = schemas.schema_for(path.name)
+    if schema is None or cache is None:
+        return schemas.check_text(text, path.name, path)
+
+    text_hash = text_hash or hashlib.sha256(text.encode("utf-8")).hexdigest()
+    key = f"{text_hash}:{schemas.fingerprint(schema)}"
+    cached = cache.get(key)
+    if cached is not None:
+        return ValidationResult.from_dict(path, cached)
+    result = schemas.check_text(text, path.name, path)
+    cache.put(key, result.to_dict())
+    return result
+
+
+def validate_artifact(md_path: Path, strict: bool = False, schemas: SchemaSet | None = None) -> list[str]:
     """
     Valida se um artefato Markdown segue o schema esperado.
 
     Args:
         md_path: Caminho do arquivo .md a validar
         strict: Se True, lança exceção em vez de retornar lista de erros
+        schemas: Schemas a usar (padrão: `get_schemas()`)
 
     Returns:
         Lista de mensagens de erro (vazia se válido)
@@ -60,51 +348,39 @@ def validate_artifact(md_path: Path, strict: bool = False) -> list[str]:
         ValidationError: Se strict=True e houver erros
         FileNotFoundError: Se o arquivo não existir
     """
-    if not md_path.exists():
-        raise FileNotFoundError(f"Arquivo não encontrado: {md_path}")
-
-    text = md_path.read_text(encoding='utf-8')
-    errors: list[str] = []
-
-    # Obtém schema esperado para este tipo de arquivo
-    required_patterns = REQUIRED_SECTIONS.get(md_path.name, [])
-
-    if not required_patterns:
-        # Arquivo não tem schema definido (não é erro, apenas aviso)
-        return []
-
-    # Verifica cada seção obrigatória
-    for pattern in required_patterns:
-        if not re.search(pattern, text, re.MULTILINE | re.IGNORECASE):
-            # Extrai descrição legível do padrão
-            section_name = pattern.replace(r'^#\s+', '').replace(r'^##\s+', '').replace(r'\s+', ' ')
-            section_name = re.sub(r'\[.*?\]', '', section_name)  # Remove regex classes
-            errors.append(f"Seção obrigatória ausente: {section_name}")
-
+    result = (schemas or get_schemas()).check_file(md_path)
+    errors = result.errors
     if strict and errors:
         raise ValidationError(f"Validação falhou para {md_path.name}: {'; '.join(errors)}")
-
     return errors
 
 
-def validate_all_artifacts(docs_dir: Path, strict: bool = False) -> dict[str, list[str]]:
+def validate_all_artifacts(
+    docs_dir: Path,
+    strict: bool = False,
+    jobs: int | None = None,
+    schemas: SchemaSet | None = None,
+) -> dict[str, list[str]]:
     """
-    Valida todos os artefatos em um diretório.
+    Valida todos os artefatos em um diretório (arquivos em paralelo).
 
     Args:
         docs_dir: Diretório contendo os arquivos .md
-        strict: Se True, para na primeira falha
+        strict: Se True, lança exceção para a primeira falha (ordem de nome)
+        jobs: Número de threads (padrão: número de CPUs)
+        schemas: Schemas a usar (padrão: `get_schemas()`)
 
     Returns:
         Dicionário {nome_arquivo: [erros]}
     """
     results: dict[str, list[str]] = {}
 
-    for md_file in docs_dir.glob('*.md'):
-        if md_file.name in REQUIRED_SECTIONS:
-            errors = validate_artifact(md_file, strict=strict)
-            if errors:
-                results[md_file.name] = errors
+    for result in (schemas or get_schemas()).check_dirs([docs_dir], jobs):
+        errors = result.errors
+        if errors:
+            if strict:
+                raise ValidationError(f"Validação falhou para {result.path.name}: {'; '.join(errors)}")
+            results[result.path.name] = errors
 
     return results
 
@@ -119,40 +395,53 @@ def get_schema_info(artifact_name: str) -> str:
     Returns:
         String descritiva do schema esperado
     """
-    patterns = REQUIRED_SECTIONS.get(artifact_name, [])
+    schemas = get_schemas()
+    schema = schemas.schema_for(artifact_name)
+    patterns = schemas.schemas[schema] if schema else []
     if not patterns:
         return f"Nenhum schema definido para '{artifact_name}'"
 
-    sections = []
-    for pattern in patterns:
-        # Converte regex para descrição legível
-        clean = pattern.replace(r'^#\s+', '# ').replace(r'^##\s+', '## ')
-        clean = re.sub(r'\[.*?\]', lambda m: m.group(0)[1], clean)
-        sections.append(clean)
+    sections = [describe_pattern(pattern) for pattern in patterns]
 
     return f"Schema esperado para '{artifact_name}':\n" + "\n".join(f"  - {s}" for s in sections)
 
 
+def _print_result(result: ValidationResult) -> None:
+    if result.ok:
+        print(f"✅ {result.path.name} válido! (schema: {result.schema})")
+        for section in result.sections:
+            print(f"  - linha {section.line}: {describe_pattern(section.pattern)}")
+        return
+    print(f"❌ Validação falhou para {result.path.name} (schema: {result.schema}):")
+    for section in result.sections:
+        if section.found:
+            print(f"  - linha {section.line}: {describe_pattern(section.pattern)}")
+        else:
+            print(f"  - Seção obrigatória ausente: {section_label(section.pattern)}")
+
+
 if __name__ == "__main__":
     # Exemplo de uso standalone
+    import argparse
     import sys
-    from pathlib import Path
 
-    if len(sys.argv) < 2:
-        print("Uso: python validators.py <caminho_para_artefato.md>")
-        sys.exit(1)
+    ap = argparse.ArgumentParser(description="MDD Publisher - Validar artefatos Markdown")
+    ap.add_argument("paths", nargs="+", help="Arquivos .md ou diretórios de artefatos")
+    ap.add_argument("--schemas", help="Arquivo YAML de schemas (complementa os padrões)")
+    ap.add_argument("--jobs", type=int, default=None, help="Threads para diretórios (padrão: CPUs)")
+    args = ap.parse_args()
 
-    md_path = Path(sys.argv[1])
     try:
-        errors = validate_artifact(md_path, strict=False)
-        if errors:
-            print(f"❌ Validação falhou para {md_path.name}:")
-            for error in errors:
-                print(f"  - {error}")
-            sys.exit(1)
-        else:
-            print(f"✅ {md_path.name} válido!")
-            sys.exit(0)
+        schemas = SchemaSet.from_file(Path(args.schemas), get_schemas().schemas) if args.schemas else get_schemas()
+        paths = [Path(p) for p in args.paths]
+        results = schemas.check_dirs([p for p in paths if p.is_dir()], args.jobs)
+        results += [schemas.check_file(p) for p in paths if not p.is_dir()]
+        for result in results:
+            if result.schema is None:
+                print(f"ℹ️  {result.path.name}: nenhum schema definido")
+            else:
+                _print_result(result)
+        sys.exit(0 if all(r.ok for r in results) else 1)
     except FileNotFoundError as e:
         print(f"❌ Erro: {e}")
         sys.exit(2)
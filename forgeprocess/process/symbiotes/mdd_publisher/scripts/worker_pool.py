@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Pool de workers pré-carregados do MDD Publisher (modo lote e watch).
+
+Num `ProcessPoolExecutor` comum cada worker reimporta `weasyprint`, `docx` e
+`bs4` na primeira exportação e vive até o fim do lote, acumulando memória.
+`PublisherPool` mantém a mesma interface (`submit`/`shutdown`, Futures), mas:
+
+- usa o modelo forkserver: o servidor de fork importa os backends pesados
+  uma única vez (`FORKSERVER_PRELOAD`) e cada worker nasce como fork dele,
+  já com os módulos carregados (em plataformas sem forkserver, usa spawn e
+  cada worker importa os backends ao iniciar);
+- recicla o worker após `max_jobs_per_worker` jobs ou quando sua memória
+  residente passa de `max_rss_mb`, sem perder jobs: a decisão é tomada no
+  processo principal, depois de receber o resultado;
+- um worker que morre durante um job (ex: falta de memória) resolve o Future
+  com `WorkerCrashedError` e é substituído, sem quebrar o pool.
+
+Uso:
+    with PublisherPool(max_workers=4) as pool:
+        futures = [pool.submit(run_export_job, str(md), "pdf") for md in files]
+        for future in as_completed(futures):
+            print(future.result())
+    print(pool.stats)   # {"started": 5, "recycled": 1, "crashed": 0}
+"""
+from __future__ import annotations
+
+import multiprocessing
+import logging
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Callable
+
+SCRIPT_DIR = Path(__file__).parent
+UTILS_DIR = SCRIPT_DIR / "utils"
+if str(UTILS_DIR) not in sys.path:
+    sys.path.insert(0, str(UTILS_DIR))
+
+from helpers import ExportError, configure_logging, log_export, log_settings
+from publish_daemon import PRELOAD_MODULES, preload_backends
+
+try:
+    from config import WORKER_MAX_JOBS, WORKER_MAX_RSS_MB
+except ImportError:
+    WORKER_MAX_JOBS = 200
+    WORKER_MAX_RSS_MB = 1024
+
+# Módulos importados uma vez no servidor de fork (ausentes são ignorados);
+# "__main__" é o script do CLI, que os workers então não reimportam
+FORKSERVER_PRELOAD = ["__main__", *PRELOAD_MODULES, "weasyprint", "worker_pool"]
+
+
+class WorkerCrashedError(ExportError):
+    """Worker do pool encerrou (ex: sinal, falta de memória) durante um job."""
+    pass
+
+
+def current_rss() -> int:
+    """Memória residente do processo atual, em bytes (pico, fora do Linux; 0 se indisponível)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return 0
+
+
+def pool_context(preload: bool = True, start_method: str | None = None):
+    """
+    Contexto multiprocessing do pool: forkserver (com pré-carga) quando disponível, senão spawn.
+
+    A lista de pré-carga só vale se o servidor de fork ainda não estiver rodando.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    method = start_method or ("forkserver" if "forkserver" in methods else "spawn")
+    ctx = multiprocessing.get_context(method)
+    if method == "forkserver" and preload:
+        ctx.set_forkserver_preload(FORKSERVER_PRELOAD)
+    return ctx
+
+
+def _worker_main(conn: Connection, settings: dict, preload: bool) -> None:
+    # Worker não roda atexit: o log precisa ser síncrono
+    if settings:
+        configure_logging(queued=False, **settings)
+    if preload:
+        preload_backends()  # com forkserver, os módulos já vêm importados
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if task is None:
+            return
+        fn, args, kwargs = task
+        try:
+            reply = (True, fn(*args, **kwargs))
+        except BaseException as e:
+            reply = (False, e)
+        try:
+            conn.send((*reply, current_rss()))
+        except Exception as e:  # resultado ou exceção não serializável
+            conn.send((False, ExportError(f"Resultado do job não serializável: {e}"), current_rss()))
+
+
+@dataclass
+class _Worker:
+    process: multiprocessing.process.BaseProcess
+    conn: Connection
+    jobs: int = 0
+    future: Future | None = None
+
+
+class PublisherPool(Executor):
+    """
+    Executor de processos com backends pré-carregados e reciclagem de workers.
+
+    Args:
+        max_workers: Número de workers (padrão: número de CPUs)
+        max_jobs_per_worker: Jobs antes de reciclar um worker (0 = sem limite)
+        max_rss_mb: Memória residente (MB) acima da qual o worker é reciclado (0 = sem limite)
+        preload: Se True, importa os backends pesados antes dos jobs
+        start_method: Força "forkserver", "spawn" ou "fork" (padrão: forkserver, se houver)
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_jobs_per_worker: int = WORKER_MAX_JOBS,
+        max_rss_mb: float = WORKER_MAX_RSS_MB,
+        preload: bool = True,
+        start_method: str | None = None,
+    ):
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.max_jobs_per_worker = max_jobs_per_worker or 0
+        self.max_rss = int(max_rss_mb * 1024 * 1024) if max_rss_mb else 0
+        self._ctx = pool_context(preload, start_method)
+        self.start_method = self._ctx.get_start_method()
+        self._initargs = (log_settings(), preload)
+        self.stats = {"started": 0, "recycled": 0, "crashed": 0}
+
+        self._lock = threading.Lock()
+        self._pending: deque[tuple[Future, Callable, tuple, dict]] = deque()
+        self._workers: list[_Worker] = []
+        self._retired: list = []
+        self._wakeup_r, self._wakeup_w = multiprocessing.Pipe(duplex=False)
+        self._manager: threading.Thread | None = None
+        self._shutdown = False
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        """Agenda `fn(*args, **kwargs)` num worker; `fn` e argumentos precisam ser serializáveis."""
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Não é possível agendar jobs após o shutdown do pool")
+            future: Future = Future()
+            self._pending.append((future, fn, args, kwargs))
+            if self._manager is None:
+                self._manager = threading.Thread(target=self._manage, name="publisher-pool", daemon=True)
+                self._manager.start()
+            self._wakeup_w.send_bytes(b"")
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Encerra o pool após os jobs pendentes (ou cancelando-os, com `cancel_futures`)."""
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                while self._pending:
+                    self._pending.popleft()[0].cancel()
+            manager = self._manager
+            self._wakeup_w.send_bytes(b"")
+        if wait and manager is not None:
+            manager.join()
+
+    # Thread gerenciadora: distribui jobs, coleta resultados e recicla workers
+
+    def _manage(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    self._assign()
+                    busy = {w.conn: w for w in self._workers if w.future is not None}
+                    if self._shutdown and not self._pending and not busy:
+                        return
+                for conn in wait([*busy, self._wakeup_r]):
+                    if conn is self._wakeup_r:
+                        while self._wakeup_r.poll():
+                            self._wakeup_r.recv_bytes()
+                    else:
+                        self._collect(busy[conn])
+        except BaseException as e:
+            # Falha do gerenciador: nenhum Future pode ficar pendente para sempre
+            with self._lock:
+                self._shutdown = True
+                orphans = [w.future for w in self._workers if w.future is not None]
+                orphans += [item[0] for item in self._pending if item[0].set_running_or_notify_cancel()]
+                self._pending.clear()
+            for future in orphans:
+                future.set_exception(e)
+            raise
+        finally:
+            self._stop_workers()
+
+    def _assign(self) -> None:
+        idle = [w for w in self._workers if w.future is None]
+        while self._pending:
+            if not idle:
+                if len(self._workers) >= self.max_workers:
+                    return
+                idle.append(self._spawn())
+            future, fn, args, kwargs = self._pending.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            worker = idle.pop()
+            try:
+                worker.conn.send((fn, args, kwargs))
+            except OSError as e:
+                self._discard(worker)
+                future.set_exception(WorkerCrashedError(f"Worker {worker.process.pid} indisponível: {e}"))
+                continue
+            except Exception as e:  # job não serializável
+                idle.append(worker)
+                future.set_exception(e)
+                continue
+            worker.future = future
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, *self._initargs),
+            name=f"mdd-worker-{self.stats['started'] + 1}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        self._workers.append(worker)
+        self.stats["started"] += 1
+        return worker
+
+    def _collect(self, worker: _Worker) -> None:
+        future, worker.future = worker.future, None
+        try:
+            ok, value, rss = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join(1)
+            self._discard(worker)
+            self.stats["crashed"] += 1
+            log_export(f"FALHA: worker {worker.process.pid} encerrou durante um job (código {worker.process.exitcode})", level=logging.ERROR)
+            future.set_exception(WorkerCrashedError(
+                f"Worker {worker.process.pid} encerrou durante o job (código {worker.process.exitcode})"
+            ))
+            return
+        worker.jobs += 1
+        if (self.max_jobs_per_worker and worker.jobs >= self.max_jobs_per_worker) or (self.max_rss and rss > self.max_rss):
+            self._retire(worker)
+            self.stats["recycled"] += 1
+            log_export(f"Worker {worker.process.pid} reciclado após {worker.jobs} job(s) (RSS {rss / 1048576:.0f} MB)")
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+    def _retire(self, worker: _Worker) -> None:
+        # O worker sai ao receber None; é recolhido depois, sem bloquear a distribuição
+        try:
+            worker.conn.send(None)
+        except OSError:
+            pass
+        self._discard(worker)
+        self._retired = [p for p in self._retired if p.exitcode is None]
+        self._retired.append(worker.process)
+
+    def _discard(self, worker: _Worker) -> None:
+        worker.conn.close()
+        self._workers.remove(worker)
+
+    def _stop_workers(self) -> None:
+        for worker in list(self._workers):
+            self._retire(worker)
+        for process in self._retired:
+            process.join(5)
+            if process.exitcode is None:
+                process.terminate()
+                process.join()
+        self._retired = []